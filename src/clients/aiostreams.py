@@ -1,7 +1,11 @@
 import logging
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Any
 
-import requests
+import orjson
+
+from src.clients.http import create_session
 
 logger = logging.getLogger(__name__)
 
@@ -9,14 +13,23 @@ logger = logging.getLogger(__name__)
 class AIOStreamsClient:
     """Client for querying AIOStreams Stremio API"""
 
-    def __init__(self, url: str):
+    _QUALITY_RE = re.compile(r"2160p|4k|1080p|720p", re.IGNORECASE)
+    _QUALITY_MAP = {"2160p": 2160, "4k": 2160, "1080p": 1080, "720p": 720}
+
+    def __init__(self, url: str, max_workers: int = 8):
         self.url = url.rstrip("/")
+        self._movie_stream_url = f"{self.url}/stream/movie/"
+        self._series_stream_url = f"{self.url}/stream/series/"
+        self.max_workers = max_workers
+        self.session = create_session()
 
     @staticmethod
     def _log_curl(
         method: str, url: str, headers: dict | None = None, timeout: int | None = None
     ) -> None:
-        """Log the equivalent curl command for an HTTP request."""
+        """Log the equivalent curl command for an HTTP request (DEBUG only)."""
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
         parts = ["curl", "-X", method]
         if headers:
             for key, value in headers.items():
@@ -25,7 +38,7 @@ class AIOStreamsClient:
             parts.append(f"--max-time {timeout}")
         parts.append(f"'{url}'")
         curl_cmd = " ".join(parts)
-        logger.info(f"Equivalent curl command:\n  {curl_cmd}")
+        logger.debug(f"Equivalent curl command:\n  {curl_cmd}")
 
     def search_movie(self, imdb_id: str) -> list[dict[str, Any]]:
         """
@@ -37,20 +50,8 @@ class AIOStreamsClient:
         Returns:
             List of cached stream dictionaries with title, infoHash, quality
         """
-        endpoint = f"{self.url}/stream/movie/{imdb_id}.json"
-
-        try:
-            self._log_curl("GET", endpoint, timeout=30)
-            response = requests.get(endpoint, timeout=30)
-            response.raise_for_status()
-            data = response.json()
-
-            streams = data.get("streams", [])
-            return self._filter_streams(streams)
-
-        except Exception as e:
-            logger.error(f"Error querying AIOStreams for {imdb_id}: {e}")
-            return []
+        endpoint = f"{self._movie_stream_url}{imdb_id}.json"
+        return self._search(endpoint, imdb_id)
 
     def search_episode(self, imdb_id: str, season: int, episode: int) -> list[dict[str, Any]]:
         """
@@ -64,21 +65,69 @@ class AIOStreamsClient:
         Returns:
             List of cached stream dictionaries with title, url, quality
         """
-        endpoint = f"{self.url}/stream/series/{imdb_id}:{season}:{episode}.json"
+        endpoint = f"{self._series_stream_url}{imdb_id}:{season}:{episode}.json"
+        return self._search(endpoint, f"{imdb_id} S{season}E{episode}")
 
+    def _search(self, endpoint: str, label: str) -> list[dict[str, Any]]:
+        """Query a stream endpoint and return its playable streams."""
         try:
             self._log_curl("GET", endpoint, timeout=30)
-            response = requests.get(endpoint, timeout=30)
+            response = self.session.get(endpoint, timeout=30)
             response.raise_for_status()
-            data = response.json()
+            data = orjson.loads(response.content)
 
-            streams = data.get("streams", [])
-            return self._filter_streams(streams)
+            return self._filter_streams(data.get("streams", []))
 
         except Exception as e:
-            logger.error(f"Error querying AIOStreams for {imdb_id} S{season}E{episode}: {e}")
+            logger.error(f"Error querying AIOStreams for {label}: {e}")
             return []
 
+    def search_movies(self, imdb_ids: list[str]) -> dict[str, list[dict[str, Any]]]:
+        """
+        Search for streams for several movies concurrently
+
+        Args:
+            imdb_ids: IMDB IDs to search for
+
+        Returns:
+            Dict mapping each IMDB ID to its list of cached streams
+        """
+        results = self._search_many(self.search_movie, [(imdb_id,) for imdb_id in imdb_ids])
+        return {query[0]: streams for query, streams in results.items()}
+
+    def search_episodes(
+        self, queries: list[tuple[str, int, int]]
+    ) -> dict[tuple[str, int, int], list[dict[str, Any]]]:
+        """
+        Search for streams for several TV episodes concurrently
+
+        Args:
+            queries: (imdb_id, season, episode) tuples to search for
+
+        Returns:
+            Dict mapping each query tuple to its list of cached streams
+        """
+        return self._search_many(self.search_episode, queries)
+
+    def _search_many(self, search, queries: list[tuple]) -> dict[tuple, list[dict[str, Any]]]:
+        """Run ``search(*query)`` for each unique query on a thread pool."""
+        results: dict[tuple, list[dict[str, Any]]] = {}
+        queries = list(dict.fromkeys(queries))
+        if not queries:
+            return results
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(queries))) as executor:
+            futures = {executor.submit(search, *query): query for query in queries}
+            for future in as_completed(futures):
+                query = futures[future]
+                try:
+                    results[query] = future.result()
+                except Exception as e:
+                    logger.error(f"Error searching AIOStreams for {query}: {e}")
+                    results[query] = []
+
+        return results
+
     def _filter_streams(self, streams: list[dict[str, Any]]) -> list[dict[str, Any]]:
         """Filter streams for playable results.
 
@@ -88,25 +137,27 @@ class AIOStreamsClient:
         personal AIOStreams instance are already cached on Real-Debrid, so we accept
         every stream that has a playback URL.
         """
+        # Bind lookups once; this runs for every stream of every title each poll
+        parse_quality = self._parse_quality
         cached_streams = []
+        append = cached_streams.append
         for stream in streams:
-            url = stream.get("url")
+            get = stream.get
+            url = get("url")
             if not url:
                 continue
 
             # name = resolution/source label, description = HDR tags, size, group, filename
-            title = stream.get("name") or stream.get("title", "")
-            description = stream.get("description", "")
-
-            behavior_hints = stream.get("behaviorHints", {})
-            cached_streams.append(
+            title = get("name") or get("title", "")
+            behavior_hints = get("behaviorHints") or {}
+            append(
                 {
                     "title": title,
                     "url": url,
-                    "infoHash": stream.get("infoHash"),
+                    "infoHash": get("infoHash"),
                     "filename": behavior_hints.get("filename", ""),
                     # Quality is encoded in the name field now (e.g. "2160p BluRay REMUX")
-                    "quality": self._parse_quality(title or description),
+                    "quality": parse_quality(title or get("description", "")),
                 }
             )
 
@@ -122,13 +173,12 @@ class AIOStreamsClient:
         Returns:
             Quality as integer (2160, 1080, 720, or 480)
         """
-        title_upper = title.upper()
-
-        if "2160P" in title_upper or "4K" in title_upper:
-            return 2160
-        elif "1080P" in title_upper:
-            return 1080
-        elif "720P" in title_upper:
-            return 720
-        else:
+        # Highest match wins so "1080p ... 4K" still resolves to 2160
+        matches = self._QUALITY_RE.findall(title)
+        if not matches:
             return 480
+        return max(self._QUALITY_MAP[match.lower()] for match in matches)
+
+    def close(self) -> None:
+        """Close the underlying session and release its pooled connections"""
+        self.session.close()
@@ -0,0 +1,48 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# (connect, read) timeout applied to requests that don't pass their own
+DEFAULT_TIMEOUT = (5, 30)
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that applies a default timeout so no request can hang indefinitely"""
+
+    def __init__(self, *args, timeout: float | tuple[float, float] = DEFAULT_TIMEOUT, **kwargs):
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().send(request, **kwargs)
+
+
+def create_session(headers: dict[str, str] | None = None) -> requests.Session:
+    """
+    Create a requests Session with keep-alive connection pooling
+
+    Transient failures (429, 5xx, connection errors) are retried with backoff for
+    idempotent methods only; POSTs such as Real-Debrid addMagnet are never replayed.
+
+    Args:
+        headers: Headers sent with every request made through the session
+
+    Returns:
+        Configured requests Session
+    """
+    session = requests.Session()
+    if headers:
+        session.headers.update(headers)
+
+    retry = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(["GET", "PUT", "DELETE"]),
+    )
+    adapter = TimeoutHTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
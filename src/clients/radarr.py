@@ -1,58 +1,133 @@
 import logging
+import threading
+from collections.abc import Iterator
 from typing import Any
 
+import orjson
 import requests
 
+from src.clients.http import create_session
+
 logger = logging.getLogger(__name__)
 
+JSON_HEADERS = {"Content-Type": "application/json"}
+
 
 class RadarrClient:
     """Client for interacting with Radarr API"""
 
     def __init__(self, url: str, api_key: str):
         self.url = url.rstrip("/")
+        self._wanted_url = f"{self.url}/api/v3/wanted/missing"
+        self._movie_url = f"{self.url}/api/v3/movie/"
         self.api_key = api_key
         self.headers = {"X-Api-Key": api_key}
+        self.session = create_session(self.headers)
+        # Validators and raw body of the last wanted/missing 200 per page, for conditional polls
+        self._wanted_pages: dict[tuple[int, int], tuple[str | None, str | None, bytes]] = {}
+        self._wanted_lock = threading.Lock()
 
     def get_wanted_movies(self) -> list[dict[str, Any]]:
         """Get all wanted (missing) movies from Radarr"""
+        return list(self.iter_wanted_movies())
+
+    def iter_wanted_movies(self, page_size: int = 200) -> Iterator[dict[str, Any]]:
+        """
+        Iterate wanted (missing) movies from Radarr, one page at a time
+
+        Args:
+            page_size: Number of records requested per page
+
+        Yields:
+            Wanted movie records; stops early if a page cannot be fetched
+        """
+        page = 1
+        while True:
+            data = self._fetch_wanted_page(page, page_size)
+            if data is None:
+                return
+
+            records = data.get("records", [])
+            yield from records
+
+            total = data.get("totalRecords")
+            if len(records) < page_size or (total is not None and page * page_size >= total):
+                self._forget_pages_after(page, page_size)
+                return
+            page += 1
+
+    def _forget_pages_after(self, last_page: int, page_size: int) -> None:
+        """Drop cached pages past the last one, left over from when the wanted list was longer"""
+        with self._wanted_lock:
+            stale = [k for k in self._wanted_pages if k[0] > last_page and k[1] == page_size]
+            for key in stale:
+                del self._wanted_pages[key]
+
+    def _fetch_wanted_page(self, page: int, page_size: int) -> dict[str, Any] | None:
+        """Fetch one wanted/missing page, reparsing the previous body when Radarr replies 304."""
+        key = (page, page_size)
+        with self._wanted_lock:
+            etag, lastmod, cached = self._wanted_pages.get(key, (None, None, None))
+
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if lastmod:
+            headers["If-Modified-Since"] = lastmod
+
         try:
-            response = requests.get(
-                f"{self.url}/api/v3/wanted/missing", headers=self.headers, params={"pageSize": 1000}
+            response = self.session.get(
+                self._wanted_url,
+                params={"page": page, "pageSize": page_size},
+                headers=headers,
             )
+            if response.status_code == 304 and cached is not None:
+                logger.debug(f"Wanted movies page {page} unchanged since last poll")
+                # Parsed fresh each time, so callers can't alter the copy the next 304 returns
+                return orjson.loads(cached)
+
             response.raise_for_status()
-            data = response.json()
-            return data["records"]
-        except requests.RequestException as e:
+            body = response.content
+            data = orjson.loads(body)
+        except (requests.RequestException, orjson.JSONDecodeError) as e:
             logger.error(f"Error fetching wanted movies from Radarr: {e}")
-            return []
+            return None
+
+        with self._wanted_lock:
+            self._wanted_pages[key] = (
+                response.headers.get("ETag"),
+                response.headers.get("Last-Modified"),
+                body,
+            )
+        return data
 
     def get_movie(self, movie_id: int) -> dict[str, Any]:
         """Get movie details by ID"""
-        response = requests.get(f"{self.url}/api/v3/movie/{movie_id}", headers=self.headers)
+        response = self.session.get(self._movie_url + str(movie_id))
         response.raise_for_status()
         return response.json()
 
-    def unmonitor_movie(self, movie_id: int) -> bool:
+    def unmonitor_movie(self, movie_id: int, movie: dict[str, Any] | None = None) -> bool:
         """
         Set movie as unmonitored in Radarr
 
         Args:
             movie_id: Radarr movie ID
+            movie: Movie resource already fetched (e.g. from wanted/missing), skips the GET
 
         Returns:
             True if successfully unmonitored, False otherwise
         """
         try:
-            # First get the movie to get its current state
-            movie = self.get_movie(movie_id)
+            # Get the movie's current state unless the caller already has it
+            movie = self.get_movie(movie_id) if movie is None else dict(movie)
 
             # Update monitored status to False
             movie["monitored"] = False
 
             # Send PUT request to update the movie
-            response = requests.put(
-                f"{self.url}/api/v3/movie/{movie_id}", headers=self.headers, json=movie
+            response = self.session.put(
+                self._movie_url + str(movie_id), data=orjson.dumps(movie), headers=JSON_HEADERS
             )
             response.raise_for_status()
             logger.info(f"Successfully unmonitored movie ID {movie_id}")
@@ -60,3 +135,33 @@ class RadarrClient:
         except Exception as e:
             logger.error(f"Error unmonitoring movie {movie_id}: {e}")
             return False
+
+    def bulk_unmonitor_movies(self, movie_ids: list[int]) -> bool:
+        """
+        Set several movies as unmonitored in one request via the movie editor
+
+        Args:
+            movie_ids: Radarr movie IDs
+
+        Returns:
+            True if successfully unmonitored, False otherwise
+        """
+        if not movie_ids:
+            return True
+
+        try:
+            response = self.session.put(
+                f"{self.url}/api/v3/movie/editor",
+                data=orjson.dumps({"movieIds": movie_ids, "monitored": False}),
+                headers=JSON_HEADERS,
+            )
+            response.raise_for_status()
+            logger.info(f"Successfully unmonitored {len(movie_ids)} movies")
+            return True
+        except Exception as e:
+            logger.error(f"Error bulk unmonitoring movies {movie_ids}: {e}")
+            return False
+
+    def close(self) -> None:
+        """Close the underlying session and release its pooled connections"""
+        self.session.close()
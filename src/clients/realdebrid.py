@@ -1,7 +1,9 @@
 import logging
 import time
 
-import requests
+import orjson
+
+from src.clients.http import create_session
 
 logger = logging.getLogger(__name__)
 
@@ -13,16 +15,19 @@ class RealDebridClient:
         self.api_key = api_key
         self.base_url = "https://api.real-debrid.com/rest/1.0"
         self.headers = {"Authorization": f"Bearer {api_key}"}
+        self.session = create_session(self.headers)
 
     def _log_curl(self, method: str, url: str, data: dict | None = None) -> None:
-        """Log the equivalent curl command, redacting the Bearer token."""
+        """Log the equivalent curl command, redacting the Bearer token (DEBUG only)."""
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
         parts = ["curl", "-X", method, "--max-time 30"]
         parts.append("-H 'Authorization: Bearer ***'")
         if data:
             for key, value in data.items():
                 parts.append(f"--data-urlencode '{key}={value}'")
         parts.append(f"'{url}'")
-        logger.info(f"Equivalent curl command:\n  {' '.join(parts)}")
+        logger.debug(f"Equivalent curl command:\n  {' '.join(parts)}")
 
     def add_magnet(self, magnet_or_infohash: str) -> str | None:
         """
@@ -42,8 +47,8 @@ class RealDebridClient:
 
         try:
             # Step 1: Add magnet to Real-Debrid
-            response = requests.post(
-                f"{self.base_url}/torrents/addMagnet", headers=self.headers, data={"magnet": magnet}
+            response = self.session.post(
+                f"{self.base_url}/torrents/addMagnet", data={"magnet": magnet}
             )
             response.raise_for_status()
             torrent_info = response.json()
@@ -51,20 +56,14 @@ class RealDebridClient:
 
             logger.info(f"Added magnet to Real-Debrid: {torrent_id}")
 
-            # Step 2: Wait briefly and get torrent info
-            time.sleep(2)
-            response = requests.get(
-                f"{self.base_url}/torrents/info/{torrent_id}", headers=self.headers
-            )
-            response.raise_for_status()
-            info = response.json()
+            # Step 2: Poll torrent info until RD has resolved the magnet (no wait if it already has)
+            info = self._wait_for_status(torrent_id)
 
             # Step 3: Select all files if needed
             if info["status"] == "waiting_files_selection":
                 file_ids = ",".join([str(f["id"]) for f in info["files"]])
-                requests.post(
+                self.session.post(
                     f"{self.base_url}/torrents/selectFiles/{torrent_id}",
-                    headers=self.headers,
                     data={"files": file_ids},
                 )
                 logger.info(f"Selected all files for torrent {torrent_id}")
@@ -75,6 +74,43 @@ class RealDebridClient:
             logger.error(f"Error adding to Real-Debrid: {e}")
             return None
 
+    def _wait_for_status(
+        self,
+        torrent_id: str,
+        targets: tuple[str, ...] = (
+            "waiting_files_selection",
+            "downloaded",
+            "downloading",
+            "queued",
+        ),
+        max_wait: float = 5.0,
+    ) -> dict:
+        """
+        Poll torrent info with exponential backoff until it reaches a target status
+
+        The first check is made immediately, since RD usually resolves known hashes
+        (and auto-selects their files) before the addMagnet response returns.
+
+        Args:
+            torrent_id: Real-Debrid torrent ID
+            targets: Statuses that end the wait
+            max_wait: Maximum total seconds to wait
+
+        Returns:
+            The last torrent info fetched (its status may not be a target if max_wait elapsed)
+        """
+        delay = 0.2
+        waited = 0.0
+        while True:
+            response = self.session.get(f"{self.base_url}/torrents/info/{torrent_id}")
+            response.raise_for_status()
+            info = response.json()
+            if info["status"] in targets or waited >= max_wait:
+                return info
+            time.sleep(delay)
+            waited += delay
+            delay = min(delay * 2, max_wait - waited)
+
     def check_torrent_status(self, torrent_id: str) -> str | None:
         """
         Check torrent download status
@@ -86,11 +122,9 @@ class RealDebridClient:
             Status string (downloaded, downloading, queued, etc.) or None on error
         """
         try:
-            response = requests.get(
-                f"{self.base_url}/torrents/info/{torrent_id}", headers=self.headers
-            )
+            response = self.session.get(f"{self.base_url}/torrents/info/{torrent_id}")
             response.raise_for_status()
-            info = response.json()
+            info = orjson.loads(response.content)
             return info["status"]
         except Exception as e:
             logger.error(f"Error checking torrent status: {e}")
@@ -107,9 +141,8 @@ class RealDebridClient:
             Torrent info dict or None on error
         """
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/torrents/info/{torrent_id}",
-                headers=self.headers,
                 timeout=30,
             )
             response.raise_for_status()
@@ -129,9 +162,8 @@ class RealDebridClient:
             True if successfully deleted, False otherwise
         """
         try:
-            response = requests.delete(
+            response = self.session.delete(
                 f"{self.base_url}/torrents/delete/{torrent_id}",
-                headers=self.headers,
                 timeout=30,
             )
             response.raise_for_status()
@@ -153,16 +185,19 @@ class RealDebridClient:
         url = f"{self.base_url}/torrents"
         self._log_curl("GET", url)
         try:
-            response = requests.get(
+            response = self.session.get(
                 url,
-                headers=self.headers,
                 timeout=30,
             )
             response.raise_for_status()
             if not response.content:
                 logger.warning(f"RD /torrents returned HTTP {response.status_code} with empty body")
                 return None
-            return response.json()
+            return orjson.loads(response.content)
         except Exception as e:
             logger.error(f"Error listing torrents: {e}")
             return None
+
+    def close(self) -> None:
+        """Close the underlying session and release its pooled connections"""
+        self.session.close()
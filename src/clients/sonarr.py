@@ -1,60 +1,166 @@
 import logging
+import threading
+from collections.abc import Iterator
 from typing import Any
 
+import orjson
 import requests
 
+from src.clients.http import create_session
+
 logger = logging.getLogger(__name__)
 
+JSON_HEADERS = {"Content-Type": "application/json"}
+
 
 class SonarrClient:
     """Client for interacting with Sonarr API"""
 
     def __init__(self, url: str, api_key: str):
         self.url = url.rstrip("/")
+        self._wanted_url = f"{self.url}/api/v3/wanted/missing"
+        self._episode_url = f"{self.url}/api/v3/episode/"
         self.api_key = api_key
         self.headers = {"X-Api-Key": api_key}
+        self.session = create_session(self.headers)
+        # Validators and raw body of the last wanted/missing 200 per page, for conditional polls
+        self._wanted_pages: dict[tuple[int, int, bool], tuple[str | None, str | None, bytes]] = {}
+        self._wanted_lock = threading.Lock()
 
-    def get_wanted_episodes(self) -> list[dict[str, Any]]:
+    def get_wanted_episodes(self, include_series: bool = True) -> list[dict[str, Any]]:
         """Get all wanted (missing) episodes from Sonarr"""
+        return list(self.iter_wanted_episodes(include_series=include_series))
+
+    def iter_wanted_episodes(
+        self, page_size: int = 200, include_series: bool = True
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Iterate wanted (missing) episodes from Sonarr, one page at a time
+
+        Args:
+            page_size: Number of records requested per page
+            include_series: Embed the full series resource in every episode record
+
+        Yields:
+            Wanted episode records; stops early if a page cannot be fetched
+        """
+        page = 1
+        while True:
+            data = self._fetch_wanted_page(page, page_size, include_series)
+            if data is None:
+                return
+
+            records = data.get("records", [])
+            yield from records
+
+            total = data.get("totalRecords")
+            if len(records) < page_size or (total is not None and page * page_size >= total):
+                self._forget_pages_after(page, page_size, include_series)
+                return
+            page += 1
+
+    def _forget_pages_after(self, last_page: int, page_size: int, include_series: bool) -> None:
+        """Drop cached pages past the last one, left over from when the wanted list was longer"""
+        with self._wanted_lock:
+            stale = [
+                k
+                for k in self._wanted_pages
+                if k[0] > last_page and k[1:] == (page_size, include_series)
+            ]
+            for key in stale:
+                del self._wanted_pages[key]
+
+    def _fetch_wanted_page(
+        self, page: int, page_size: int, include_series: bool
+    ) -> dict[str, Any] | None:
+        """Fetch one wanted/missing page, reparsing the previous body when Sonarr replies 304."""
+        key = (page, page_size, include_series)
+        with self._wanted_lock:
+            etag, lastmod, cached = self._wanted_pages.get(key, (None, None, None))
+
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if lastmod:
+            headers["If-Modified-Since"] = lastmod
+
         try:
-            response = requests.get(
-                f"{self.url}/api/v3/wanted/missing",
-                headers=self.headers,
-                params={"pageSize": 1000, "includeSeries": True},
+            response = self.session.get(
+                self._wanted_url,
+                params={"page": page, "pageSize": page_size, "includeSeries": include_series},
+                headers=headers,
             )
+            if response.status_code == 304 and cached is not None:
+                logger.debug(f"Wanted episodes page {page} unchanged since last poll")
+                # Parsed fresh each time; the processor attaches series to these records
+                return orjson.loads(cached)
+
             response.raise_for_status()
-            data = response.json()
-            return data["records"]
-        except requests.RequestException as e:
+            body = response.content
+            data = orjson.loads(body)
+        except (requests.RequestException, orjson.JSONDecodeError) as e:
             logger.error(f"Error fetching wanted episodes from Sonarr: {e}")
+            return None
+
+        with self._wanted_lock:
+            self._wanted_pages[key] = (
+                response.headers.get("ETag"),
+                response.headers.get("Last-Modified"),
+                body,
+            )
+        return data
+
+    def get_all_series(self) -> list[dict[str, Any]]:
+        """Get every series in Sonarr, or an empty list on error"""
+        try:
+            response = self.session.get(f"{self.url}/api/v3/series")
+            response.raise_for_status()
+            return orjson.loads(response.content)
+        except (requests.RequestException, orjson.JSONDecodeError) as e:
+            logger.error(f"Error fetching series from Sonarr: {e}")
             return []
 
+    def get_series(self, series_id: int) -> dict[str, Any] | None:
+        """Get one series by ID, or None on error"""
+        try:
+            response = self.session.get(f"{self.url}/api/v3/series/{series_id}")
+            response.raise_for_status()
+            return orjson.loads(response.content)
+        except (requests.RequestException, orjson.JSONDecodeError) as e:
+            logger.error(f"Error fetching series {series_id} from Sonarr: {e}")
+            return None
+
     def get_episode(self, episode_id: int) -> dict[str, Any]:
         """Get episode details by ID"""
-        response = requests.get(f"{self.url}/api/v3/episode/{episode_id}", headers=self.headers)
+        response = self.session.get(self._episode_url + str(episode_id))
         response.raise_for_status()
         return response.json()
 
-    def unmonitor_episode(self, episode_id: int) -> bool:
+    def unmonitor_episode(self, episode_id: int, episode: dict[str, Any] | None = None) -> bool:
         """
         Set episode as unmonitored in Sonarr
 
         Args:
             episode_id: Sonarr episode ID
+            episode: Episode resource already fetched (e.g. from wanted/missing), skips the GET
 
         Returns:
             True if successfully unmonitored, False otherwise
         """
         try:
-            # First get the episode to get its current state
-            episode = self.get_episode(episode_id)
+            # Get the episode's current state unless the caller already has it
+            episode = self.get_episode(episode_id) if episode is None else dict(episode)
+            # wanted/missing embeds the series resource, which the episode endpoint doesn't take
+            episode.pop("series", None)
 
             # Update monitored status to False
             episode["monitored"] = False
 
             # Send PUT request to update the episode
-            response = requests.put(
-                f"{self.url}/api/v3/episode/{episode_id}", headers=self.headers, json=episode
+            response = self.session.put(
+                self._episode_url + str(episode_id),
+                data=orjson.dumps(episode),
+                headers=JSON_HEADERS,
             )
             response.raise_for_status()
             logger.info(f"Successfully unmonitored episode ID {episode_id}")
@@ -62,3 +168,33 @@ class SonarrClient:
         except Exception as e:
             logger.error(f"Error unmonitoring episode {episode_id}: {e}")
             return False
+
+    def bulk_unmonitor_episodes(self, episode_ids: list[int]) -> bool:
+        """
+        Set several episodes as unmonitored in one request
+
+        Args:
+            episode_ids: Sonarr episode IDs
+
+        Returns:
+            True if successfully unmonitored, False otherwise
+        """
+        if not episode_ids:
+            return True
+
+        try:
+            response = self.session.put(
+                f"{self.url}/api/v3/episode/monitor",
+                data=orjson.dumps({"episodeIds": episode_ids, "monitored": False}),
+                headers=JSON_HEADERS,
+            )
+            response.raise_for_status()
+            logger.info(f"Successfully unmonitored {len(episode_ids)} episodes")
+            return True
+        except Exception as e:
+            logger.error(f"Error bulk unmonitoring episodes {episode_ids}: {e}")
+            return False
+
+    def close(self) -> None:
+        """Close the underlying session and release its pooled connections"""
+        self.session.close()
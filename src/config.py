@@ -10,7 +10,7 @@ class Config:
 
     def __init__(self):
         # Required configuration
-        self.aiostreams_url = self._get_required("AIOSTREAMS_URL")
+        self.aiostreams_url = self._get_required("AIOSTREAMS_URL").rstrip("/")
 
         # At least one of Radarr or Sonarr must be configured
         self.radarr_url = os.getenv("RADARR_URL", "").rstrip("/")
@@ -31,6 +31,10 @@ class Config:
         self.realdebrid_api_key = os.getenv("REALDEBRID_API_KEY", "")
         self.log_level = os.getenv("LOG_LEVEL", "INFO")
         self.max_retry_attempts = int(os.getenv("MAX_RETRY_ATTEMPTS", "3"))
+        # Number of wanted items processed at once (each may wait on RD verification)
+        self.concurrency = max(1, int(os.getenv("CONCURRENCY", "4")))
+        # SQLite file for processed-item history; empty keeps it in memory only
+        self.storage_path = os.getenv("STORAGE_PATH", "")
 
         # Comma-separated regex patterns for stream filenames/titles to exclude
         # Default blocks common spam prefixes like "www.UIndex.org"
@@ -39,8 +43,6 @@ class Config:
             p.strip() for p in excluded_raw.split(",") if p.strip()
         ]
 
-        self.aiostreams_url = self.aiostreams_url.rstrip("/")
-
     @property
     def radarr_enabled(self) -> bool:
         """Check if Radarr is configured"""
@@ -5,9 +5,9 @@ Automatically adds wanted movies and TV shows to Real-Debrid using AIOStreams
 """
 
 import logging
-import time
-
-import schedule
+import random
+import signal
+import threading
 
 from src.config import Config
 from src.media_processor import MediaProcessor
@@ -22,8 +22,30 @@ def setup_logging(log_level: str) -> None:
     )
 
 
-def main():
-    """Main entry point"""
+def poll_delay(interval_seconds: float) -> float:
+    """
+    Seconds to wait before the next poll, with jitter so instances don't sync up
+
+    Args:
+        interval_seconds: Configured poll interval
+
+    Returns:
+        Interval plus or minus up to 10% (capped at 30 seconds)
+    """
+    spread = min(30.0, interval_seconds * 0.1)
+    return interval_seconds + random.uniform(-spread, spread)
+
+
+def main(stop_event: threading.Event | None = None) -> int:
+    """
+    Main entry point
+
+    Args:
+        stop_event: Event that ends the poll loop once set (a new one is created if None)
+
+    Returns:
+        Process exit code
+    """
     # Load configuration
     try:
         config = Config()
@@ -52,24 +74,30 @@ def main():
     # Initialize processor
     processor = MediaProcessor(config)
 
-    # Run immediately on startup
-    logger.info("Running initial check...")
-    processor.process_all()
+    # Wake only when the next poll is due; SIGTERM (docker stop) ends the wait early.
+    # Registered before the initial check so a stop during it skips the poll loop
+    if stop_event is None:
+        stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+    interval_seconds = config.poll_interval_minutes * 60
 
-    # Schedule periodic checks
-    schedule.every(config.poll_interval_minutes).minutes.do(processor.process_all)
+    # Run immediately on startup, then poll; close() drains the notifier either way
+    try:
+        logger.info("Running initial check...")
+        processor.process_all()
 
-    logger.info(f"Scheduled to check every {config.poll_interval_minutes} minutes")
-    logger.info("Press Ctrl+C to stop")
+        logger.info(f"Scheduled to check every {config.poll_interval_minutes} minutes")
+        logger.info("Press Ctrl+C to stop")
 
-    # Main loop
-    try:
-        while True:
-            schedule.run_pending()
-            time.sleep(60)
+        while not stop_event.wait(poll_delay(interval_seconds)):
+            processor.process_all()
     except KeyboardInterrupt:
-        logger.info("Shutting down gracefully...")
-        return 0
+        pass
+    finally:
+        processor.close()
+
+    logger.info("Shutting down gracefully...")
+    return 0
 
 
 if __name__ == "__main__":
@@ -1,6 +1,11 @@
 import logging
 import re
+import subprocess
+import threading
 import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import islice
 from typing import Any
 
 from src.clients.aiostreams import AIOStreamsClient
@@ -13,14 +18,57 @@ from src.storage import ProcessedMoviesStorage
 
 logger = logging.getLogger(__name__)
 
+# Seconds between Real-Debrid checks after a trigger (15s total, the previous fixed wait)
+RD_VERIFY_DELAYS = (1, 2, 4, 8)
+
+# Wanted items fetched per Radarr/Sonarr page and processed as one batch
+WANTED_PAGE_SIZE = 200
+
+# IMDB IDs embedded in release names, used to spot titles already in the RD account
+IMDB_ID_RE = re.compile(r"tt\d{7,8}")
+
+# "[Cloud]" prefix AIOStreams adds to library items; RD stores the bare filename
+CLOUD_PREFIX_RE = re.compile(r"^\[Cloud\]\s*", re.IGNORECASE)
+
+# RD torrent statuses that count as a movie already being in the account; anything else
+# (magnet_conversion, waiting_files_selection, errors) may never finish downloading
+RD_USABLE_STATUSES = frozenset(["downloaded", "downloading", "queued"])
+
+
+def iter_pages(items: Iterable[dict[str, Any]], size: int) -> Iterator[list[dict[str, Any]]]:
+    """Group an iterable of wanted items into lists of up to ``size``"""
+    iterator = iter(items)
+    while page := list(islice(iterator, size)):
+        yield page
+
 
 class MediaProcessor:
     """Main processor for handling wanted movies and TV shows"""
 
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, sleep: Callable[[float], None] | None = None):
+        """
+        Initialize the processor and the clients enabled in the config
+
+        Args:
+            config: Application configuration
+            sleep: Waits between Real-Debrid verification checks (defaults to time.sleep)
+        """
         self.config = config
+        self._sleep = sleep or time.sleep
         self.aiostreams = AIOStreamsClient(config.aiostreams_url)
-        self.storage = ProcessedMoviesStorage()
+        self.storage = ProcessedMoviesStorage(config.storage_path or None)
+        self._exclusion_patterns = self._compile_exclusion_patterns(config.excluded_stream_patterns)
+
+        # Records triggered this pass, unmonitored in one bulk request when the pass ends
+        self._unmonitor_movies: list[dict[str, Any]] = []
+        self._unmonitor_episodes: list[dict[str, Any]] = []
+        self._unmonitor_lock = threading.Lock()
+
+        # Latest RD torrent list as (monotonic time the fetch started, torrents), shared by workers
+        self._rd_torrents_cache: tuple[float, list[dict]] | None = None
+        self._rd_torrents_lock = threading.Lock()
+        # RD torrents keyed by the IMDB IDs in their filenames, rebuilt each cycle
+        self._rd_index_by_imdb: dict[str, list[dict]] = {}
 
         # Initialize clients based on configuration
         self.radarr: RadarrClient | None = None
@@ -36,7 +84,7 @@ class MediaProcessor:
         # Initialize Discord notifier if webhook URL is configured
         self.notifier: DiscordNotifier | None = None
         if config.discord_webhook_url:
-            self.notifier = DiscordNotifier(config.discord_webhook_url)
+            self.notifier = DiscordNotifier(config.discord_webhook_url, background=True)
             logger.info("Discord notifier initialized")
 
         # Initialize Real-Debrid client for stream verification if configured
@@ -45,25 +93,50 @@ class MediaProcessor:
             self.rd_client = RealDebridClient(config.realdebrid_api_key)
             logger.info("Real-Debrid client initialized for stream verification")
 
+    def close(self) -> None:
+        """Close every client session, drain pending notifications and close the storage database"""
+        for client in (self.aiostreams, self.radarr, self.sonarr, self.rd_client):
+            if client:
+                client.close()
+        if self.notifier:
+            self.notifier.close()
+        self.storage.close()
+
     def process_all(self) -> None:
         """Process both movies and TV shows"""
+        passes = []
         if self.radarr:
-            self.process_wanted_movies()
-
+            passes.append(self.process_wanted_movies)
         if self.sonarr:
-            self.process_wanted_episodes()
+            passes.append(self.process_wanted_episodes)
 
-        # Log statistics
-        stats = self.storage.get_stats()
-        logger.info(
-            f"Statistics - Total: {stats['total']}, "
-            f"Successful: {stats['successful']}, "
-            f"Failed: {stats['failed']}"
-        )
+        try:
+            self._rd_index_by_imdb = self._build_rd_imdb_index() if self.radarr else {}
+
+            if len(passes) == 1:
+                passes[0]()
+            elif passes:
+                # The Radarr and Sonarr passes are independent, so run them side by side
+                with ThreadPoolExecutor(max_workers=len(passes)) as executor:
+                    futures = [executor.submit(run_pass) for run_pass in passes]
+                for future in futures:
+                    future.result()
+        finally:
+            # Persist this cycle's results in one transaction, even if a pass failed
+            self.storage.flush()
+
+            # Log statistics
+            stats = self.storage.get_stats()
+            logger.info(
+                f"Statistics - Total: {stats['total']}, "
+                f"Successful: {stats['successful']}, "
+                f"Failed: {stats['failed']}"
+            )
 
-        # Send batched failure summary
-        if self.notifier:
-            self.notifier.send_failure_summary()
+            # Send batched success and failure summaries
+            if self.notifier:
+                self.notifier.send_success_summary()
+                self.notifier.send_failure_summary()
 
     def process_wanted_movies(self) -> None:
         """Process all wanted movies from Radarr"""
@@ -71,18 +144,38 @@ class MediaProcessor:
             return
 
         logger.info("Checking for wanted movies...")
-        wanted = self.radarr.get_wanted_movies()
-        logger.info(f"Found {len(wanted)} wanted movies")
-
-        for movie in wanted:
-            movie_id = movie["id"]
+        skip = self.storage.recent_processed_ids(self.config.retry_failed_hours)
+        found = 0
+        # Process each page as it arrives rather than loading the whole wanted list first
+        for page in iter_pages(self.radarr.iter_wanted_movies(WANTED_PAGE_SIZE), WANTED_PAGE_SIZE):
+            found += len(page)
+            pending = [movie for movie in page if movie["id"] not in skip]
+            if len(pending) < len(page):
+                logger.debug(f"Skipping {len(page) - len(pending)} recently processed movies")
+            self._process_movie_page(pending)
+        logger.info(f"Found {found} wanted movies")
+
+        self._flush_unmonitored_movies()
+
+    def _process_movie_page(self, pending: list[dict[str, Any]]) -> None:
+        """Search AIOStreams for a page of pending movies together, then process each one"""
+        if not pending:
+            return
 
-            # Skip if recently processed
-            if self.storage.should_skip(movie_id, self.config.retry_failed_hours):
-                logger.debug(f"Skipping movie {movie_id} (recently processed)")
-                continue
+        # Run the AIOStreams lookups for every pending movie concurrently up front,
+        # leaving out movies that _process_movie will complete from RD directly
+        streams_by_imdb = self.aiostreams.search_movies(
+            [
+                movie["imdbId"]
+                for movie in pending
+                if movie.get("imdbId") and movie["imdbId"] not in self._rd_index_by_imdb
+            ]
+        )
 
-            self._process_movie(movie)
+        self._run_concurrently(
+            lambda movie: self._process_movie(movie, streams_by_imdb.get(movie.get("imdbId", ""))),
+            pending,
+        )
 
     def process_wanted_episodes(self) -> None:
         """Process all wanted episodes from Sonarr"""
@@ -90,23 +183,141 @@ class MediaProcessor:
             return
 
         logger.info("Checking for wanted episodes...")
-        wanted = self.sonarr.get_wanted_episodes()
-        logger.info(f"Found {len(wanted)} wanted episodes")
+        # Series are joined client-side rather than embedded in every episode record
+        wanted = self.sonarr.iter_wanted_episodes(WANTED_PAGE_SIZE, include_series=False)
+        # Filled from one /series call, made only once a page has episodes to process
+        series_by_id: dict[int, dict[str, Any] | None] | None = None
+
+        # Episodes share the storage with movies under "episode_<id>" keys
+        skip = self.storage.recent_processed_ids(self.config.retry_failed_hours)
+        found = 0
+        for page in iter_pages(wanted, WANTED_PAGE_SIZE):
+            found += len(page)
+            pending = [episode for episode in page if f"episode_{episode['id']}" not in skip]
+            if len(pending) < len(page):
+                logger.debug(f"Skipping {len(page) - len(pending)} recently processed episodes")
+            unjoined = [episode for episode in pending if "series" not in episode]
+            if unjoined and series_by_id is None:
+                series_by_id = {series["id"]: series for series in self.sonarr.get_all_series()}
+            for episode in unjoined:
+                series_id = episode.get("seriesId")
+                if series_id is None:
+                    continue
+                # A series added after the /series call (or missed by a failed one) is looked
+                # up once by ID; a None result is kept so it isn't requested again
+                if series_id not in series_by_id:
+                    series_by_id[series_id] = self.sonarr.get_series(series_id)
+                if series_by_id[series_id]:
+                    episode["series"] = series_by_id[series_id]
+            self._process_episode_page(pending)
+        logger.info(f"Found {found} wanted episodes")
+
+        self._flush_unmonitored_episodes()
+
+    def _process_episode_page(self, pending: list[dict[str, Any]]) -> None:
+        """Search AIOStreams for a page of pending episodes together, then process each one"""
+        if not pending:
+            return
 
-        for episode in wanted:
-            episode_id = episode["id"]
+        # Run the AIOStreams lookups for every pending episode concurrently up front
+        queries = {episode["id"]: self._episode_query(episode) for episode in pending}
+        streams_by_query = self.aiostreams.search_episodes([q for q in queries.values() if q])
 
-            # Skip if recently processed (using same storage for simplicity)
-            # In production, you might want separate storage for episodes
-            storage_key = f"episode_{episode_id}"
-            if self.storage.should_skip(storage_key, self.config.retry_failed_hours):
-                logger.debug(f"Skipping episode {episode_id} (recently processed)")
-                continue
+        def process(episode: dict[str, Any]) -> bool:
+            query = queries[episode["id"]]
+            return self._process_episode(episode, streams_by_query.get(query) if query else None)
 
-            self._process_episode(episode)
+        self._run_concurrently(process, pending)
 
-    def _process_movie(self, movie: dict[str, Any]) -> bool:
-        """Process a single movie"""
+    def _flush_unmonitored_movies(self) -> None:
+        """Unmonitor every movie triggered since the last flush with a single Radarr request"""
+        with self._unmonitor_lock:
+            movies, self._unmonitor_movies = self._unmonitor_movies, []
+        if not movies or not self.radarr:
+            return
+        if self.radarr.bulk_unmonitor_movies([movie["id"] for movie in movies]):
+            logger.info(f"Unmonitored {len(movies)} movies in Radarr")
+            return
+
+        # Fall back to one PUT per movie, reusing the wanted/missing records
+        unmonitored = sum(self.radarr.unmonitor_movie(movie["id"], movie) for movie in movies)
+        logger.info(f"Unmonitored {unmonitored}/{len(movies)} movies in Radarr one at a time")
+
+    def _flush_unmonitored_episodes(self) -> None:
+        """Unmonitor every episode triggered since the last flush with a single Sonarr request"""
+        with self._unmonitor_lock:
+            episodes, self._unmonitor_episodes = self._unmonitor_episodes, []
+        if not episodes or not self.sonarr:
+            return
+        if self.sonarr.bulk_unmonitor_episodes([episode["id"] for episode in episodes]):
+            logger.info(f"Unmonitored {len(episodes)} episodes in Sonarr")
+            return
+
+        # Fall back to one PUT per episode, reusing the wanted/missing records
+        unmonitored = sum(
+            self.sonarr.unmonitor_episode(episode["id"], episode) for episode in episodes
+        )
+        logger.info(f"Unmonitored {unmonitored}/{len(episodes)} episodes in Sonarr one at a time")
+
+    def _run_concurrently(self, process, items: list[dict[str, Any]]) -> None:
+        """Run ``process(item)`` for each item on up to ``config.concurrency`` threads"""
+        if self.config.concurrency <= 1 or len(items) <= 1:
+            for item in items:
+                try:
+                    process(item)
+                except Exception as e:
+                    logger.error(f"Error processing item {item.get('id')}: {e}")
+            return
+
+        with ThreadPoolExecutor(max_workers=min(self.config.concurrency, len(items))) as executor:
+            futures = {executor.submit(process, item): item for item in items}
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    logger.error(f"Error processing item {futures[future].get('id')}: {e}")
+
+    @staticmethod
+    def _episode_query(episode: dict[str, Any]) -> tuple[str, int, int] | None:
+        """Build the (imdb_id, season, episode) AIOStreams query for an episode, if possible"""
+        imdb_id = episode.get("series", {}).get("imdbId", "")
+        if not imdb_id:
+            return None
+        return imdb_id, episode.get("seasonNumber", 0), episode.get("episodeNumber", 0)
+
+    def _fail(
+        self,
+        media_type: str,
+        title: str,
+        reason: str,
+        storage_key: int | str | None = None,
+        **details: Any,
+    ) -> bool:
+        """
+        Record a failed item and queue it for the Discord failure summary
+
+        Args:
+            media_type: "movie" or "episode"
+            title: Display title for the notification
+            reason: Why processing failed
+            storage_key: Storage key to mark as failed (None leaves storage untouched)
+            **details: Extra fields for the failure notification
+
+        Returns:
+            Always False, so callers can ``return self._fail(...)``
+        """
+        if storage_key is not None:
+            self.storage.mark_processed(storage_key, success=False)
+        if self.notifier:
+            self.notifier.collect_failure(
+                media_type=media_type, title=title, reason=reason, details=details
+            )
+        return False
+
+    def _process_movie(
+        self, movie: dict[str, Any], streams: list[dict[str, Any]] | None = None
+    ) -> bool:
+        """Process a single movie, optionally with streams already fetched from AIOStreams"""
         movie_id = movie["id"]
         title = movie["title"]
         year = movie.get("year", "")
@@ -114,31 +325,32 @@ class MediaProcessor:
 
         if not imdb_id:
             logger.warning(f"No IMDB ID for {title} ({year}), skipping")
-            if self.notifier:
-                self.notifier.collect_failure(
-                    media_type="movie",
-                    title=f"{title} ({year})",
-                    reason="No IMDB ID found",
-                    details={"movie_id": movie_id},
-                )
-            return False
+            return self._fail("movie", f"{title} ({year})", "No IMDB ID found", movie_id=movie_id)
 
         logger.info(f"Processing movie: {title} ({year}) - IMDB: {imdb_id}")
 
-        # Query AIOStreams for cached torrents
-        streams = self.aiostreams.search_movie(imdb_id)
+        rd_torrent = self._rd_index_by_imdb.get(imdb_id, [None])[0]
+        if rd_torrent:
+            logger.info(
+                f"✓ {title} already in Real-Debrid as {rd_torrent.get('filename', '')}, "
+                "skipping AIOStreams"
+            )
+            self._complete_movie(movie, {"title": rd_torrent.get("filename", "")})
+            return True
+
+        # Query AIOStreams for cached torrents unless the caller already did
+        if streams is None:
+            streams = self.aiostreams.search_movie(imdb_id)
 
         if not streams:
             logger.warning(f"No cached streams found for {title}")
-            self.storage.mark_processed(movie_id, success=False)
-            if self.notifier:
-                self.notifier.collect_failure(
-                    media_type="movie",
-                    title=f"{title} ({year})",
-                    reason="No cached streams available",
-                    details={"imdb_id": imdb_id},
-                )
-            return False
+            return self._fail(
+                "movie",
+                f"{title} ({year})",
+                "No cached streams available",
+                storage_key=movie_id,
+                imdb_id=imdb_id,
+            )
 
         attempts = min(self.config.max_retry_attempts, len(streams))
         logger.info(f"Found {len(streams)} cached streams, will try up to {attempts}")
@@ -149,7 +361,9 @@ class MediaProcessor:
                 break
             logger.info(f"Attempt {attempt + 1}/{attempts}: {stream['title']}")
             if self._is_excluded_stream(stream):
-                logger.info(f"Skipping excluded stream (not counting as attempt): {stream.get('filename') or stream.get('title')}")
+                logger.info(
+                    f"Skipping excluded stream (not counting as attempt): {stream.get('filename') or stream.get('title')}"
+                )
                 continue
             result = self._try_stream(stream, f"{title} ({year})")
             if result is None:
@@ -158,35 +372,66 @@ class MediaProcessor:
             attempt += 1
             if result:
                 logger.info(f"✓ Successfully triggered {title} via AIOStreams")
-                if self.radarr and self.radarr.unmonitor_movie(movie_id):
-                    logger.info(f"Unmonitored {title} in Radarr")
-                self.storage.mark_processed(movie_id, success=True)
-                if self.notifier:
-                    self.notifier.notify_success(
-                        media_type="movie",
-                        title=f"{title} ({year})",
-                        details={
-                            "year": year,
-                            "imdb_id": imdb_id,
-                            "quality": stream.get("quality", "Unknown"),
-                            "stream_title": stream.get("title", ""),
-                        },
-                    )
+                self._complete_movie(movie, stream)
                 return True
 
         logger.error(f"All {attempts} stream attempts failed for {title}")
-        self.storage.mark_processed(movie_id, success=False)
+        return self._fail(
+            "movie",
+            f"{title} ({year})",
+            f"All {attempts} stream attempts failed",
+            storage_key=movie_id,
+            imdb_id=imdb_id,
+        )
+
+    def _complete_movie(self, movie: dict[str, Any], stream: dict[str, Any]) -> None:
+        """Queue a movie for unmonitoring, mark it processed and collect its success"""
+        movie_id = movie["id"]
+        with self._unmonitor_lock:
+            self._unmonitor_movies.append(movie)
+        self.storage.mark_processed(movie_id, success=True)
         if self.notifier:
-            self.notifier.collect_failure(
+            year = movie.get("year", "")
+            self.notifier.notify_success(
                 media_type="movie",
-                title=f"{title} ({year})",
-                reason=f"All {attempts} stream attempts failed",
-                details={"imdb_id": imdb_id},
+                title=f"{movie['title']} ({year})",
+                details={
+                    "year": year,
+                    "imdb_id": movie.get("imdbId", ""),
+                    "quality": stream.get("quality", "Unknown"),
+                    "stream_title": stream.get("title", ""),
+                },
             )
-        return False
 
-    def _process_episode(self, episode: dict[str, Any]) -> bool:
-        """Process a single TV episode"""
+    def _build_rd_imdb_index(self) -> dict[str, list[dict]]:
+        """
+        Index the RD account's torrents by the IMDB IDs found in their filenames
+
+        Returns:
+            Dict mapping IMDB ID to its usable torrents (empty without RD or on API error)
+        """
+        if not self.rd_client:
+            return {}
+
+        torrents = self._get_rd_torrents(fetched_after=time.monotonic())
+        if not torrents:
+            return {}
+
+        index: dict[str, list[dict]] = {}
+        for torrent in torrents:
+            if torrent.get("status") not in RD_USABLE_STATUSES:
+                continue
+            filename = torrent.get("filename", "")
+            if self._is_excluded_stream({"filename": filename, "title": filename}):
+                continue
+            for imdb_id in set(IMDB_ID_RE.findall(filename)):
+                index.setdefault(imdb_id, []).append(torrent)
+        return index
+
+    def _process_episode(
+        self, episode: dict[str, Any], streams: list[dict[str, Any]] | None = None
+    ) -> bool:
+        """Process a single TV episode, optionally with streams already fetched from AIOStreams"""
         episode_id = episode["id"]
         series = episode.get("series", {})
         series_title = series.get("title", "Unknown Series")
@@ -194,58 +439,49 @@ class MediaProcessor:
         episode_number = episode.get("episodeNumber", 0)
         title = episode.get("title", "")
 
+        # Built once and used as the title for every log line and notification
+        episode_label = f"{series_title} S{season_number:02d}E{episode_number:02d}"
+        if title:
+            episode_label += f" - {title}"
+
         # Get IMDB or TVDB ID from series
         imdb_id = series.get("imdbId", "")
         tvdb_id = series.get("tvdbId", "")
 
         if not imdb_id and not tvdb_id:
             logger.warning(f"No IMDB/TVDB ID for {series_title}, skipping")
-            if self.notifier:
-                self.notifier.collect_failure(
-                    media_type="episode",
-                    title=f"{series_title} S{season_number:02d}E{episode_number:02d}",
-                    reason="No IMDB/TVDB ID found",
-                    details={"episode_id": episode_id},
-                )
-            return False
-
-        episode_label = f"{series_title} S{season_number:02d}E{episode_number:02d}"
-        if title:
-            episode_label += f" - {title}"
+            return self._fail(
+                "episode", episode_label, "No IMDB/TVDB ID found", episode_id=episode_id
+            )
 
         logger.info(f"Processing episode: {episode_label}")
 
         # For TV shows, use IMDB ID with season/episode info
         # AIOStreams format: /stream/series/{imdb_id}:{season}:{episode}.json
         if imdb_id:
-            streams = self.aiostreams.search_episode(imdb_id, season_number, episode_number)
+            if streams is None:
+                streams = self.aiostreams.search_episode(imdb_id, season_number, episode_number)
         else:
             logger.warning(f"No IMDB ID for {series_title}, cannot query AIOStreams")
-            self.storage.mark_processed(f"episode_{episode_id}", success=False)
-            if self.notifier:
-                self.notifier.collect_failure(
-                    media_type="episode",
-                    title=episode_label,
-                    reason="No IMDB ID for series",
-                    details={"series_title": series_title},
-                )
-            return False
+            return self._fail(
+                "episode",
+                episode_label,
+                "No IMDB ID for series",
+                storage_key=f"episode_{episode_id}",
+                series_title=series_title,
+            )
 
         if not streams:
             logger.warning(f"No cached streams found for {episode_label}")
-            self.storage.mark_processed(f"episode_{episode_id}", success=False)
-            if self.notifier:
-                self.notifier.collect_failure(
-                    media_type="episode",
-                    title=episode_label,
-                    reason="No cached streams available",
-                    details={
-                        "imdb_id": imdb_id,
-                        "season": season_number,
-                        "episode": episode_number,
-                    },
-                )
-            return False
+            return self._fail(
+                "episode",
+                episode_label,
+                "No cached streams available",
+                storage_key=f"episode_{episode_id}",
+                imdb_id=imdb_id,
+                season=season_number,
+                episode=episode_number,
+            )
 
         attempts = min(self.config.max_retry_attempts, len(streams))
         logger.info(f"Found {len(streams)} cached streams, will try up to {attempts}")
@@ -256,7 +492,9 @@ class MediaProcessor:
                 break
             logger.info(f"Attempt {attempt + 1}/{attempts}: {stream['title']}")
             if self._is_excluded_stream(stream):
-                logger.info(f"Skipping excluded stream (not counting as attempt): {stream.get('filename') or stream.get('title')}")
+                logger.info(
+                    f"Skipping excluded stream (not counting as attempt): {stream.get('filename') or stream.get('title')}"
+                )
                 continue
             result = self._try_stream(stream, episode_label)
             if result is None:
@@ -265,8 +503,8 @@ class MediaProcessor:
             attempt += 1
             if result:
                 logger.info(f"✓ Successfully triggered {episode_label} via AIOStreams")
-                if self.sonarr and self.sonarr.unmonitor_episode(episode_id):
-                    logger.info(f"Unmonitored {episode_label} in Sonarr")
+                with self._unmonitor_lock:
+                    self._unmonitor_episodes.append(episode)
                 self.storage.mark_processed(f"episode_{episode_id}", success=True)
                 if self.notifier:
                     self.notifier.notify_success(
@@ -285,35 +523,40 @@ class MediaProcessor:
                 return True
 
         logger.error(f"All {attempts} stream attempts failed for {episode_label}")
-        self.storage.mark_processed(f"episode_{episode_id}", success=False)
-        if self.notifier:
-            self.notifier.collect_failure(
-                media_type="episode",
-                title=episode_label,
-                reason=f"All {attempts} stream attempts failed",
-                details={
-                    "imdb_id": imdb_id,
-                    "season": season_number,
-                    "episode": episode_number,
-                },
-            )
-        return False
+        return self._fail(
+            "episode",
+            episode_label,
+            f"All {attempts} stream attempts failed",
+            storage_key=f"episode_{episode_id}",
+            imdb_id=imdb_id,
+            season=season_number,
+            episode=episode_number,
+        )
+
+    @staticmethod
+    def _compile_exclusion_patterns(patterns: list[str]) -> list[re.Pattern[str]]:
+        """Compile the configured exclusion patterns once, dropping invalid ones"""
+        compiled = []
+        for pattern in patterns:
+            try:
+                compiled.append(re.compile(pattern))
+            except re.error as e:
+                logger.warning(f"Invalid exclusion pattern '{pattern}': {e}")
+        return compiled
 
     def _is_excluded_stream(self, stream: dict[str, Any]) -> bool:
         """Return True if the stream matches any configured exclusion pattern."""
-        if not self.config.excluded_stream_patterns:
+        if not self._exclusion_patterns:
             return False
         candidates = [c for c in [stream.get("filename", ""), stream.get("title", "")] if c]
-        logger.debug(f"Checking exclusion patterns {self.config.excluded_stream_patterns} against: {candidates}")
-        for pattern in self.config.excluded_stream_patterns:
-            try:
-                compiled = re.compile(pattern)
-                for candidate in candidates:
-                    if compiled.search(candidate):
-                        logger.debug(f"Exclusion pattern '{pattern}' matched: '{candidate}'")
-                        return True
-            except re.error as e:
-                logger.warning(f"Invalid exclusion pattern '{pattern}': {e}")
+        logger.debug(
+            f"Checking exclusion patterns {self.config.excluded_stream_patterns} against: {candidates}"
+        )
+        for compiled in self._exclusion_patterns:
+            for candidate in candidates:
+                if compiled.search(candidate):
+                    logger.debug(f"Exclusion pattern '{compiled.pattern}' matched: '{candidate}'")
+                    return True
         return False
 
     def _try_stream(self, stream: dict[str, Any], label: str) -> bool | None:
@@ -346,54 +589,99 @@ class MediaProcessor:
             return True
 
         # Strip [Cloud] prefix added by AIOStreams for library items — RD stores the bare filename
-        clean_filename = re.sub(r"^\[Cloud\]\s*", "", filename, flags=re.IGNORECASE)
+        clean_filename = CLOUD_PREFIX_RE.sub("", filename)
         if clean_filename != filename:
             logger.info(f"Stripped [Cloud] prefix: '{filename}' -> '{clean_filename}'")
 
-        logger.info(f"Waiting 15s then verifying in Real-Debrid for: {clean_filename}")
-        time.sleep(15)
-
-        torrents = self.rd_client.list_torrents()
-        if torrents is None:
-            logger.warning("RD API error during verification, assuming HEAD trigger succeeded")
-            return True
-
-        # Find the matching torrent by filename, then fetch its full info to check original_filename
-        logger.debug(f"Checking {len(torrents)} RD torrents for match against: {clean_filename}")
+        logger.info(f"Verifying in Real-Debrid (up to 15s) for: {clean_filename}")
         filename_lower = clean_filename.lower()
-        for torrent in torrents:
-            torrent_filename = torrent.get("filename", "")
-            torrent_filename_lower = torrent_filename.lower()
-            if filename_lower in torrent_filename_lower or torrent_filename_lower in filename_lower:
-                torrent_id = torrent.get("id")
-                # Fetch full info to get original_filename (not available in list endpoint)
-                torrent_info = self.rd_client.get_torrent_info(torrent_id) if torrent_id else None
-                original_filename = torrent_info.get("original_filename", "") if torrent_info else ""
-                logger.debug(f"RD torrent '{torrent_filename}' | original_filename: '{original_filename}'")
-
-                # Check both the display filename and the original torrent folder name
-                check_name = original_filename or torrent_filename
-                if self._is_excluded_stream({"filename": check_name, "title": check_name}):
-                    logger.warning(
-                        f"Excluded RD torrent found: original='{original_filename}' "
-                        f"display='{torrent_filename}' — deleting from RD (not counting as attempt)"
-                    )
-                    if torrent_id:
-                        self.rd_client.delete_torrent(torrent_id)
-                    return None
-                logger.info(f"Verified in Real-Debrid: {torrent_filename} (original: {original_filename or 'same'})")
+        # Check early and back off, rather than always waiting the full 15s
+        for delay in RD_VERIFY_DELAYS:
+            # Any list fetched while we sleep (e.g. by another worker) is fresh enough
+            checked_at = time.monotonic()
+            self._sleep(delay)
+            torrents = self._get_rd_torrents(fetched_after=checked_at)
+            if torrents is None:
+                logger.warning("RD API error during verification, assuming HEAD trigger succeeded")
                 return True
 
-        logger.warning(
-            f"Not found in Real-Debrid after trigger: {clean_filename}\n"
-            f"  RD has {len(torrents)} torrents. First 5 filenames:\n"
-            + "\n".join(f"    - {t.get('filename', '')}" for t in torrents[:5])
+            logger.debug(
+                f"Checking {len(torrents)} RD torrents for match against: {clean_filename}"
+            )
+            torrent = self._find_rd_torrent(torrents, filename_lower)
+            if torrent:
+                break
+        else:
+            logger.warning(
+                f"Not found in Real-Debrid after trigger: {clean_filename}\n"
+                f"  RD has {len(torrents)} torrents. First 5 filenames:\n"
+                + "\n".join(f"    - {t.get('filename', '')}" for t in torrents[:5])
+            )
+            return False
+
+        # Fetch full info to get original_filename (not available in list endpoint)
+        torrent_filename = torrent.get("filename", "")
+        torrent_id = torrent.get("id")
+        torrent_info = self.rd_client.get_torrent_info(torrent_id) if torrent_id else None
+        original_filename = torrent_info.get("original_filename", "") if torrent_info else ""
+        logger.debug(f"RD torrent '{torrent_filename}' | original_filename: '{original_filename}'")
+
+        # Check both the display filename and the original torrent folder name
+        check_name = original_filename or torrent_filename
+        if self._is_excluded_stream({"filename": check_name, "title": check_name}):
+            logger.warning(
+                f"Excluded RD torrent found: original='{original_filename}' "
+                f"display='{torrent_filename}' — deleting from RD (not counting as attempt)"
+            )
+            if torrent_id:
+                self.rd_client.delete_torrent(torrent_id)
+            return None
+        logger.info(
+            f"Verified in Real-Debrid: {torrent_filename} (original: {original_filename or 'same'})"
         )
-        return False
+        return True
+
+    def _get_rd_torrents(self, fetched_after: float) -> list[dict] | None:
+        """
+        Get the RD torrent list, reusing the last fetch if it started after ``fetched_after``
+
+        Args:
+            fetched_after: time.monotonic() value the list must be newer than
+
+        Returns:
+            List of torrent dicts, or None if the RD API request failed
+        """
+        with self._rd_torrents_lock:
+            if self._rd_torrents_cache and self._rd_torrents_cache[0] > fetched_after:
+                return self._rd_torrents_cache[1]
+
+            started = time.monotonic()
+            torrents = self.rd_client.list_torrents()
+            if torrents is not None:
+                self._rd_torrents_cache = (started, torrents)
+            return torrents
+
+    @staticmethod
+    def _find_rd_torrent(torrents: list[dict], filename_lower: str) -> dict | None:
+        """Find the RD torrent for a stream filename: exact name first, then substring match"""
+        by_name: dict[str, dict] = {}
+        for torrent in torrents:
+            # Keep the first torrent for duplicate names, as the linear scan did
+            by_name.setdefault(torrent.get("filename", "").lower(), torrent)
+        if filename_lower in by_name:
+            return by_name[filename_lower]
+
+        for name, torrent in by_name.items():
+            if name and (filename_lower in name or name in filename_lower):
+                return torrent
+        return None
 
     def _trigger_aiostreams_download(self, url: str, title: str) -> bool:
         """
-        Trigger AIOStreams to add torrent to Real-Debrid by streaming the URL
+        Trigger AIOStreams to add torrent to Real-Debrid by requesting the URL
+
+        Uses curl rather than the requests session for its Cloudflare-compatible TLS
+        fingerprint; only the first byte is requested.
 
         Args:
             url: AIOStreams playback URL
@@ -402,8 +690,6 @@ class MediaProcessor:
         Returns:
             True if successfully triggered, False otherwise
         """
-        import subprocess
-
         try:
             logger.info(f"Triggering AIOStreams download via curl to: {url[:100]}...")
             result = subprocess.run(
@@ -417,6 +703,9 @@ class MediaProcessor:
                     "-L",
                     "--max-time",
                     "30",
+                    # Resolving the playback URL is what adds the torrent; skip the file body
+                    "--range",
+                    "0-0",
                     "-A",
                     "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
                     "-H",
@@ -429,7 +718,9 @@ class MediaProcessor:
             )
             status = int(result.stdout.strip())
             if status >= 400:
-                logger.error(f"AIOStreams download trigger failed with HTTP {status}: {url[:100]}...")
+                logger.error(
+                    f"AIOStreams download trigger failed with HTTP {status}: {url[:100]}..."
+                )
                 return False
             logger.info(f"Successfully triggered download for {title}")
             return True
@@ -1,26 +1,102 @@
 import logging
+import math
+import queue
+import threading
+import time
+from collections.abc import Callable
 from datetime import UTC, datetime
 from typing import Any
 
+import orjson
+import requests
+
+from src.clients.http import create_session
+
 logger = logging.getLogger(__name__)
 
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Discord accepts at most 10 embeds per webhook message
+MAX_EMBEDS_PER_MESSAGE = 10
+
+# Discord limits: 6000 chars total, 4096 chars per field (description)
+# Reserve space for title, timestamp overhead, and truncation message
+MAX_DESCRIPTION_LENGTH = 4000  # Leave buffer for truncation message
+MAX_TOTAL_LENGTH = 5800  # Leave buffer for title and other fields
+TRUNCATION_MESSAGE_LENGTH = 50  # Estimated length of "...and X more items" message
+# The description must fit both limits, so only the smaller one matters per line
+DESCRIPTION_BUDGET = min(MAX_DESCRIPTION_LENGTH, MAX_TOTAL_LENGTH) - TRUNCATION_MESSAGE_LENGTH
+# Per-line caps so one oversized title or reason can't use up the whole budget
+MAX_LINE_TITLE_LENGTH = 150
+MAX_LINE_REASON_LENGTH = 200
+
+# Wait used when a 429 has no usable X-RateLimit-Reset-After, and the most we'll ever wait
+DEFAULT_RATE_LIMIT_WAIT = 1.0
+MAX_RATE_LIMIT_WAIT = 60.0
+
 
 class DiscordNotifier:
     """Discord webhook notifier for media processing events"""
 
-    def __init__(self, webhook_url: str | None):
+    def __init__(self, webhook_url: str | None, background: bool = False):
         """
         Initialize Discord notifier
 
         Args:
             webhook_url: Discord webhook URL (None to disable notifications)
+            background: Post webhooks from a worker thread instead of the caller's thread
         """
         self.webhook_url = webhook_url
-        self.failures: list[dict[str, Any]] = []
+        self.background = background
+        self.successes: list[dict[str, Any]] = []
+        # Guards successes, which the background worker refills when a batch fails to send
+        self._successes_lock = threading.Lock()
+        # Failures bucketed by media type as they are collected
+        self._failures_by_type: dict[str, list[dict[str, Any]]] = {"movie": [], "episode": []}
+        # Guards the buckets, which the background worker refills when a summary fails to send
+        self._failures_lock = threading.Lock()
+        # Keep-alive connection to Discord reused by every webhook
+        self.session = create_session(JSON_HEADERS)
+        # Messages for the worker, each with a callback to run if it cannot be sent
+        self._queue: queue.Queue[tuple[list[dict[str, Any]], Callable[[], None] | None]] = (
+            queue.Queue()
+        )
+        self._worker: threading.Thread | None = None
+        self._worker_lock = threading.Lock()
+
+    @property
+    def failures(self) -> list[dict[str, Any]]:
+        """All collected failures, movies first"""
+        return [failure for bucket in self._failures_by_type.values() for failure in bucket]
+
+    def _failure_count(self) -> int:
+        """Number of collected failures across every media type"""
+        return sum(len(bucket) for bucket in self._failures_by_type.values())
+
+    def _clear_failures(self) -> None:
+        """Empty every failure bucket"""
+        for bucket in self._failures_by_type.values():
+            bucket.clear()
+
+    def _restore_failures(self, failures: dict[str, list[dict[str, Any]]]) -> None:
+        """Put failures from an unsent summary back ahead of any collected since"""
+        with self._failures_lock:
+            for media_type, items in failures.items():
+                self._failures_by_type.setdefault(media_type, [])[:0] = items
+        logger.info(
+            f"Kept {sum(len(items) for items in failures.values())} failures "
+            "for the next Discord summary"
+        )
+
+    def _restore_successes(self, batch: list[dict[str, Any]]) -> None:
+        """Put an unsent success batch back for the next summary, keeping its timestamps"""
+        with self._successes_lock:
+            self.successes.extend(batch)
+        logger.info(f"Kept {len(batch)} successes for the next Discord summary")
 
     def notify_success(self, media_type: str, title: str, details: dict[str, Any]) -> None:
         """
-        Send immediate success notification to Discord
+        Collect success notification for the batched success summary
 
         Args:
             media_type: Type of media ("movie" or "episode")
@@ -31,9 +107,45 @@ class DiscordNotifier:
             return
 
         embed = self._format_success_embed(media_type, title, details)
-        success = self._send_webhook(embed)
-        if success:
-            logger.info(f"Sent Discord notification for {media_type}: {title}")
+        with self._successes_lock:
+            self.successes.append(embed)
+
+    def send_success_summary(self) -> None:
+        """
+        Send collected success embeds to Discord, up to 10 per message, and clear them
+        """
+        if not self.webhook_url or not self.successes:
+            return
+
+        # Stamp the whole summary with one clock read rather than one per embed
+        timestamp = datetime.now(UTC).isoformat()
+
+        if self.background:
+            with self._successes_lock:
+                successes, self.successes = self.successes, []
+            for embed in successes:
+                embed.setdefault("timestamp", timestamp)
+            for start in range(0, len(successes), MAX_EMBEDS_PER_MESSAGE):
+                batch = successes[start : start + MAX_EMBEDS_PER_MESSAGE]
+                # The worker hands the batch back if it cannot be sent
+                self._enqueue(batch, on_failure=lambda batch=batch: self._restore_successes(batch))
+            logger.info(f"Queued Discord success notifications for {len(successes)} items")
+            return
+
+        for embed in self.successes:
+            embed.setdefault("timestamp", timestamp)
+
+        sent = 0
+        for start in range(0, len(self.successes), MAX_EMBEDS_PER_MESSAGE):
+            batch = self.successes[start : start + MAX_EMBEDS_PER_MESSAGE]
+            if not self._send_embeds(batch):
+                break
+            sent += len(batch)
+
+        if sent:
+            logger.info(f"Sent Discord success notifications for {sent} items")
+        # Keep anything that failed to send for the next cycle
+        del self.successes[:sent]
 
     def _format_success_embed(
         self, media_type: str, title: str, details: dict[str, Any]
@@ -47,42 +159,39 @@ class DiscordNotifier:
             details: Additional details
 
         Returns:
-            Discord embed dict
+            Discord embed dict, without a timestamp (added by send_success_summary)
         """
-        embed = {
-            "title": f"✓ {title}",
-            "description": f"Successfully added {media_type}",
-            "color": 0x00FF00,  # Green
-            "fields": [],
-            "timestamp": datetime.now(UTC).isoformat(),
-        }
+        fields: list[dict[str, Any]] = []
+        append = fields.append
+        get = details.get
 
         # Add episode-specific fields
         if media_type == "episode":
-            season = details.get("season")
-            episode = details.get("episode")
+            season = get("season")
+            episode = get("episode")
             if season is not None and episode is not None:
-                embed["fields"].append(
-                    {"name": "Episode", "value": f"S{season:02d}E{episode:02d}", "inline": True}
-                )
-            if episode_title := details.get("episode_title"):
-                embed["fields"].append(
-                    {"name": "Episode Title", "value": episode_title, "inline": True}
-                )
+                append({"name": "Episode", "value": f"S{season:02d}E{episode:02d}", "inline": True})
+            if episode_title := get("episode_title"):
+                append({"name": "Episode Title", "value": episode_title, "inline": True})
 
         # Add quality if available
-        if quality := details.get("quality"):
-            embed["fields"].append({"name": "Quality", "value": quality, "inline": True})
+        if quality := get("quality"):
+            append({"name": "Quality", "value": quality, "inline": True})
 
         # Add IMDB ID if available
-        if imdb_id := details.get("imdb_id"):
-            embed["fields"].append({"name": "IMDB", "value": imdb_id, "inline": True})
+        if imdb_id := get("imdb_id"):
+            append({"name": "IMDB", "value": imdb_id, "inline": True})
 
         # Add stream title if available
-        if stream_title := details.get("stream_title"):
-            embed["fields"].append({"name": "Stream", "value": stream_title, "inline": False})
+        if stream_title := get("stream_title"):
+            append({"name": "Stream", "value": stream_title, "inline": False})
 
-        return embed
+        return {
+            "title": f"✓ {title}",
+            "description": f"Successfully added {media_type}",
+            "color": 0x00FF00,  # Green
+            "fields": fields,
+        }
 
     def collect_failure(
         self, media_type: str, title: str, reason: str, details: dict[str, Any]
@@ -99,9 +208,9 @@ class DiscordNotifier:
         if not self.webhook_url:
             return
 
-        self.failures.append(
-            {"media_type": media_type, "title": title, "reason": reason, "details": details}
-        )
+        failure = {"media_type": media_type, "title": title, "reason": reason, "details": details}
+        with self._failures_lock:
+            self._failures_by_type.setdefault(media_type, []).append(failure)
 
     def send_failure_summary(self) -> None:
         """
@@ -110,132 +219,174 @@ class DiscordNotifier:
         if not self.webhook_url:
             return
 
-        if not self.failures:
+        count = self._failure_count()
+        if not count:
+            return
+
+        if self.background:
+            with self._failures_lock:
+                embed = self._format_failure_summary_embed()
+                # Hand this cycle's failures to the message; the worker restores them if it fails
+                sent_failures = {
+                    media_type: list(bucket)
+                    for media_type, bucket in self._failures_by_type.items()
+                }
+                self._clear_failures()
+            self._enqueue([embed], on_failure=lambda: self._restore_failures(sent_failures))
+            logger.info(f"Queued Discord failure summary for {count} items")
             return
 
         embed = self._format_failure_summary_embed()
+
         success = self._send_webhook(embed)
         if success:
-            logger.info(f"Sent Discord failure summary for {len(self.failures)} items")
-            self.failures.clear()
+            logger.info(f"Sent Discord failure summary for {count} items")
+            self._clear_failures()
 
-    def _format_failure_summary_embed(self) -> dict[str, Any]:
+    def _format_failure_summary_embed(self, timestamp: str | None = None) -> dict[str, Any]:
         """
         Format batched failures as Discord embed, grouped by media type.
         Truncates to stay within Discord's 6000 char total and 4096 char field limits.
 
+        Args:
+            timestamp: ISO timestamp for the embed (defaults to now)
+
         Returns:
             Discord embed dict
         """
-        total_count = len(self.failures)
+        total_count = self._failure_count()
         embed = {
             "title": f"✗ Failed to process {total_count} items",
             "description": "",
             "color": 0xFF0000,  # Red
-            "timestamp": datetime.now(UTC).isoformat(),
+            "timestamp": timestamp or datetime.now(UTC).isoformat(),
         }
 
-        # Discord limits: 6000 chars total, 4096 chars per field (description)
-        # Reserve space for title, timestamp overhead, and truncation message
-        MAX_DESCRIPTION_LENGTH = 4000  # Leave buffer for truncation message
-        MAX_TOTAL_LENGTH = 5800  # Leave buffer for title and other fields
-        TRUNCATION_MESSAGE_LENGTH = 50  # Estimated length of "...and X more items" message
-
-        # Group failures by media type
-        movies = [f for f in self.failures if f["media_type"] == "movie"]
-        episodes = [f for f in self.failures if f["media_type"] == "episode"]
-
-        description_parts = []
-        truncated_movies = 0
-        truncated_episodes = 0
+        # Already grouped by collect_failure
+        movies = self._failures_by_type["movie"]
+        episodes = self._failures_by_type["episode"]
 
-        def get_current_length():
-            """Helper to get current accumulated description length"""
-            return len("".join(description_parts))
+        description_parts: list[str] = []
+        # Running length of description_parts, so limits are checked without re-joining
+        description_length = 0
 
-        # Format movies section
         if movies:
-            movie_label = "Movies" if len(movies) > 1 else "Movie"
-            section_header = f"**{movie_label} ({len(movies)})**\n"
-            section_content = []
-
-            for failure in movies:
-                title = failure["title"]
-                reason = failure["reason"]
-                line = f"• {title} - {reason}\n"
-
-                # Calculate what total length would be with this line
-                current_total = get_current_length()
-                new_total = (
-                    current_total
-                    + len(section_header)
-                    + len("".join(section_content))
-                    + len(line)
-                    + TRUNCATION_MESSAGE_LENGTH
-                    + 2  # for trailing "\n"
-                )
-
-                # Check both total and field limits
-                if new_total > MAX_TOTAL_LENGTH or new_total > MAX_DESCRIPTION_LENGTH:
-                    truncated_movies = len(movies) - len(section_content)
-                    break
-
-                section_content.append(line)
-
-            # Add the movies section
-            description_parts.append(section_header)
-            description_parts.extend(section_content)
-
-            if truncated_movies > 0:
-                description_parts.append(f"_...and {truncated_movies} more movies_\n")
-
+            # Reserve 2 for the blank line separating movies from episodes
+            parts, length = self._render_failure_section(
+                movies, "Movie", "Movies", description_length, reserve=2
+            )
+            description_parts.extend(parts)
             description_parts.append("\n")
+            description_length += length + 1
 
-        # Format episodes section
         if episodes:
-            episode_label = "Episodes" if len(episodes) > 1 else "Episode"
-            section_header = f"**{episode_label} ({len(episodes)})**\n"
-            section_content = []
-
-            for failure in episodes:
-                title = failure["title"]
-                reason = failure["reason"]
-                details = failure["details"]
-                # Add episode info if available
-                season = details.get("season")
-                episode_num = details.get("episode")
-                if season is not None and episode_num is not None:
-                    title = f"{title} S{season:02d}E{episode_num:02d}"
-                line = f"• {title} - {reason}\n"
-
-                # Calculate what total length would be with this line
-                current_total = get_current_length()
-                new_total = (
-                    current_total
-                    + len(section_header)
-                    + len("".join(section_content))
-                    + len(line)
-                    + TRUNCATION_MESSAGE_LENGTH
-                )
+            # Episode titles already carry their SxxEyy label
+            parts, length = self._render_failure_section(
+                episodes, "Episode", "Episodes", description_length, reserve=0
+            )
+            description_parts.extend(parts)
 
-                # Check both total and field limits
-                if new_total > MAX_TOTAL_LENGTH or new_total > MAX_DESCRIPTION_LENGTH:
-                    truncated_episodes = len(episodes) - len(section_content)
-                    break
+        # Combine all parts
+        embed["description"] = "".join(description_parts).rstrip()
 
-                section_content.append(line)
+        return embed
 
-            # Add the episodes section
-            description_parts.append(section_header)
-            description_parts.extend(section_content)
+    @staticmethod
+    def _rate_limit_wait(reset_after: str | None) -> float:
+        """
+        Seconds to wait out a 429, tolerating a missing or malformed reset header
 
-            if truncated_episodes > 0:
-                description_parts.append(f"_...and {truncated_episodes} more episodes_\n")
+        Args:
+            reset_after: X-RateLimit-Reset-After header value, if any
 
-        # Combine all parts
-        embed["description"] = "".join(description_parts).rstrip()
+        Returns:
+            The header's wait clamped to MAX_RATE_LIMIT_WAIT, or DEFAULT_RATE_LIMIT_WAIT
+        """
+        try:
+            wait = float(reset_after)
+        except (TypeError, ValueError):
+            return DEFAULT_RATE_LIMIT_WAIT
+        if not math.isfinite(wait) or wait < 0:
+            return DEFAULT_RATE_LIMIT_WAIT
+        return min(wait, MAX_RATE_LIMIT_WAIT)
+
+    @staticmethod
+    def _render_failure_section(
+        failures: list[dict[str, Any]], singular: str, plural: str, used: int, reserve: int
+    ) -> tuple[list[str], int]:
+        """
+        Render one media type's section of the failure summary within the length budget
 
-        return embed
+        Args:
+            failures: Failures of a single media type
+            singular: Section label for one failure (e.g. "Movie")
+            plural: Section label for several failures (e.g. "Movies")
+            used: Description length already taken by earlier sections
+            reserve: Characters to keep free after this section
+
+        Returns:
+            Tuple of (section parts, total length of those parts)
+        """
+        label = plural if len(failures) > 1 else singular
+        section_header = f"**{label} ({len(failures)})**\n"
+        header_length = len(section_header)
+        parts = [section_header]
+        section_length = 0
+
+        for index, failure in enumerate(failures):
+            title = failure["title"][:MAX_LINE_TITLE_LENGTH]
+            reason = failure["reason"][:MAX_LINE_REASON_LENGTH]
+            line = f"• {title} - {reason}\n"
+
+            # Check both total and field limits
+            if used + header_length + section_length + len(line) + reserve > DESCRIPTION_BUDGET:
+                truncation_line = f"_...and {len(failures) - index} more {plural.lower()}_\n"
+                parts.append(truncation_line)
+                section_length += len(truncation_line)
+                break
+
+            parts.append(line)
+            section_length += len(line)
+
+        return parts, header_length + section_length
+
+    def _enqueue(
+        self, embeds: list[dict[str, Any]], on_failure: Callable[[], None] | None = None
+    ) -> None:
+        """Queue one webhook message for the background worker, starting it if needed."""
+        with self._worker_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(
+                    target=self._webhook_worker, name="discord-webhook", daemon=True
+                )
+                self._worker.start()
+        self._queue.put((embeds, on_failure))
+
+    def _webhook_worker(self) -> None:
+        """Post queued messages one at a time; rate-limit waits happen here, off the poll loop."""
+        while True:
+            embeds, on_failure = self._queue.get()
+            sent = False
+            try:
+                sent = self._send_embeds(embeds)
+                if not sent:
+                    logger.error(f"Failed to send Discord message with {len(embeds)} embeds")
+            except Exception as e:
+                logger.error(f"Unexpected error in Discord webhook worker: {e}")
+            finally:
+                if not sent and on_failure is not None:
+                    on_failure()
+                self._queue.task_done()
+
+    def flush(self) -> None:
+        """Block until every queued webhook message has been sent"""
+        if self._worker is not None:
+            self._queue.join()
+
+    def close(self) -> None:
+        """Drain the background queue, then close the webhook session"""
+        self.flush()
+        self.session.close()
 
     def _send_webhook(self, embed: dict[str, Any]) -> bool:
         """
@@ -247,12 +398,34 @@ class DiscordNotifier:
         Returns:
             True if successful, False otherwise
         """
-        import requests
+        return self._send_embeds([embed])
 
+    def _send_embeds(self, embeds: list[dict[str, Any]], max_attempts: int = 3) -> bool:
+        """
+        Send up to 10 embeds in one webhook message, waiting out 429 rate limits
+
+        Args:
+            embeds: Discord embed dicts
+            max_attempts: Maximum attempts when Discord responds with 429
+
+        Returns:
+            True if successful, False otherwise
+        """
+        # Serialized once and reused for every rate-limit retry
+        payload = orjson.dumps({"embeds": embeds})
         try:
-            response = requests.post(self.webhook_url, json={"embeds": [embed]}, timeout=10)
-            response.raise_for_status()
-            return True
+            for _ in range(max_attempts):
+                response = self.session.post(self.webhook_url, data=payload, timeout=10)
+                if response.status_code != 429:
+                    response.raise_for_status()
+                    return True
+
+                retry_after = self._rate_limit_wait(response.headers.get("X-RateLimit-Reset-After"))
+                logger.warning(f"Discord rate limited, retrying in {retry_after:.1f}s")
+                time.sleep(retry_after)
+
+            logger.error(f"Discord webhook still rate limited after {max_attempts} attempts")
+            return False
         except requests.HTTPError as e:
             logger.error(f"HTTP error sending Discord webhook: {e}")
             return False
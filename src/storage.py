@@ -1,46 +1,150 @@
-from datetime import datetime
+import logging
+import sqlite3
+import threading
+from datetime import datetime, timedelta
 from typing import Any
 
+logger = logging.getLogger(__name__)
+
 
 class ProcessedMoviesStorage:
-    """In-memory storage for tracking processed movies"""
+    """Storage for tracking processed movies, optionally persisted to SQLite"""
 
-    def __init__(self):
-        self.processed: dict[int, dict[str, Any]] = {}
+    def __init__(self, db_path: str | None = None):
+        """
+        Initialize storage
 
-    def mark_processed(self, movie_id: int, success: bool) -> None:
+        Args:
+            db_path: SQLite file to persist entries to (None keeps them in memory only);
+                writes are buffered until flush(). If it can't be opened, entries are
+                kept in memory only
+        """
+        self.processed: dict[int | str, dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        # Keys by outcome, kept by mark_processed so skips and stats never scan every entry
+        self._success_ids: set[int | str] = set()
+        self._failed_ids: set[int | str] = set()
+        self._db: sqlite3.Connection | None = None
+        # Rows written by mark_processed, committed together by flush()
+        self._pending: list[tuple[str, float, int]] = []
+        if db_path:
+            try:
+                self._open(db_path)
+            except sqlite3.Error as e:
+                logger.error(f"Error opening {db_path}, keeping processed entries in memory: {e}")
+                if self._db is not None:
+                    self._db.close()
+                    self._db = None
+                self.processed.clear()
+                self._success_ids.clear()
+                self._failed_ids.clear()
+
+    def _open(self, db_path: str) -> None:
+        """Open the SQLite database and load previously processed entries."""
+        # The movie and episode passes run on separate threads; writes share the lock.
+        # Autocommit mode, so flush() controls its own BEGIN/COMMIT
+        self._db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        # WAL with NORMAL sync keeps the once-per-cycle commit cheap (no fsync per commit)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS processed "
+            "(key TEXT PRIMARY KEY, time REAL NOT NULL, success INTEGER NOT NULL)"
+        )
+        for key, timestamp, success in self._db.execute("SELECT key, time, success FROM processed"):
+            # Movie IDs are ints, episode keys are "episode_<id>" strings
+            restored_key = int(key) if key.isdigit() else key
+            self.processed[restored_key] = {
+                "time": datetime.fromtimestamp(timestamp),
+                "success": bool(success),
+            }
+            (self._success_ids if success else self._failed_ids).add(restored_key)
+        logger.info(f"Loaded {len(self.processed)} processed entries from {db_path}")
+
+    def mark_processed(self, movie_id: int | str, success: bool) -> None:
         """
         Mark a movie as processed
 
         Args:
-            movie_id: Radarr movie ID
+            movie_id: Radarr movie ID (or "episode_<id>" key for Sonarr episodes)
             success: Whether processing was successful
         """
-        self.processed[movie_id] = {"time": datetime.now(), "success": success}
+        entry = {"time": datetime.now(), "success": success}
+        with self._lock:
+            if success:
+                self._success_ids.add(movie_id)
+                self._failed_ids.discard(movie_id)
+            else:
+                self._failed_ids.add(movie_id)
+                self._success_ids.discard(movie_id)
+            self.processed[movie_id] = entry
+            if self._db is not None:
+                self._pending.append((str(movie_id), entry["time"].timestamp(), int(success)))
 
-    def should_skip(self, movie_id: int, retry_hours: int = 24) -> bool:
+    def flush(self) -> None:
+        """Write every buffered entry to SQLite in a single transaction"""
+        with self._lock:
+            if self._db is None or not self._pending:
+                return
+            rows, self._pending = self._pending, []
+            try:
+                self._db.execute("BEGIN")
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO processed (key, time, success) VALUES (?, ?, ?)", rows
+                )
+                self._db.execute("COMMIT")
+            except sqlite3.Error as e:
+                logger.error(f"Error persisting {len(rows)} processed entries: {e}")
+                if self._db.in_transaction:
+                    self._db.execute("ROLLBACK")
+                # Keep the rows (ahead of any newer ones) for the next flush
+                self._pending = rows + self._pending
+
+    def should_skip(
+        self, movie_id: int | str, retry_hours: int = 24, *, now: datetime | None = None
+    ) -> bool:
         """
         Check if a movie should be skipped
 
         Args:
             movie_id: Radarr movie ID
             retry_hours: Hours to wait before retrying failed movies
+            now: Reference time, so a caller checking many IDs reads the clock once
 
         Returns:
             True if movie should be skipped, False otherwise
         """
-        if movie_id not in self.processed:
+        entry = self.processed.get(movie_id)
+        if entry is None:
             return False
 
-        entry = self.processed[movie_id]
-
         # Always skip successful movies
-        if entry["success"]:
+        if movie_id in self._success_ids:
             return True
 
         # Skip recent failures
-        hours_since = (datetime.now() - entry["time"]).total_seconds() / 3600
-        return hours_since < retry_hours
+        cutoff = (now or datetime.now()) - timedelta(hours=retry_hours)
+        return entry["time"] > cutoff
+
+    def recent_processed_ids(
+        self, retry_hours: int = 24, *, now: datetime | None = None
+    ) -> set[int | str]:
+        """
+        Get every key that should_skip would currently skip, in one pass
+
+        Args:
+            retry_hours: Hours to wait before retrying failed movies
+            now: Reference time (defaults to the current time)
+
+        Returns:
+            Set of successful keys plus keys that failed within retry_hours
+        """
+        cutoff = (now or datetime.now()) - timedelta(hours=retry_hours)
+        with self._lock:
+            # Successes are always skipped; only failures need their time checked
+            skip = set(self._success_ids)
+            skip.update(key for key in self._failed_ids if self.processed[key]["time"] > cutoff)
+        return skip
 
     def get_stats(self) -> dict[str, int]:
         """
@@ -49,7 +153,17 @@ class ProcessedMoviesStorage:
         Returns:
             Dict with total, successful, and failed counts
         """
-        successful = sum(1 for entry in self.processed.values() if entry["success"])
-        failed = sum(1 for entry in self.processed.values() if not entry["success"])
+        with self._lock:
+            return {
+                "total": len(self.processed),
+                "successful": len(self._success_ids),
+                "failed": len(self._failed_ids),
+            }
 
-        return {"total": len(self.processed), "successful": successful, "failed": failed}
+    def close(self) -> None:
+        """Flush buffered entries and close the SQLite connection if persistence is enabled"""
+        self.flush()
+        if self._db is not None:
+            with self._lock:
+                self._db.close()
+                self._db = None
@@ -0,0 +1,9 @@
+import time
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _no_sleep(monkeypatch):
+    """Make time.sleep a no-op so retry and backoff waits never slow the suite"""
+    monkeypatch.setattr(time, "sleep", lambda *_: None)
@@ -1,5 +1,6 @@
 from unittest.mock import Mock, patch
 
+import orjson
 import pytest
 
 from src.clients.aiostreams import AIOStreamsClient
@@ -15,39 +16,41 @@ def test_aiostreams_client_initialization(aio_client):
     assert aio_client.url == "http://localhost:8080"
 
 
-@patch("requests.get")
+@patch("requests.Session.get")
 def test_search_movie_with_streams(mock_get, aio_client):
     """Test searching for a movie returns streams in the new v2 format"""
     mock_response = Mock()
-    mock_response.json.return_value = {
-        "streams": [
-            {
-                "name": "2160p BluRay REMUX ",
-                "description": "HDR10+ | DV | IMAX  | Atmos | TrueHD \n103 GB 📊 81 Mbps | 🏷️ somegroup \nMovie.2024.2160p.REMUX.mkv ",
-                "url": "https://aiostreams.example.com/playback/test1",
-                "behaviorHints": {
-                    "filename": "Movie.2024.2160p.REMUX.mkv",
-                    "videoSize": 102682361361,
+    mock_response.content = orjson.dumps(
+        {
+            "streams": [
+                {
+                    "name": "2160p BluRay REMUX ",
+                    "description": "HDR10+ | DV | IMAX  | Atmos | TrueHD \n103 GB 📊 81 Mbps | 🏷️ somegroup \nMovie.2024.2160p.REMUX.mkv ",
+                    "url": "https://aiostreams.example.com/playback/test1",
+                    "behaviorHints": {
+                        "filename": "Movie.2024.2160p.REMUX.mkv",
+                        "videoSize": 102682361361,
+                    },
                 },
-            },
-            {
-                "name": "1080p WEB-DL ",
-                "description": "1080p\nMovie.2024.1080p.WEB.mkv",
-                "url": "https://aiostreams.example.com/playback/test2",
-                "behaviorHints": {
-                    "filename": "Movie.2024.1080p.WEB.mkv",
-                    "videoSize": 8000000000,
+                {
+                    "name": "1080p WEB-DL ",
+                    "description": "1080p\nMovie.2024.1080p.WEB.mkv",
+                    "url": "https://aiostreams.example.com/playback/test2",
+                    "behaviorHints": {
+                        "filename": "Movie.2024.1080p.WEB.mkv",
+                        "videoSize": 8000000000,
+                    },
                 },
-            },
-            # Stream with no URL should be skipped
-            {
-                "name": "720p WEB-DL ",
-                "description": "720p",
-                "url": None,
-                "behaviorHints": {},
-            },
-        ]
-    }
+                # Stream with no URL should be skipped
+                {
+                    "name": "720p WEB-DL ",
+                    "description": "720p",
+                    "url": None,
+                    "behaviorHints": {},
+                },
+            ]
+        }
+    )
     mock_response.raise_for_status = Mock()
     mock_get.return_value = mock_response
 
@@ -65,20 +68,22 @@ def test_search_movie_with_streams(mock_get, aio_client):
     )
 
 
-@patch("requests.get")
+@patch("requests.Session.get")
 def test_search_movie_skips_streams_without_url(mock_get, aio_client):
     """Streams without a playback URL are excluded"""
     mock_response = Mock()
-    mock_response.json.return_value = {
-        "streams": [
-            {
-                "name": "2160p BluRay",
-                "description": "HDR",
-                "url": None,
-                "behaviorHints": {"filename": "Movie.mkv"},
-            }
-        ]
-    }
+    mock_response.content = orjson.dumps(
+        {
+            "streams": [
+                {
+                    "name": "2160p BluRay",
+                    "description": "HDR",
+                    "url": None,
+                    "behaviorHints": {"filename": "Movie.mkv"},
+                }
+            ]
+        }
+    )
     mock_response.raise_for_status = Mock()
     mock_get.return_value = mock_response
 
@@ -86,11 +91,11 @@ def test_search_movie_skips_streams_without_url(mock_get, aio_client):
     assert len(streams) == 0
 
 
-@patch("requests.get")
+@patch("requests.Session.get")
 def test_search_movie_no_streams(mock_get, aio_client):
     """Test searching for movie with no streams"""
     mock_response = Mock()
-    mock_response.json.return_value = {"streams": []}
+    mock_response.content = orjson.dumps({"streams": []})
     mock_response.raise_for_status = Mock()
     mock_get.return_value = mock_response
 
@@ -98,7 +103,7 @@ def test_search_movie_no_streams(mock_get, aio_client):
     assert len(streams) == 0
 
 
-@patch("requests.get")
+@patch("requests.Session.get")
 def test_search_movie_handles_error(mock_get, aio_client):
     """Test search handles API errors gracefully"""
     mock_get.side_effect = Exception("API Error")
@@ -107,23 +112,25 @@ def test_search_movie_handles_error(mock_get, aio_client):
     assert len(streams) == 0
 
 
-@patch("requests.get")
+@patch("requests.Session.get")
 def test_search_episode(mock_get, aio_client):
     """Test searching for a TV episode"""
     mock_response = Mock()
-    mock_response.json.return_value = {
-        "streams": [
-            {
-                "name": "2160p WEB-DL ",
-                "description": "HDR | Atmos\n7 GB 📊 55 Mbps | 🏷️ NTb \nShow.S03E04.2160p.mkv ",
-                "url": "https://aiostreams.example.com/playback/episode",
-                "behaviorHints": {
-                    "filename": "Show.S03E04.2160p.mkv",
-                    "videoSize": 6697557046,
-                },
-            }
-        ]
-    }
+    mock_response.content = orjson.dumps(
+        {
+            "streams": [
+                {
+                    "name": "2160p WEB-DL ",
+                    "description": "HDR | Atmos\n7 GB 📊 55 Mbps | 🏷️ NTb \nShow.S03E04.2160p.mkv ",
+                    "url": "https://aiostreams.example.com/playback/episode",
+                    "behaviorHints": {
+                        "filename": "Show.S03E04.2160p.mkv",
+                        "videoSize": 6697557046,
+                    },
+                }
+            ]
+        }
+    )
     mock_response.raise_for_status = Mock()
     mock_get.return_value = mock_response
 
@@ -158,6 +165,12 @@ def test_parse_quality_default(aio_client):
     assert aio_client._parse_quality("DVDRip") == 480
 
 
+def test_parse_quality_prefers_highest_match(aio_client):
+    """Test quality parsing keeps the 2160 > 1080 > 720 priority regardless of order"""
+    assert aio_client._parse_quality("720p upscaled from 1080p") == 1080
+    assert aio_client._parse_quality("1080p proxy of 4k master") == 2160
+
+
 def test_filter_streams_includes_stream_without_video_hash(aio_client):
     """Streams without videoHash are accepted as long as they have a URL"""
     streams = [
@@ -217,3 +230,48 @@ def test_filter_streams_skips_streams_without_url(aio_client):
     result = aio_client._filter_streams(streams)
     assert len(result) == 1
     assert result[0]["title"] == "2160p BluRay"
+
+
+@patch("requests.Session.get")
+def test_search_movies_returns_streams_per_id(mock_get, aio_client):
+    """search_movies queries each unique IMDB ID once and keys results by ID"""
+    mock_response = Mock()
+    mock_response.content = orjson.dumps(
+        {"streams": [{"name": "1080p WEB-DL", "url": "https://example.com/playback/1"}]}
+    )
+    mock_response.raise_for_status = Mock()
+    mock_get.return_value = mock_response
+
+    results = aio_client.search_movies(["tt1111111", "tt2222222", "tt1111111"])
+
+    assert set(results) == {"tt1111111", "tt2222222"}
+    assert results["tt1111111"][0]["quality"] == 1080
+    assert mock_get.call_count == 2
+
+
+@patch("requests.Session.get")
+def test_search_episodes_keys_results_by_query(mock_get, aio_client):
+    """search_episodes keys results by (imdb_id, season, episode)"""
+    mock_response = Mock()
+    mock_response.content = orjson.dumps({"streams": []})
+    mock_response.raise_for_status = Mock()
+    mock_get.return_value = mock_response
+
+    results = aio_client.search_episodes([("tt9999999", 1, 1), ("tt9999999", 1, 2)])
+
+    assert results == {("tt9999999", 1, 1): [], ("tt9999999", 1, 2): []}
+
+
+def test_search_movies_with_no_ids(aio_client):
+    """search_movies returns an empty dict without starting any requests"""
+    assert aio_client.search_movies([]) == {}
+
+
+def test_filter_streams_handles_null_behavior_hints(aio_client):
+    """Streams with behaviorHints set to null are kept with an empty filename"""
+    streams = [{"name": "1080p WEB-DL", "url": "https://aio/playback/1", "behaviorHints": None}]
+
+    result = aio_client._filter_streams(streams)
+
+    assert result[0]["filename"] == ""
+    assert result[0]["quality"] == 1080
@@ -99,3 +99,28 @@ def test_config_realdebrid_api_key_defaults_empty(monkeypatch):
     config = Config()
 
     assert config.realdebrid_api_key == ""
+
+
+def test_config_storage_path_defaults_empty(monkeypatch):
+    """STORAGE_PATH defaults to empty string (in-memory storage) when not set"""
+    monkeypatch.setenv("AIOSTREAMS_URL", "http://aiostreams")
+    monkeypatch.setenv("RADARR_URL", "http://radarr")
+    monkeypatch.setenv("RADARR_API_KEY", "test-key")
+    monkeypatch.delenv("STORAGE_PATH", raising=False)
+
+    config = Config()
+
+    assert config.storage_path == ""
+
+
+def test_config_concurrency_defaults_and_floor(monkeypatch):
+    """CONCURRENCY defaults to 4 and is never below 1"""
+    monkeypatch.setenv("AIOSTREAMS_URL", "http://aiostreams")
+    monkeypatch.setenv("RADARR_URL", "http://radarr")
+    monkeypatch.setenv("RADARR_API_KEY", "test-key")
+    monkeypatch.delenv("CONCURRENCY", raising=False)
+
+    assert Config().concurrency == 4
+
+    monkeypatch.setenv("CONCURRENCY", "0")
+    assert Config().concurrency == 1
@@ -1,14 +1,62 @@
-from unittest.mock import patch
+import threading
+from types import MappingProxyType
+from unittest.mock import Mock, patch
 
-from src.notifiers.discord import DiscordNotifier
+import orjson
+import pytest
+import requests
 
+from src.notifiers.discord import DiscordNotifier
 
-def test_discord_notifier_initialization_with_url():
+WEBHOOK_URL = "https://discord.com/api/webhooks/123/abc"
+
+# Read-only success details shared by the tests, built once at import
+MATRIX_DETAILS = MappingProxyType(
+    {
+        "year": 1999,
+        "imdb_id": "tt0133093",
+        "quality": "1080p",
+        "stream_title": "The.Matrix.1999.1080p.BluRay",
+    }
+)
+BREAKING_BAD_DETAILS = MappingProxyType(
+    {
+        "season": 1,
+        "episode": 1,
+        "episode_title": "Pilot",
+        "imdb_id": "tt0959621",
+        "quality": "1080p",
+        "stream_title": "Breaking.Bad.S01E01.1080p.WEB",
+    }
+)
+
+
+def assert_embed_matches(embed, *, color, title_contains=(), fields_contain=()):
+    """Assert an embed's color, title substrings and field values in one call"""
+    assert embed["color"] == color
+    missing = [text for text in title_contains if text not in embed["title"]]
+    # One newline-separated blob, so a value can't match across two fields
+    field_values = "\n".join(field["value"] for field in embed.get("fields", []))
+    missing += [value for value in fields_contain if value not in field_values]
+    assert not missing, f"embed missing {missing}"
+
+
+@pytest.fixture
+def notifier():
+    return DiscordNotifier(WEBHOOK_URL)
+
+
+@pytest.fixture
+def mock_post(notifier, monkeypatch):
+    """Stub the notifier session's post; Discord answers 204 unless a test overrides it"""
+    post = Mock(return_value=Mock(status_code=204))
+    monkeypatch.setattr(notifier.session, "post", post)
+    return post
+
+
+def test_discord_notifier_initialization_with_url(notifier):
     """Test DiscordNotifier initializes with webhook URL"""
-    webhook_url = "https://discord.com/api/webhooks/123/abc"
-    notifier = DiscordNotifier(webhook_url)
-
-    assert notifier.webhook_url == webhook_url
+    assert notifier.webhook_url == WEBHOOK_URL
     assert notifier.failures == []
 
 
@@ -20,31 +68,39 @@ def test_discord_notifier_initialization_with_none():
     assert notifier.failures == []
 
 
-def test_notify_success_sends_movie_embed():
-    """Test notify_success sends formatted movie embed"""
-    webhook_url = "https://discord.com/api/webhooks/123/abc"
-    notifier = DiscordNotifier(webhook_url)
-
-    with patch.object(notifier, "_send_webhook", return_value=True) as mock_send:
-        notifier.notify_success(
-            media_type="movie",
-            title="The Matrix (1999)",
-            details={
-                "year": 1999,
-                "imdb_id": "tt0133093",
-                "quality": "1080p",
-                "stream_title": "The.Matrix.1999.1080p.BluRay",
-            },
-        )
-
-        mock_send.assert_called_once()
-        embed = mock_send.call_args[0][0]
-
-        assert embed["color"] == 0x00FF00  # Green
-        assert "✓" in embed["title"]
-        assert "The Matrix (1999)" in embed["title"]
-        assert any("1080p" in field["value"] for field in embed["fields"])
-        assert any("tt0133093" in field["value"] for field in embed["fields"])
+@pytest.mark.parametrize(
+    ("media_type", "title", "details", "expected_values"),
+    [
+        (
+            "movie",
+            "The Matrix (1999)",
+            MATRIX_DETAILS,
+            ["1080p", "tt0133093"],
+        ),
+        (
+            "episode",
+            "Breaking Bad",
+            BREAKING_BAD_DETAILS,
+            ["S01E01", "Pilot", "1080p", "tt0959621"],
+        ),
+    ],
+    ids=["movie", "episode"],
+)
+def test_notify_success_queues_embed(notifier, media_type, title, details, expected_values):
+    """Test notify_success queues a formatted embed for the success summary"""
+    mock_send = notifier._send_embeds = Mock(return_value=True)
+    notifier.notify_success(media_type=media_type, title=title, details=details)
+
+    mock_send.assert_not_called()
+    notifier.send_success_summary()
+
+    mock_send.assert_called_once()
+    embed = mock_send.call_args[0][0][0]
+    assert notifier.successes == []
+
+    assert_embed_matches(
+        embed, color=0x00FF00, title_contains=["✓", title], fields_contain=expected_values
+    )
 
 
 def test_notify_success_with_webhook_disabled():
@@ -52,62 +108,27 @@ def test_notify_success_with_webhook_disabled():
     notifier = DiscordNotifier(None)
 
     # Should not raise exception
-    notifier.notify_success(media_type="movie", title="The Matrix (1999)", details={"year": 1999})
-
+    notifier.notify_success(media_type="movie", title="The Matrix (1999)", details=MATRIX_DETAILS)
 
-def test_notify_success_sends_episode_embed():
-    """Test notify_success sends formatted episode embed with series info"""
-    webhook_url = "https://discord.com/api/webhooks/123/abc"
-    notifier = DiscordNotifier(webhook_url)
 
-    with patch.object(notifier, "_send_webhook", return_value=True) as mock_send:
-        notifier.notify_success(
-            media_type="episode",
-            title="Breaking Bad",
-            details={
-                "season": 1,
-                "episode": 1,
-                "episode_title": "Pilot",
-                "imdb_id": "tt0959621",
-                "quality": "1080p",
-                "stream_title": "Breaking.Bad.S01E01.1080p.WEB",
-            },
-        )
-
-        mock_send.assert_called_once()
-        embed = mock_send.call_args[0][0]
-
-        assert embed["color"] == 0x00FF00  # Green
-        assert "✓" in embed["title"]
-        assert "Breaking Bad" in embed["title"]
-        # Check for episode-specific fields
-        assert any("S01E01" in field["value"] for field in embed["fields"])
-        assert any("Pilot" in field["value"] for field in embed["fields"])
-        assert any("1080p" in field["value"] for field in embed["fields"])
-        assert any("tt0959621" in field["value"] for field in embed["fields"])
-
-
-def test_collect_failure_appends_to_list():
+def test_collect_failure_appends_to_list(notifier):
     """Test collect_failure appends failure to list without sending"""
-    webhook_url = "https://discord.com/api/webhooks/123/abc"
-    notifier = DiscordNotifier(webhook_url)
-
-    with patch.object(notifier, "_send_webhook") as mock_send:
-        notifier.collect_failure(
-            media_type="movie",
-            title="The Matrix (1999)",
-            reason="No cached streams available",
-            details={"imdb_id": "tt0133093"},
-        )
+    mock_send = notifier._send_webhook = Mock()
+    notifier.collect_failure(
+        media_type="movie",
+        title="The Matrix (1999)",
+        reason="No cached streams available",
+        details={"imdb_id": "tt0133093"},
+    )
 
-        # Should NOT send webhook immediately
-        mock_send.assert_not_called()
+    # Should NOT send webhook immediately
+    mock_send.assert_not_called()
 
-        # Should append to failures list
-        assert len(notifier.failures) == 1
-        assert notifier.failures[0]["media_type"] == "movie"
-        assert notifier.failures[0]["title"] == "The Matrix (1999)"
-        assert notifier.failures[0]["reason"] == "No cached streams available"
+    # Should append to failures list
+    assert len(notifier.failures) == 1
+    assert notifier.failures[0]["media_type"] == "movie"
+    assert notifier.failures[0]["title"] == "The Matrix (1999)"
+    assert notifier.failures[0]["reason"] == "No cached streams available"
 
 
 def test_collect_failure_with_webhook_disabled():
@@ -126,11 +147,8 @@ def test_collect_failure_with_webhook_disabled():
     assert len(notifier.failures) == 0
 
 
-def test_send_failure_summary_sends_and_clears():
+def test_send_failure_summary_sends_and_clears(notifier):
     """Test send_failure_summary sends batched failures and clears list"""
-    webhook_url = "https://discord.com/api/webhooks/123/abc"
-    notifier = DiscordNotifier(webhook_url)
-
     # Collect multiple failures
     notifier.collect_failure(
         media_type="movie",
@@ -153,42 +171,37 @@ def test_send_failure_summary_sends_and_clears():
 
     assert len(notifier.failures) == 3
 
-    with patch.object(notifier, "_send_webhook", return_value=True) as mock_send:
-        notifier.send_failure_summary()
+    mock_send = notifier._send_webhook = Mock(return_value=True)
+    notifier.send_failure_summary()
 
-        # Should send webhook
-        mock_send.assert_called_once()
-        embed = mock_send.call_args[0][0]
+    # Should send webhook
+    mock_send.assert_called_once()
+    embed = mock_send.call_args[0][0]
 
-        # Verify embed format
-        assert embed["color"] == 0xFF0000  # Red
-        assert "Failed to process" in embed["title"]
-        assert "3 items" in embed["title"]
+    # Verify embed format
+    assert_embed_matches(embed, color=0xFF0000, title_contains=["Failed to process", "3 items"])
 
-        # Verify failures are grouped by media type
-        description = embed["description"]
-        assert "Movies (2)" in description or "Movie (2)" in description
-        assert "The Matrix (1999)" in description
-        assert "Inception (2010)" in description
-        assert "Episodes (1)" in description or "Episode (1)" in description
-        assert "Breaking Bad" in description
-        assert "No cached streams available" in description
-        assert "Quality threshold not met" in description
+    # Verify failures are grouped by media type
+    description = embed["description"]
+    assert "Movies (2)" in description or "Movie (2)" in description
+    assert "The Matrix (1999)" in description
+    assert "Inception (2010)" in description
+    assert "Episodes (1)" in description or "Episode (1)" in description
+    assert "Breaking Bad" in description
+    assert "No cached streams available" in description
+    assert "Quality threshold not met" in description
 
     # Verify failures list is cleared after sending
     assert len(notifier.failures) == 0
 
 
-def test_send_failure_summary_skips_when_empty():
+def test_send_failure_summary_skips_when_empty(notifier):
     """Test send_failure_summary does nothing when failures list is empty"""
-    webhook_url = "https://discord.com/api/webhooks/123/abc"
-    notifier = DiscordNotifier(webhook_url)
-
-    with patch.object(notifier, "_send_webhook") as mock_send:
-        notifier.send_failure_summary()
+    mock_send = notifier._send_webhook = Mock()
+    notifier.send_failure_summary()
 
-        # Should not send webhook when no failures
-        mock_send.assert_not_called()
+    # Should not send webhook when no failures
+    mock_send.assert_not_called()
 
 
 def test_send_failure_summary_with_webhook_disabled():
@@ -200,31 +213,21 @@ def test_send_failure_summary_with_webhook_disabled():
     notifier.send_failure_summary()
 
 
-@patch("requests.post")
-def test_send_webhook_success(mock_post):
+def test_send_webhook_success(mock_post, notifier):
     """Test _send_webhook succeeds with valid response"""
-    webhook_url = "https://discord.com/api/webhooks/123/abc"
-    notifier = DiscordNotifier(webhook_url)
-
-    # Mock successful response
-    mock_post.return_value.status_code = 204
-    mock_post.return_value.raise_for_status = lambda: None
-
     embed = {"title": "Test", "color": 0x00FF00}
     result = notifier._send_webhook(embed)
 
     assert result is True
-    mock_post.assert_called_once_with(webhook_url, json={"embeds": [embed]}, timeout=10)
+    mock_post.assert_called_once_with(
+        WEBHOOK_URL,
+        data=orjson.dumps({"embeds": [embed]}),
+        timeout=10,
+    )
 
 
-@patch("requests.post")
-def test_send_webhook_http_error(mock_post):
+def test_send_webhook_http_error(mock_post, notifier):
     """Test _send_webhook handles HTTP errors gracefully"""
-    import requests
-
-    webhook_url = "https://discord.com/api/webhooks/123/abc"
-    notifier = DiscordNotifier(webhook_url)
-
     # Mock HTTP error
     mock_post.return_value.raise_for_status.side_effect = requests.HTTPError("400 Bad Request")
 
@@ -235,14 +238,8 @@ def test_send_webhook_http_error(mock_post):
     mock_post.assert_called_once()
 
 
-@patch("requests.post")
-def test_send_webhook_network_error(mock_post):
+def test_send_webhook_network_error(mock_post, notifier):
     """Test _send_webhook handles network errors gracefully"""
-    import requests
-
-    webhook_url = "https://discord.com/api/webhooks/123/abc"
-    notifier = DiscordNotifier(webhook_url)
-
     # Mock network error
     mock_post.side_effect = requests.RequestException("Network error")
 
@@ -253,11 +250,8 @@ def test_send_webhook_network_error(mock_post):
     mock_post.assert_called_once()
 
 
-def test_failure_summary_truncates_long_description():
+def test_failure_summary_truncates_long_description(notifier):
     """Test failure summary truncates description to stay under Discord's 6000 char limit"""
-    webhook_url = "https://discord.com/api/webhooks/123/abc"
-    notifier = DiscordNotifier(webhook_url)
-
     # Collect 100 failures with moderately long titles and reasons
     for i in range(100):
         notifier.collect_failure(
@@ -283,11 +277,8 @@ def test_failure_summary_truncates_long_description():
     assert "more" in embed["description"].lower() or "additional" in embed["description"].lower()
 
 
-def test_failure_summary_shows_all_items_when_short():
+def test_failure_summary_shows_all_items_when_short(notifier):
     """Test failure summary shows all items when description is short enough"""
-    webhook_url = "https://discord.com/api/webhooks/123/abc"
-    notifier = DiscordNotifier(webhook_url)
-
     # Collect just 5 failures
     for i in range(5):
         notifier.collect_failure(
@@ -309,11 +300,8 @@ def test_failure_summary_shows_all_items_when_short():
     assert "additional" not in description.lower()
 
 
-def test_failure_summary_truncates_per_field_limit():
+def test_failure_summary_truncates_per_field_limit(notifier):
     """Test failure summary respects Discord's 1024 char field limit per section"""
-    webhook_url = "https://discord.com/api/webhooks/123/abc"
-    notifier = DiscordNotifier(webhook_url)
-
     # Collect many movie failures to exceed per-field limit
     for i in range(30):
         notifier.collect_failure(
@@ -331,3 +319,163 @@ def test_failure_summary_truncates_per_field_limit():
     # Should have truncated the list and shown truncation message
     assert len(description) <= 4096
     assert "more" in description.lower() or "additional" in description.lower()
+
+
+def test_format_failure_summary_caps_long_title_and_reason(notifier):
+    """Test one oversized failure line is shortened instead of crowding out the rest"""
+    notifier.collect_failure(media_type="movie", title="T" * 5000, reason="R" * 5000, details={})
+    notifier.collect_failure(media_type="movie", title="Inception", reason="No streams", details={})
+
+    description = notifier._format_failure_summary_embed()["description"]
+
+    assert f"• {'T' * 150} - {'R' * 200}" in description
+    assert "• Inception - No streams" in description
+
+
+def test_send_success_summary_batches_ten_embeds_per_message(notifier):
+    """Test success embeds are sent 10 per webhook message"""
+    for i in range(23):
+        notifier.notify_success(media_type="movie", title=f"Movie {i}", details={})
+
+    mock_send = notifier._send_embeds = Mock(return_value=True)
+    notifier.send_success_summary()
+
+    assert [len(call[0][0]) for call in mock_send.call_args_list] == [10, 10, 3]
+    assert notifier.successes == []
+
+
+def test_send_success_summary_keeps_unsent_embeds(notifier):
+    """Test embeds from a failed batch are kept for the next cycle"""
+    for i in range(12):
+        notifier.notify_success(media_type="movie", title=f"Movie {i}", details={})
+
+    notifier._send_embeds = Mock(side_effect=[True, False])
+    notifier.send_success_summary()
+
+    assert len(notifier.successes) == 2
+
+
+@patch("time.sleep")
+def test_send_webhook_waits_out_rate_limit(mock_sleep, mock_post, notifier):
+    """Test a 429 response is retried after X-RateLimit-Reset-After seconds"""
+    limited = Mock(status_code=429, headers={"X-RateLimit-Reset-After": "2.5"})
+    ok = Mock(status_code=204)
+    mock_post.side_effect = [limited, ok]
+
+    assert notifier._send_webhook({"title": "Test"}) is True
+
+    mock_sleep.assert_called_once_with(2.5)
+    assert mock_post.call_count == 2
+
+
+@pytest.mark.parametrize(
+    ("reset_after", "expected"),
+    [(None, 1.0), ("", 1.0), ("soon", 1.0), ("nan", 1.0), ("-3", 1.0), ("3600", 60.0)],
+    ids=["missing", "empty", "malformed", "nan", "negative", "too_long"],
+)
+@patch("time.sleep")
+def test_send_webhook_rate_limit_wait_is_parsed_defensively(
+    mock_sleep, mock_post, notifier, reset_after, expected
+):
+    """Test an unusable or huge X-RateLimit-Reset-After falls back to 1s or is capped at 60s"""
+    headers = {} if reset_after is None else {"X-RateLimit-Reset-After": reset_after}
+    mock_post.side_effect = [Mock(status_code=429, headers=headers), Mock(status_code=204)]
+
+    assert notifier._send_webhook({"title": "Test"}) is True
+
+    mock_sleep.assert_called_once_with(expected)
+
+
+def test_failure_summary_does_not_repeat_episode_label(notifier):
+    """Test episode titles that already carry SxxEyy are not suffixed a second time"""
+    notifier.collect_failure(
+        media_type="episode",
+        title="Breaking Bad S01E02 - Cat's in the Bag",
+        reason="No cached streams available",
+        details={"season": 1, "episode": 2},
+    )
+
+    description = notifier._format_failure_summary_embed()["description"]
+
+    assert description.count("S01E02") == 1
+
+
+def test_background_notifier_sends_from_worker_thread():
+    """Test background mode queues messages and a worker thread posts them"""
+    notifier = DiscordNotifier(WEBHOOK_URL, background=True)
+    notifier.notify_success(media_type="movie", title="The Matrix (1999)", details={})
+    notifier.collect_failure(media_type="movie", title="Inception", reason="No streams", details={})
+    threads = []
+
+    def send(embeds):
+        threads.append(threading.current_thread())
+        return True
+
+    mock_send = notifier._send_embeds = Mock(side_effect=send)
+    notifier.send_success_summary()
+    notifier.send_failure_summary()
+    notifier.flush()
+
+    assert mock_send.call_count == 2
+    assert all(thread is not threading.main_thread() for thread in threads)
+    assert notifier.successes == []
+    assert notifier.failures == []
+
+
+def test_background_failure_summary_kept_when_send_fails():
+    """Test failures from a summary the worker could not send go out with the next one"""
+    notifier = DiscordNotifier(WEBHOOK_URL, background=True)
+    notifier.collect_failure(media_type="movie", title="Inception", reason="No streams", details={})
+    mock_send = notifier._send_embeds = Mock(return_value=False)
+
+    notifier.send_failure_summary()
+    notifier.flush()
+
+    assert [failure["title"] for failure in notifier.failures] == ["Inception"]
+
+    notifier.collect_failure(media_type="movie", title="Tenet", reason="No streams", details={})
+    mock_send.return_value = True
+    notifier.send_failure_summary()
+    notifier.flush()
+
+    description = mock_send.call_args.args[0][0]["description"]
+    assert "Inception" in description and "Tenet" in description
+    assert notifier.failures == []
+
+
+def test_background_success_batch_kept_when_send_fails():
+    """Test a success batch the worker could not send is kept for the next summary"""
+    notifier = DiscordNotifier(WEBHOOK_URL, background=True)
+    notifier.notify_success(media_type="movie", title="The Matrix (1999)", details={})
+    mock_send = notifier._send_embeds = Mock(return_value=False)
+
+    notifier.send_success_summary()
+    notifier.flush()
+
+    assert [embed["title"] for embed in notifier.successes] == ["✓ The Matrix (1999)"]
+
+    mock_send.return_value = True
+    notifier.send_success_summary()
+    notifier.flush()
+
+    assert mock_send.call_args.args[0][0]["title"] == "✓ The Matrix (1999)"
+    assert notifier.successes == []
+
+
+def test_send_success_summary_stamps_batch_once(notifier):
+    """Every success embed in a summary carries the same send-time timestamp"""
+    for i in range(3):
+        notifier.notify_success(media_type="movie", title=f"Movie {i}", details={})
+    assert "timestamp" not in notifier.successes[0]
+
+    mock_send = notifier._send_embeds = Mock(return_value=True)
+    notifier.send_success_summary()
+
+    embeds = mock_send.call_args[0][0]
+    assert len({embed["timestamp"] for embed in embeds}) == 1
+
+
+def test_notifier_reuses_json_session(notifier):
+    """Webhooks go through one pooled session that sends JSON by default"""
+    assert notifier.session.headers["Content-Type"] == "application/json"
+    assert notifier.session.get_adapter("https://discord.com").timeout == (5, 30)
@@ -0,0 +1,34 @@
+from unittest.mock import Mock, patch
+
+from src.clients.http import DEFAULT_TIMEOUT, TimeoutHTTPAdapter, create_session
+
+
+def test_create_session_sets_headers():
+    """Test session carries the given headers on every request"""
+    session = create_session({"X-Api-Key": "test_key"})
+
+    assert session.headers["X-Api-Key"] == "test_key"
+
+
+def test_create_session_mounts_pooled_adapter():
+    """Test session mounts a retrying, pooled adapter for http and https"""
+    session = create_session()
+
+    for prefix in ("http://", "https://"):
+        adapter = session.get_adapter(prefix)
+        assert adapter.max_retries.total == 3
+        assert 502 in adapter.max_retries.status_forcelist
+        assert 429 in adapter.max_retries.status_forcelist
+        assert "POST" not in adapter.max_retries.allowed_methods
+
+
+def test_adapter_applies_default_timeout():
+    """Test requests without an explicit timeout get the adapter default"""
+    adapter = TimeoutHTTPAdapter()
+
+    with patch("requests.adapters.HTTPAdapter.send") as mock_send:
+        adapter.send(Mock())
+        adapter.send(Mock(), timeout=10)
+
+    assert mock_send.call_args_list[0][1]["timeout"] == DEFAULT_TIMEOUT
+    assert mock_send.call_args_list[1][1]["timeout"] == 10
@@ -3,44 +3,112 @@ Integration tests for the full service
 These tests verify the complete workflow
 """
 
-from unittest.mock import patch
+import os
+import signal
+import threading
+from unittest.mock import Mock, patch
 
 import pytest
 
-from src.main import main
+from src.main import main, poll_delay
+
+pytestmark = pytest.mark.serial
+
+
+TEST_ENV = {
+    "RADARR_URL": "http://test:7878",
+    "RADARR_API_KEY": "test_key",
+    "AIOSTREAMS_URL": "http://aio:8080",
+    "POLL_INTERVAL_MINUTES": "1",
+}
 
 
 @pytest.fixture
-def mock_env(monkeypatch):
-    """Set up test environment variables"""
-    monkeypatch.setenv("RADARR_URL", "http://test:7878")
-    monkeypatch.setenv("RADARR_API_KEY", "test_key")
-    monkeypatch.setenv("AIOSTREAMS_URL", "http://aio:8080")
-    monkeypatch.setenv("POLL_INTERVAL_MINUTES", "1")
+def mock_env():
+    """Set up test environment variables in one update, restored after the test"""
+    with patch.dict(os.environ, TEST_ENV):
+        yield
 
 
-@patch("time.sleep")
-@patch("schedule.run_pending")
+@patch("signal.signal")
+@patch("src.media_processor.MediaProcessor.close")
 @patch("src.media_processor.MediaProcessor.process_all")
-def test_full_workflow_integration(mock_process, mock_schedule, mock_sleep, mock_env):
+def test_full_workflow_integration(mock_process, mock_close, mock_signal, mock_env):
     """Test complete workflow from startup to processing"""
-    # Mock the schedule to run once then stop
-    call_count = {"count": 0}
-
-    def run_once():
-        call_count["count"] += 1
-        if call_count["count"] >= 2:
-            raise KeyboardInterrupt()
-
-    mock_schedule.side_effect = run_once
+    # One timed-out wait triggers a poll, then the stop event ends the loop
+    stop_event = Mock(wait=Mock(side_effect=[False, True]))
 
     # Run main function
-    result = main()
+    result = main(stop_event)
 
     # Verify it ran successfully
     assert result == 0
-    # process_all is called once on startup + potentially by scheduler
-    assert mock_process.call_count >= 1
+    # process_all is called once on startup + once by the poll loop
+    assert mock_process.call_count == 2
+    mock_close.assert_called_once()
+
+
+@patch("signal.signal")
+@patch("src.media_processor.MediaProcessor.close")
+@patch("src.media_processor.MediaProcessor.process_all")
+def test_stop_event_ends_loop(mock_process, mock_close, mock_signal, mock_env):
+    """Test a set stop event (e.g. from SIGTERM) exits without another poll"""
+    stop_event = threading.Event()
+    stop_event.set()
+
+    assert main(stop_event) == 0
+
+    assert mock_process.call_count == 1
+    mock_close.assert_called_once()
+    assert mock_signal.call_args[0][0] == signal.SIGTERM
+
+    # The SIGTERM handler sets the loop's stop event
+    stop_event.clear()
+    handler = mock_signal.call_args[0][1]
+    handler(signal.SIGTERM, None)
+    assert stop_event.is_set()
+
+
+@patch("signal.signal")
+@patch("src.media_processor.MediaProcessor.close")
+@patch("src.media_processor.MediaProcessor.process_all")
+def test_sigterm_handler_registered_before_initial_check(
+    mock_process, mock_close, mock_signal, mock_env
+):
+    """Test a SIGTERM during the initial check stops the service instead of killing it"""
+    stop_event = threading.Event()
+
+    def initial_check():
+        # docker stop arrives while the first pass is still running
+        mock_signal.call_args[0][1](signal.SIGTERM, None)
+
+    mock_process.side_effect = initial_check
+
+    assert main(stop_event) == 0
+
+    assert mock_process.call_count == 1
+    mock_close.assert_called_once()
+
+
+@patch("signal.signal")
+@patch("src.media_processor.MediaProcessor.close")
+@patch("src.media_processor.MediaProcessor.process_all")
+def test_interrupt_during_initial_check_still_closes(
+    mock_process, mock_close, mock_signal, mock_env
+):
+    """Test Ctrl+C during the initial check exits cleanly and drains the processor"""
+    mock_process.side_effect = KeyboardInterrupt
+
+    assert main(threading.Event()) == 0
+
+    mock_close.assert_called_once()
+
+
+def test_poll_delay_stays_within_jitter():
+    """Test the poll delay is the interval plus at most 30 seconds of jitter"""
+    for _ in range(100):
+        assert 570 <= poll_delay(600) <= 630
+        assert 54 <= poll_delay(60) <= 66
 
 
 def test_configuration_error_handling(monkeypatch):
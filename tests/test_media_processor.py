@@ -1,854 +1,798 @@
-from unittest.mock import Mock, patch
+import os
+import threading
+from functools import cache
+from types import MappingProxyType, SimpleNamespace
+from unittest.mock import MagicMock, Mock, patch
 
+import pytest
+
+from src import media_processor
 from src.config import Config
 from src.media_processor import MediaProcessor
 
+WEBHOOK_URL = "https://discord.com/api/webhooks/123/abc"
+# Service settings the env fixtures own; cleared first so the host environment can't leak in
+SERVICE_ENV_VARS = (
+    "RADARR_URL",
+    "RADARR_API_KEY",
+    "SONARR_URL",
+    "SONARR_API_KEY",
+    "DISCORD_WEBHOOK_URL",
+    "REALDEBRID_API_KEY",
+)
+# Optional settings cleared too, so a host STORAGE_PATH or CONCURRENCY can't change test behaviour
+TUNING_ENV_VARS = (
+    "POLL_INTERVAL_MINUTES",
+    "RETRY_FAILED_HOURS",
+    "MAX_RETRY_ATTEMPTS",
+    "CONCURRENCY",
+    "STORAGE_PATH",
+    "EXCLUDED_STREAM_PATTERNS",
+)
+# Fixtures that add to base_env; config resolves whichever ones the test requests
+ENV_FIXTURES = ("radarr_env", "sonarr_env", "webhook_env", "rd_env")
+BASE_ENV = {"AIOSTREAMS_URL": "http://aiostreams"}
+RADARR_ENV = {"RADARR_URL": "http://radarr", "RADARR_API_KEY": "test-key"}
+SONARR_ENV = {"SONARR_URL": "http://sonarr", "SONARR_API_KEY": "test-key"}
+
+# Shared read-only payloads; the movie/episode fixtures hand out mutable copies
+MOVIE = MappingProxyType({"id": 1, "title": "The Matrix", "year": 1999, "imdbId": "tt0133093"})
+EPISODE = MappingProxyType(
+    {
+        "id": 1,
+        "seasonNumber": 1,
+        "episodeNumber": 1,
+        "title": "Pilot",
+        "series": MappingProxyType({"title": "Breaking Bad", "imdbId": "tt0959621"}),
+    }
+)
+MOVIE_STREAM = MappingProxyType(
+    {"title": "The Matrix 1080p", "url": "http://stream-url", "description": "1080p WEB-DL"}
+)
+MOVIE_STREAM_NO_URL = MappingProxyType({**MOVIE_STREAM, "url": ""})
+EPISODE_STREAM = MappingProxyType(
+    {
+        "title": "Breaking Bad S01E01 1080p",
+        "url": "http://stream-url",
+        "description": "1080p WEB-DL",
+    }
+)
+EPISODE_STREAM_NO_URL = MappingProxyType({**EPISODE_STREAM, "url": ""})
+# Notification titles the processor builds for MOVIE and EPISODE
+MOVIE_TITLE = "The Matrix (1999)"
+EPISODE_TITLE = "Breaking Bad S01E01 - Pilot"
+SHRINKING_FILENAME = "Shrinking S03E04 The Field 2160p ATVP WEB-DL DDP5 1 DV H 265-NTb.mkv"
+# Streams in the order AIOStreams ranks them, best quality first
+RETRY_STREAMS = tuple(
+    MappingProxyType({"title": f"Item {quality}", "url": f"http://stream-{n}"})
+    for n, quality in enumerate(("4K", "1080p", "720p", "480p"), start=1)
+)
 
-@patch("src.media_processor.SonarrClient")
-@patch("src.media_processor.RadarrClient")
-@patch("src.media_processor.AIOStreamsClient")
-def test_media_processor_initializes_notifier_when_webhook_configured(
-    mock_aiostreams, mock_radarr, mock_sonarr, monkeypatch
-):
-    """Test MediaProcessor initializes DiscordNotifier when webhook URL is set"""
-    monkeypatch.setenv("AIOSTREAMS_URL", "http://aiostreams")
-    monkeypatch.setenv("RADARR_URL", "http://radarr")
-    monkeypatch.setenv("RADARR_API_KEY", "test-key")
-    monkeypatch.setenv("DISCORD_WEBHOOK_URL", "https://discord.com/api/webhooks/123/abc")
 
-    config = Config()
+def assert_failure_collected(notifier, *, media_type, title, reason_contains):
+    """Assert the notifier collected exactly one failure matching these details"""
+    notifier.collect_failure.assert_called_once()
+    kwargs = notifier.collect_failure.call_args.kwargs
+    assert kwargs["media_type"] == media_type
+    assert kwargs["title"] == title
+    assert reason_contains in kwargs["reason"]
 
-    with patch("src.media_processor.DiscordNotifier") as mock_notifier_class:
-        processor = MediaProcessor(config)
 
-        mock_notifier_class.assert_called_once_with("https://discord.com/api/webhooks/123/abc")
-        assert processor.notifier is not None
+@pytest.fixture(autouse=True)
+def clients(monkeypatch):
+    """Replace the Sonarr, Radarr and AIOStreams client classes with mocks for every test"""
+    sonarr, radarr, aiostreams = MagicMock(), MagicMock(), MagicMock()
+    monkeypatch.setattr(media_processor, "SonarrClient", sonarr)
+    monkeypatch.setattr(media_processor, "RadarrClient", radarr)
+    monkeypatch.setattr(media_processor, "AIOStreamsClient", aiostreams)
+    return SimpleNamespace(sonarr=sonarr, radarr=radarr, aiostreams=aiostreams)
 
 
-@patch("src.media_processor.SonarrClient")
-@patch("src.media_processor.RadarrClient")
-@patch("src.media_processor.AIOStreamsClient")
-def test_media_processor_no_notifier_when_webhook_not_configured(
-    mock_aiostreams, mock_radarr, mock_sonarr, monkeypatch
-):
-    """Test MediaProcessor doesn't initialize DiscordNotifier when webhook URL is empty"""
-    monkeypatch.setenv("AIOSTREAMS_URL", "http://aiostreams")
-    monkeypatch.setenv("RADARR_URL", "http://radarr")
-    monkeypatch.setenv("RADARR_API_KEY", "test-key")
-    monkeypatch.delenv("DISCORD_WEBHOOK_URL", raising=False)
+@pytest.fixture
+def notifier_class(monkeypatch):
+    """Replace the DiscordNotifier class with a mock"""
+    notifier_class = MagicMock()
+    monkeypatch.setattr(media_processor, "DiscordNotifier", notifier_class)
+    return notifier_class
 
-    config = Config()
-    processor = MediaProcessor(config)
 
-    assert processor.notifier is None
+@pytest.fixture
+def notifier(notifier_class):
+    """The mock notifier a MediaProcessor with a webhook will construct"""
+    return notifier_class.return_value
 
 
-@patch("src.media_processor.SonarrClient")
-@patch("src.media_processor.RadarrClient")
-@patch("src.media_processor.AIOStreamsClient")
-def test_process_movie_calls_notify_success(
-    mock_aiostreams_class, mock_radarr_class, mock_sonarr, monkeypatch
-):
-    """Test _process_movie calls notify_success on successful processing"""
-    monkeypatch.setenv("AIOSTREAMS_URL", "http://aiostreams")
-    monkeypatch.setenv("RADARR_URL", "http://radarr")
-    monkeypatch.setenv("RADARR_API_KEY", "test-key")
-    monkeypatch.setenv("DISCORD_WEBHOOK_URL", "https://discord.com/api/webhooks/123/abc")
-
-    config = Config()
-
-    # Mock successful movie processing
-    mock_radarr = mock_radarr_class.return_value
-    mock_radarr.unmonitor_movie.return_value = True
-
-    mock_aiostreams = mock_aiostreams_class.return_value
-    mock_aiostreams.search_movie.return_value = [
-        {
-            "title": "The Matrix 1080p",
-            "url": "http://stream-url",
-            "description": "1080p WEB-DL",
-        }
-    ]
+@pytest.fixture
+def movie():
+    """A wanted Radarr movie with an IMDB ID"""
+    return dict(MOVIE)
 
-    with patch("src.media_processor.DiscordNotifier") as mock_notifier_class:
-        mock_notifier = Mock()
-        mock_notifier_class.return_value = mock_notifier
 
-        processor = MediaProcessor(config)
+@pytest.fixture
+def episode():
+    """A wanted Sonarr episode with its series embedded"""
+    return {**EPISODE, "series": dict(EPISODE["series"])}
 
-        with patch.object(processor, "_trigger_aiostreams_download", return_value=True):
-            movie = {
-                "id": 1,
-                "title": "The Matrix",
-                "year": 1999,
-                "imdbId": "tt0133093",
-            }
-            result = processor._process_movie(movie)
 
-            assert result is True
-            mock_notifier.notify_success.assert_called_once()
+@pytest.fixture
+def base_env():
+    """AIOStreams configured with every other service unset, restored in one step after the test"""
+    with patch.dict(os.environ, BASE_ENV):
+        for name in SERVICE_ENV_VARS + TUNING_ENV_VARS:
+            os.environ.pop(name, None)
+        yield
 
-            call_args = mock_notifier.notify_success.call_args
-            assert call_args[1]["media_type"] == "movie"
-            assert "The Matrix" in call_args[1]["title"]
 
+@pytest.fixture
+def radarr_env(base_env):
+    """Configure Radarr"""
+    os.environ.update(RADARR_ENV)
 
-@patch("src.media_processor.SonarrClient")
-@patch("src.media_processor.RadarrClient")
-@patch("src.media_processor.AIOStreamsClient")
-def test_process_movie_calls_collect_failure_on_no_streams(
-    mock_aiostreams_class, mock_radarr_class, mock_sonarr, monkeypatch
-):
-    """Test _process_movie calls collect_failure when no streams found"""
-    monkeypatch.setenv("AIOSTREAMS_URL", "http://aiostreams")
-    monkeypatch.setenv("RADARR_URL", "http://radarr")
-    monkeypatch.setenv("RADARR_API_KEY", "test-key")
-    monkeypatch.setenv("DISCORD_WEBHOOK_URL", "https://discord.com/api/webhooks/123/abc")
 
-    config = Config()
+@pytest.fixture
+def sonarr_env(base_env):
+    """Configure Sonarr"""
+    os.environ.update(SONARR_ENV)
 
-    mock_aiostreams = mock_aiostreams_class.return_value
-    mock_aiostreams.search_movie.return_value = []  # No streams
 
-    with patch("src.media_processor.DiscordNotifier") as mock_notifier_class:
-        mock_notifier = Mock()
-        mock_notifier_class.return_value = mock_notifier
+@pytest.fixture
+def webhook_env(base_env):
+    """Configure the Discord webhook"""
+    os.environ["DISCORD_WEBHOOK_URL"] = WEBHOOK_URL
 
-        processor = MediaProcessor(config)
 
-        movie = {
-            "id": 1,
-            "title": "The Matrix",
-            "year": 1999,
-            "imdbId": "tt0133093",
-        }
-        result = processor._process_movie(movie)
+@pytest.fixture
+def rd_env(base_env):
+    """Configure Real-Debrid verification"""
+    os.environ["REALDEBRID_API_KEY"] = "rd-key"
 
-        assert result is False
-        mock_notifier.collect_failure.assert_called_once()
 
-        call_args = mock_notifier.collect_failure.call_args
-        assert call_args[1]["media_type"] == "movie"
-        assert "The Matrix" in call_args[1]["title"]
-        assert "No cached streams" in call_args[1]["reason"]
+@cache
+def _config_for(environ: frozenset[tuple[str, str]]) -> Config:
+    """Build one Config per distinct environment; tests only read it, so it is shared"""
+    return Config()
 
 
-@patch("src.media_processor.SonarrClient")
-@patch("src.media_processor.RadarrClient")
-@patch("src.media_processor.AIOStreamsClient")
-def test_process_movie_calls_collect_failure_on_no_imdb(
-    mock_aiostreams_class, mock_radarr_class, mock_sonarr, monkeypatch
-):
-    """Test _process_movie calls collect_failure when no IMDB ID"""
-    monkeypatch.setenv("AIOSTREAMS_URL", "http://aiostreams")
-    monkeypatch.setenv("RADARR_URL", "http://radarr")
-    monkeypatch.setenv("RADARR_API_KEY", "test-key")
-    monkeypatch.setenv("DISCORD_WEBHOOK_URL", "https://discord.com/api/webhooks/123/abc")
+@pytest.fixture
+def config(request, base_env):
+    """Config parsed after every env fixture the test requests, whatever the argument order"""
+    for name in ENV_FIXTURES:
+        if name in request.fixturenames:
+            request.getfixturevalue(name)
+    # The environment is complete here, so the snapshot names exactly the settings Config reads
+    return _config_for(frozenset(os.environ.items()))
 
-    config = Config()
 
-    with patch("src.media_processor.DiscordNotifier") as mock_notifier_class:
-        mock_notifier = Mock()
-        mock_notifier_class.return_value = mock_notifier
+@pytest.fixture
+def processor(config, notifier_class):
+    """MediaProcessor built from the config fixture, closed after the test"""
+    processor = MediaProcessor(config)
+    yield processor
+    processor.close()
 
-        processor = MediaProcessor(config)
 
-        movie = {
-            "id": 1,
-            "title": "The Matrix",
-            "year": 1999,
-            "imdbId": "",  # No IMDB ID
-        }
-        result = processor._process_movie(movie)
+@pytest.fixture(scope="module")
+def radarr_webhook_config():
+    """Radarr + webhook Config built once per module for tests that only read it"""
+    with patch.dict(os.environ, {**BASE_ENV, **RADARR_ENV, "DISCORD_WEBHOOK_URL": WEBHOOK_URL}):
+        for name in (
+            set(SERVICE_ENV_VARS + TUNING_ENV_VARS) - set(RADARR_ENV) - {"DISCORD_WEBHOOK_URL"}
+        ):
+            os.environ.pop(name, None)
+        # Config copies the values at init, so the environment is restored right away
+        return Config()
 
-        assert result is False
-        mock_notifier.collect_failure.assert_called_once()
 
-        call_args = mock_notifier.collect_failure.call_args
-        assert "No IMDB ID" in call_args[1]["reason"]
+def test_config_fixture_applies_env_fixtures_listed_after_it(
+    monkeypatch, config, rd_env, radarr_env
+):
+    """config sees env fixtures requested after it and none of the host's tuning settings"""
+    assert config.radarr_enabled
+    assert config.realdebrid_api_key == "rd-key"
+    assert config.storage_path == ""
+    assert config.concurrency == 4
 
 
-@patch("src.media_processor.SonarrClient")
-@patch("src.media_processor.RadarrClient")
-@patch("src.media_processor.AIOStreamsClient")
-def test_process_movie_calls_collect_failure_on_no_playback_url(
-    mock_aiostreams_class, mock_radarr_class, mock_sonarr, monkeypatch
+def test_media_processor_initializes_notifier_when_webhook_configured(
+    notifier_class, radarr_webhook_config
 ):
-    """Test _process_movie calls collect_failure when stream has no URL"""
-    monkeypatch.setenv("AIOSTREAMS_URL", "http://aiostreams")
-    monkeypatch.setenv("RADARR_URL", "http://radarr")
-    monkeypatch.setenv("RADARR_API_KEY", "test-key")
-    monkeypatch.setenv("DISCORD_WEBHOOK_URL", "https://discord.com/api/webhooks/123/abc")
+    """Test MediaProcessor initializes DiscordNotifier when webhook URL is set"""
+    processor = MediaProcessor(radarr_webhook_config)
 
-    config = Config()
+    notifier_class.assert_called_once_with(WEBHOOK_URL, background=True)
+    assert processor.notifier is notifier_class.return_value
 
-    mock_aiostreams = mock_aiostreams_class.return_value
-    mock_aiostreams.search_movie.return_value = [
-        {"title": "The Matrix 1080p", "url": "", "description": "1080p"}
-    ]
 
-    with patch("src.media_processor.DiscordNotifier") as mock_notifier_class:
-        mock_notifier = Mock()
-        mock_notifier_class.return_value = mock_notifier
+def test_media_processor_no_notifier_when_webhook_not_configured(radarr_env, processor):
+    """Test MediaProcessor doesn't initialize DiscordNotifier when webhook URL is empty"""
+    assert processor.notifier is None
 
-        processor = MediaProcessor(config)
 
-        movie = {
-            "id": 1,
-            "title": "The Matrix",
-            "year": 1999,
-            "imdbId": "tt0133093",
-        }
-        result = processor._process_movie(movie)
+@pytest.mark.parametrize(
+    ("overrides", "streams", "reason"),
+    [
+        ({"imdbId": ""}, [], "No IMDB ID"),
+        ({}, [], "No cached streams"),
+        ({}, [MOVIE_STREAM_NO_URL], "stream attempts failed"),
+        ({}, [MOVIE_STREAM], "stream attempts failed"),
+    ],
+    ids=["no_imdb", "no_streams", "no_playback_url", "download_failed"],
+)
+def test_process_movie_collects_failure(
+    mocker, clients, notifier, radarr_webhook_config, movie, overrides, streams, reason
+):
+    """_process_movie reports each failure branch through collect_failure"""
+    movie.update(overrides)
+    clients.aiostreams.return_value.search_movie.return_value = streams
 
-        assert result is False
-        mock_notifier.collect_failure.assert_called_once()
+    processor = MediaProcessor(radarr_webhook_config)
+    mocker.patch.object(processor, "_trigger_aiostreams_download", return_value=False)
+    result = processor._process_movie(movie)
 
-        call_args = mock_notifier.collect_failure.call_args
-        assert "stream attempts failed" in call_args[1]["reason"]
+    assert result is False
+    assert_failure_collected(
+        notifier, media_type="movie", title=MOVIE_TITLE, reason_contains=reason
+    )
+
+
+@pytest.mark.parametrize(
+    ("item_fixture", "stream", "search_attr", "process_attr", "media_type", "title"),
+    [
+        ("movie", MOVIE_STREAM, "search_movie", "_process_movie", "movie", MOVIE_TITLE),
+        (
+            "episode",
+            EPISODE_STREAM,
+            "search_episode",
+            "_process_episode",
+            "episode",
+            EPISODE_TITLE,
+        ),
+    ],
+    ids=["movie", "episode"],
+)
+def test_process_item_calls_notify_success(
+    mocker,
+    request,
+    clients,
+    notifier,
+    radarr_env,
+    sonarr_env,
+    webhook_env,
+    processor,
+    item_fixture,
+    stream,
+    search_attr,
+    process_attr,
+    media_type,
+    title,
+):
+    """_process_movie and _process_episode call notify_success on successful processing"""
+    getattr(clients.aiostreams.return_value, search_attr).return_value = [stream]
 
+    mocker.patch.object(processor, "_trigger_aiostreams_download", return_value=True)
+    result = getattr(processor, process_attr)(request.getfixturevalue(item_fixture))
 
-@patch("src.media_processor.SonarrClient")
-@patch("src.media_processor.RadarrClient")
-@patch("src.media_processor.AIOStreamsClient")
-def test_process_movie_calls_collect_failure_on_download_failed(
-    mock_aiostreams_class, mock_radarr_class, mock_sonarr, monkeypatch
+    assert result is True
+    notifier.notify_success.assert_called_once()
+    kwargs = notifier.notify_success.call_args.kwargs
+    assert kwargs["media_type"] == media_type
+    assert kwargs["title"] == title
+
+
+@pytest.mark.parametrize(
+    ("overrides", "streams", "reason"),
+    [
+        ({"series": {"title": "Breaking Bad", "imdbId": "", "tvdbId": ""}}, [], "No IMDB/TVDB ID"),
+        ({}, [], "No cached streams"),
+        ({}, [EPISODE_STREAM_NO_URL], "stream attempts failed"),
+        ({}, [EPISODE_STREAM], "stream attempts failed"),
+    ],
+    ids=["no_ids", "no_streams", "no_playback_url", "download_failed"],
+)
+def test_process_episode_collects_failure(
+    mocker,
+    clients,
+    notifier,
+    sonarr_env,
+    webhook_env,
+    processor,
+    episode,
+    overrides,
+    streams,
+    reason,
 ):
-    """Test _process_movie calls collect_failure when download trigger fails"""
-    monkeypatch.setenv("AIOSTREAMS_URL", "http://aiostreams")
-    monkeypatch.setenv("RADARR_URL", "http://radarr")
-    monkeypatch.setenv("RADARR_API_KEY", "test-key")
-    monkeypatch.setenv("DISCORD_WEBHOOK_URL", "https://discord.com/api/webhooks/123/abc")
+    """_process_episode reports each failure branch through collect_failure"""
+    episode.update(overrides)
+    clients.aiostreams.return_value.search_episode.return_value = streams
 
-    config = Config()
+    mocker.patch.object(processor, "_trigger_aiostreams_download", return_value=False)
+    result = processor._process_episode(episode)
 
-    mock_aiostreams = mock_aiostreams_class.return_value
-    mock_aiostreams.search_movie.return_value = [
-        {"title": "The Matrix 1080p", "url": "http://stream-url", "description": "1080p"}
-    ]
-
-    with patch("src.media_processor.DiscordNotifier") as mock_notifier_class:
-        mock_notifier = Mock()
-        mock_notifier_class.return_value = mock_notifier
+    assert result is False
+    assert_failure_collected(
+        notifier, media_type="episode", title=EPISODE_TITLE, reason_contains=reason
+    )
 
-        processor = MediaProcessor(config)
 
-        with patch.object(processor, "_trigger_aiostreams_download", return_value=False):
-            movie = {
-                "id": 1,
-                "title": "The Matrix",
-                "year": 1999,
-                "imdbId": "tt0133093",
-            }
-            result = processor._process_movie(movie)
+def test_process_all_calls_send_failure_summary(clients, notifier, radarr_webhook_config):
+    """Test process_all sends the success and failure summaries at end of cycle"""
+    clients.radarr.return_value = SimpleNamespace(iter_wanted_movies=lambda page_size: [])
 
-            assert result is False
-            mock_notifier.collect_failure.assert_called_once()
+    processor = MediaProcessor(radarr_webhook_config)
+    processor.process_all()
 
-            call_args = mock_notifier.collect_failure.call_args
-            assert "stream attempts failed" in call_args[1]["reason"]
+    notifier.send_success_summary.assert_called_once()
+    notifier.send_failure_summary.assert_called_once()
 
 
-@patch("src.media_processor.SonarrClient")
-@patch("src.media_processor.RadarrClient")
-@patch("src.media_processor.AIOStreamsClient")
-def test_process_episode_calls_notify_success(
-    mock_aiostreams_class, mock_radarr, mock_sonarr_class, monkeypatch
+def test_process_all_flushes_and_summarizes_when_a_pass_fails(
+    mocker, clients, notifier, radarr_webhook_config
 ):
-    """Test _process_episode calls notify_success on successful processing"""
-    monkeypatch.setenv("AIOSTREAMS_URL", "http://aiostreams")
-    monkeypatch.setenv("SONARR_URL", "http://sonarr")
-    monkeypatch.setenv("SONARR_API_KEY", "test-key")
-    monkeypatch.setenv("DISCORD_WEBHOOK_URL", "https://discord.com/api/webhooks/123/abc")
-
-    config = Config()
-
-    mock_sonarr = mock_sonarr_class.return_value
-    mock_sonarr.unmonitor_episode.return_value = True
-
-    mock_aiostreams = mock_aiostreams_class.return_value
-    mock_aiostreams.search_episode.return_value = [
-        {
-            "title": "Breaking Bad S01E01 1080p",
-            "url": "http://stream-url",
-            "description": "1080p WEB-DL",
-        }
-    ]
-
-    with patch("src.media_processor.DiscordNotifier") as mock_notifier_class:
-        mock_notifier = Mock()
-        mock_notifier_class.return_value = mock_notifier
+    """A pass that raises still gets its results flushed and summarized before propagating"""
+    processor = MediaProcessor(radarr_webhook_config)
+    mocker.patch.object(processor, "process_wanted_movies", side_effect=RuntimeError("boom"))
+    mock_flush = mocker.patch.object(processor.storage, "flush")
 
-        processor = MediaProcessor(config)
-
-        with patch.object(processor, "_trigger_aiostreams_download", return_value=True):
-            episode = {
-                "id": 1,
-                "seasonNumber": 1,
-                "episodeNumber": 1,
-                "title": "Pilot",
-                "series": {"title": "Breaking Bad", "imdbId": "tt0959621"},
-            }
-            result = processor._process_episode(episode)
+    with pytest.raises(RuntimeError, match="boom"):
+        processor.process_all()
 
-            assert result is True
-            mock_notifier.notify_success.assert_called_once()
+    mock_flush.assert_called_once()
+    notifier.send_success_summary.assert_called_once()
+    notifier.send_failure_summary.assert_called_once()
 
-            call_args = mock_notifier.notify_success.call_args
-            assert call_args[1]["media_type"] == "episode"
-            assert "Breaking Bad" in call_args[1]["title"]
 
+def test_process_all_no_failure_summary_without_notifier(clients, radarr_env, config):
+    """Test process_all doesn't crash when notifier is None"""
+    clients.radarr.return_value = SimpleNamespace(iter_wanted_movies=lambda page_size: [])
 
-@patch("src.media_processor.SonarrClient")
-@patch("src.media_processor.RadarrClient")
-@patch("src.media_processor.AIOStreamsClient")
-def test_process_episode_calls_collect_failure_on_no_streams(
-    mock_aiostreams_class, mock_radarr, mock_sonarr_class, monkeypatch
-):
-    """Test _process_episode calls collect_failure when no streams found"""
-    monkeypatch.setenv("AIOSTREAMS_URL", "http://aiostreams")
-    monkeypatch.setenv("SONARR_URL", "http://sonarr")
-    monkeypatch.setenv("SONARR_API_KEY", "test-key")
-    monkeypatch.setenv("DISCORD_WEBHOOK_URL", "https://discord.com/api/webhooks/123/abc")
-
-    config = Config()
-
-    mock_aiostreams = mock_aiostreams_class.return_value
-    mock_aiostreams.search_episode.return_value = []  # No streams
-
-    with patch("src.media_processor.DiscordNotifier") as mock_notifier_class:
-        mock_notifier = Mock()
-        mock_notifier_class.return_value = mock_notifier
-
-        processor = MediaProcessor(config)
-
-        episode = {
-            "id": 1,
-            "seasonNumber": 1,
-            "episodeNumber": 1,
-            "title": "Pilot",
-            "series": {"title": "Breaking Bad", "imdbId": "tt0959621"},
-        }
-        result = processor._process_episode(episode)
-
-        assert result is False
-        mock_notifier.collect_failure.assert_called_once()
-
-        call_args = mock_notifier.collect_failure.call_args
-        assert call_args[1]["media_type"] == "episode"
-        assert "Breaking Bad" in call_args[1]["title"]
-        assert "No cached streams" in call_args[1]["reason"]
-
-
-@patch("src.media_processor.SonarrClient")
-@patch("src.media_processor.RadarrClient")
-@patch("src.media_processor.AIOStreamsClient")
-def test_process_episode_calls_collect_failure_on_no_ids(
-    mock_aiostreams_class, mock_radarr, mock_sonarr_class, monkeypatch
-):
-    """Test _process_episode calls collect_failure when no IMDB/TVDB ID"""
-    monkeypatch.setenv("AIOSTREAMS_URL", "http://aiostreams")
-    monkeypatch.setenv("SONARR_URL", "http://sonarr")
-    monkeypatch.setenv("SONARR_API_KEY", "test-key")
-    monkeypatch.setenv("DISCORD_WEBHOOK_URL", "https://discord.com/api/webhooks/123/abc")
+    processor = MediaProcessor(config)
+    # Should not raise an exception
+    processor.process_all()
 
-    config = Config()
+    assert processor.notifier is None
 
-    with patch("src.media_processor.DiscordNotifier") as mock_notifier_class:
-        mock_notifier = Mock()
-        mock_notifier_class.return_value = mock_notifier
 
-        processor = MediaProcessor(config)
+def test_close_closes_configured_clients(clients, radarr_env, processor):
+    """close() closes each configured client and skips the ones left as None"""
+    processor.close()
 
-        episode = {
-            "id": 1,
-            "seasonNumber": 1,
-            "episodeNumber": 1,
-            "title": "Pilot",
-            "series": {"title": "Breaking Bad", "imdbId": "", "tvdbId": ""},
-        }
-        result = processor._process_episode(episode)
+    clients.aiostreams.return_value.close.assert_called_once()
+    clients.radarr.return_value.close.assert_called_once()
+    clients.sonarr.return_value.close.assert_not_called()
 
-        assert result is False
-        mock_notifier.collect_failure.assert_called_once()
 
-        call_args = mock_notifier.collect_failure.call_args
-        assert "No IMDB/TVDB ID" in call_args[1]["reason"]
+def test_try_stream_returns_true_on_trigger_success_no_rd(mocker, radarr_env, processor):
+    """_try_stream returns True when trigger succeeds and no RD client configured"""
+    stream = {
+        "title": "Show S01E01 1080p",
+        "url": "http://stream-url",
+        "filename": "Show.S01E01.mkv",
+    }
 
+    mocker.patch.object(processor, "_trigger_aiostreams_download", return_value=True)
+    result = processor._try_stream(stream, "Show S01E01")
 
-@patch("src.media_processor.SonarrClient")
-@patch("src.media_processor.RadarrClient")
-@patch("src.media_processor.AIOStreamsClient")
-def test_process_episode_calls_collect_failure_on_no_playback_url(
-    mock_aiostreams_class, mock_radarr, mock_sonarr_class, monkeypatch
-):
-    """Test _process_episode calls collect_failure when stream has no URL"""
-    monkeypatch.setenv("AIOSTREAMS_URL", "http://aiostreams")
-    monkeypatch.setenv("SONARR_URL", "http://sonarr")
-    monkeypatch.setenv("SONARR_API_KEY", "test-key")
-    monkeypatch.setenv("DISCORD_WEBHOOK_URL", "https://discord.com/api/webhooks/123/abc")
+    assert result is True
+    assert processor.rd_client is None
 
-    config = Config()
 
-    mock_aiostreams = mock_aiostreams_class.return_value
-    mock_aiostreams.search_episode.return_value = [
-        {"title": "Breaking Bad S01E01", "url": "", "description": "1080p"}
-    ]
+def test_try_stream_returns_false_on_no_url(mocker, radarr_env, processor):
+    """_try_stream returns False immediately when stream has no URL"""
+    stream = {"title": "Show S01E01 1080p", "url": "", "filename": "Show.S01E01.mkv"}
 
-    with patch("src.media_processor.DiscordNotifier") as mock_notifier_class:
-        mock_notifier = Mock()
-        mock_notifier_class.return_value = mock_notifier
+    mock_trigger = mocker.patch.object(processor, "_trigger_aiostreams_download")
+    result = processor._try_stream(stream, "Show S01E01")
 
-        processor = MediaProcessor(config)
+    assert result is False
+    mock_trigger.assert_not_called()
 
-        episode = {
-            "id": 1,
-            "seasonNumber": 1,
-            "episodeNumber": 1,
-            "title": "Pilot",
-            "series": {"title": "Breaking Bad", "imdbId": "tt0959621"},
-        }
-        result = processor._process_episode(episode)
 
-        assert result is False
-        mock_notifier.collect_failure.assert_called_once()
+@pytest.mark.parametrize(
+    ("rd_filename", "expected", "delays"),
+    [
+        (SHRINKING_FILENAME, True, [1]),
+        # Polled with backoff for the full 15s budget before giving up
+        ("Some.Other.Movie.mkv", False, [1, 2, 4, 8]),
+    ],
+    ids=["verified", "missing"],
+)
+def test_try_stream_checks_rd_for_filename(
+    mocker, radarr_env, rd_env, config, rd_filename, expected, delays
+):
+    """_try_stream succeeds only when an RD torrent matches the stream's filename"""
+    mock_rd = mocker.patch.object(media_processor, "RealDebridClient").return_value
+    mock_rd.list_torrents.return_value = [{"filename": rd_filename, "status": "downloaded"}]
 
-        call_args = mock_notifier.collect_failure.call_args
-        assert "stream attempts failed" in call_args[1]["reason"]
+    mock_sleep = Mock()
+    processor = MediaProcessor(config, sleep=mock_sleep)
+    stream = {"title": "[RD⚡️] 4K", "url": "http://stream-url", "filename": SHRINKING_FILENAME}
 
+    mocker.patch.object(processor, "_trigger_aiostreams_download", return_value=True)
+    result = processor._try_stream(stream, "Shrinking S03E04")
 
-@patch("src.media_processor.SonarrClient")
-@patch("src.media_processor.RadarrClient")
-@patch("src.media_processor.AIOStreamsClient")
-def test_process_episode_calls_collect_failure_on_download_failed(
-    mock_aiostreams_class, mock_radarr, mock_sonarr_class, monkeypatch
-):
-    """Test _process_episode calls collect_failure when download trigger fails"""
-    monkeypatch.setenv("AIOSTREAMS_URL", "http://aiostreams")
-    monkeypatch.setenv("SONARR_URL", "http://sonarr")
-    monkeypatch.setenv("SONARR_API_KEY", "test-key")
-    monkeypatch.setenv("DISCORD_WEBHOOK_URL", "https://discord.com/api/webhooks/123/abc")
+    assert result is expected
+    assert [c[0][0] for c in mock_sleep.call_args_list] == delays
+    assert mock_rd.list_torrents.call_count == len(delays)
 
-    config = Config()
 
-    mock_aiostreams = mock_aiostreams_class.return_value
-    mock_aiostreams.search_episode.return_value = [
-        {"title": "Breaking Bad S01E01", "url": "http://stream-url", "description": "1080p"}
+def test_try_stream_stops_polling_once_rd_has_torrent(mocker, radarr_env, rd_env, config):
+    """_try_stream verifies as soon as the torrent shows up instead of waiting 15s"""
+    mock_rd_class = mocker.patch.object(media_processor, "RealDebridClient")
+    mock_rd = mock_rd_class.return_value
+    mock_rd.list_torrents.side_effect = [
+        [],
+        [{"id": "rd1", "filename": "Movie.2024.1080p.mkv", "status": "downloading"}],
     ]
+    mock_rd.get_torrent_info.return_value = {"original_filename": "Movie.2024.1080p"}
 
-    with patch("src.media_processor.DiscordNotifier") as mock_notifier_class:
-        mock_notifier = Mock()
-        mock_notifier_class.return_value = mock_notifier
-
-        processor = MediaProcessor(config)
+    mock_sleep = Mock()
+    processor = MediaProcessor(config, sleep=mock_sleep)
+    stream = {"title": "1080p", "url": "http://stream-url", "filename": "Movie.2024.1080p.mkv"}
 
-        with patch.object(processor, "_trigger_aiostreams_download", return_value=False):
-            episode = {
-                "id": 1,
-                "seasonNumber": 1,
-                "episodeNumber": 1,
-                "title": "Pilot",
-                "series": {"title": "Breaking Bad", "imdbId": "tt0959621"},
-            }
-            result = processor._process_episode(episode)
+    mocker.patch.object(processor, "_trigger_aiostreams_download", return_value=True)
+    result = processor._try_stream(stream, "Movie (2024)")
 
-            assert result is False
-            mock_notifier.collect_failure.assert_called_once()
-
-            call_args = mock_notifier.collect_failure.call_args
-            assert "stream attempts failed" in call_args[1]["reason"]
+    assert result is True
+    assert [c[0][0] for c in mock_sleep.call_args_list] == [1, 2]
 
 
-@patch("src.media_processor.SonarrClient")
-@patch("src.media_processor.RadarrClient")
-@patch("src.media_processor.AIOStreamsClient")
-def test_process_all_calls_send_failure_summary(
-    mock_aiostreams, mock_radarr_class, mock_sonarr, monkeypatch
-):
-    """Test process_all calls send_failure_summary at end of cycle"""
-    monkeypatch.setenv("AIOSTREAMS_URL", "http://aiostreams")
-    monkeypatch.setenv("RADARR_URL", "http://radarr")
-    monkeypatch.setenv("RADARR_API_KEY", "test-key")
-    monkeypatch.setenv("DISCORD_WEBHOOK_URL", "https://discord.com/api/webhooks/123/abc")
-
-    config = Config()
+def test_try_stream_returns_true_when_rd_api_errors(mocker, radarr_env, rd_env, config):
+    """_try_stream returns True when RD list_torrents errors (graceful degradation)"""
+    mock_rd_class = mocker.patch.object(media_processor, "RealDebridClient")
+    mock_rd = Mock()
+    mock_rd_class.return_value = mock_rd
+    mock_rd.list_torrents.return_value = None  # API error
 
-    mock_radarr = mock_radarr_class.return_value
-    mock_radarr.get_wanted_movies.return_value = []
+    processor = MediaProcessor(config)
 
-    with patch("src.media_processor.DiscordNotifier") as mock_notifier_class:
-        mock_notifier = Mock()
-        mock_notifier_class.return_value = mock_notifier
+    stream = {
+        "title": "[RD⚡️] 4K",
+        "url": "http://stream-url",
+        "filename": "Shrinking S03E04 The Field 2160p ATVP WEB-DL DDP5 1 DV H 265-NTb.mkv",
+    }
 
-        processor = MediaProcessor(config)
-        processor.process_all()
+    mocker.patch.object(processor, "_trigger_aiostreams_download", return_value=True)
+    result = processor._try_stream(stream, "Shrinking S03E04")
 
-        mock_notifier.send_failure_summary.assert_called_once()
+    assert result is True
 
 
-@patch("src.media_processor.SonarrClient")
-@patch("src.media_processor.RadarrClient")
-@patch("src.media_processor.AIOStreamsClient")
-def test_process_all_no_failure_summary_without_notifier(
-    mock_aiostreams, mock_radarr_class, mock_sonarr, monkeypatch
+@pytest.mark.parametrize(
+    ("num_streams", "succeeds_on", "expected", "expected_attempts"),
+    [
+        (2, 2, True, 2),
+        # MAX_RETRY_ATTEMPTS defaults to 3, so the fourth stream is never tried
+        (4, None, False, 3),
+    ],
+    ids=["succeeds_on_second_stream", "fails_after_max_retries"],
+)
+@pytest.mark.parametrize(
+    ("item_fixture", "search_attr", "process_attr", "unmonitor_attr"),
+    [
+        ("movie", "search_movie", "_process_movie", "_unmonitor_movies"),
+        ("episode", "search_episode", "_process_episode", "_unmonitor_episodes"),
+    ],
+    ids=["movie", "episode"],
+)
+def test_process_item_retries_streams(
+    request,
+    mocker,
+    clients,
+    radarr_env,
+    sonarr_env,
+    processor,
+    item_fixture,
+    search_attr,
+    process_attr,
+    unmonitor_attr,
+    num_streams,
+    succeeds_on,
+    expected,
+    expected_attempts,
 ):
-    """Test process_all doesn't crash when notifier is None"""
-    monkeypatch.setenv("AIOSTREAMS_URL", "http://aiostreams")
-    monkeypatch.setenv("RADARR_URL", "http://radarr")
-    monkeypatch.setenv("RADARR_API_KEY", "test-key")
-    monkeypatch.delenv("DISCORD_WEBHOOK_URL", raising=False)
+    """Each stream is tried in turn until one verifies or max_retry_attempts is reached"""
+    getattr(clients.aiostreams.return_value, search_attr).return_value = list(
+        RETRY_STREAMS[:num_streams]
+    )
+    try_stream = mocker.patch.object(
+        processor,
+        "_try_stream",
+        side_effect=lambda stream, label: stream["url"] == f"http://stream-{succeeds_on}",
+    )
+
+    item = request.getfixturevalue(item_fixture)
+    result = getattr(processor, process_attr)(item)
+
+    assert result is expected
+    assert try_stream.call_count == expected_attempts
+    assert getattr(processor, unmonitor_attr) == ([item] if expected else [])
+
+
+def test_process_wanted_movies_prefetches_streams(mocker, clients, radarr_env, processor):
+    """process_wanted_movies searches all pending movies at once and hands streams over"""
+    movies = [
+        {"id": 1, "title": "Movie One", "year": 2024, "imdbId": "tt1111111"},
+        {"id": 2, "title": "Movie Two", "year": 2024, "imdbId": "tt2222222"},
+    ]
+    streams = [{"title": "Movie 1080p", "url": "http://stream-1"}]
+    clients.radarr.return_value.iter_wanted_movies.return_value = movies
+    mock_aiostreams = clients.aiostreams.return_value
+    mock_aiostreams.search_movies.return_value = {"tt1111111": streams, "tt2222222": []}
 
-    config = Config()
+    processor.storage.mark_processed(2, success=True)
 
-    mock_radarr = mock_radarr_class.return_value
-    mock_radarr.get_wanted_movies.return_value = []
+    mock_process = mocker.patch.object(processor, "_process_movie")
+    processor.process_wanted_movies()
 
-    processor = MediaProcessor(config)
-    # Should not raise an exception
-    processor.process_all()
+    mock_aiostreams.search_movies.assert_called_once_with(["tt1111111"])
+    mock_process.assert_called_once_with(movies[0], streams)
 
-    assert processor.notifier is None
 
+def test_process_wanted_movies_runs_items_concurrently(mocker, clients, monkeypatch, radarr_env):
+    """Pending movies are processed on worker threads and one failure doesn't stop the rest"""
+    monkeypatch.setenv("CONCURRENCY", "3")
 
-@patch("src.media_processor.SonarrClient")
-@patch("src.media_processor.RadarrClient")
-@patch("src.media_processor.AIOStreamsClient")
-def test_try_stream_returns_true_on_trigger_success_no_rd(
-    mock_aiostreams, mock_radarr, mock_sonarr, monkeypatch
-):
-    """_try_stream returns True when trigger succeeds and no RD client configured"""
-    monkeypatch.setenv("AIOSTREAMS_URL", "http://aiostreams")
-    monkeypatch.setenv("RADARR_URL", "http://radarr")
-    monkeypatch.setenv("RADARR_API_KEY", "test-key")
-    monkeypatch.delenv("REALDEBRID_API_KEY", raising=False)
+    movies = [{"id": i, "title": f"Movie {i}", "imdbId": f"tt{i:07d}"} for i in range(1, 4)]
+    clients.radarr.return_value.iter_wanted_movies.return_value = movies
+    clients.aiostreams.return_value.search_movies.return_value = {}
 
-    config = Config()
-    processor = MediaProcessor(config)
+    processor = MediaProcessor(Config())
+    barrier = threading.Barrier(3, timeout=5)
 
-    stream = {
-        "title": "Show S01E01 1080p",
-        "url": "http://stream-url",
-        "filename": "Show.S01E01.mkv",
-    }
+    def process(movie, streams):
+        # Every worker must be running at once for the barrier to release
+        barrier.wait()
+        if movie["id"] == 2:
+            raise RuntimeError("boom")
+        return True
 
-    with patch.object(processor, "_trigger_aiostreams_download", return_value=True):
-        result = processor._try_stream(stream, "Show S01E01")
+    mock_process = mocker.patch.object(processor, "_process_movie", side_effect=process)
+    processor.process_wanted_movies()
 
-    assert result is True
-    assert processor.rd_client is None
+    assert mock_process.call_count == 3
 
 
-@patch("src.media_processor.SonarrClient")
-@patch("src.media_processor.RadarrClient")
-@patch("src.media_processor.AIOStreamsClient")
-def test_try_stream_returns_false_on_no_url(mock_aiostreams, mock_radarr, mock_sonarr, monkeypatch):
-    """_try_stream returns False immediately when stream has no URL"""
-    monkeypatch.setenv("AIOSTREAMS_URL", "http://aiostreams")
-    monkeypatch.setenv("RADARR_URL", "http://radarr")
-    monkeypatch.setenv("RADARR_API_KEY", "test-key")
-    monkeypatch.delenv("REALDEBRID_API_KEY", raising=False)
+def test_process_wanted_movies_sequential_failure_does_not_stop_pass(
+    mocker, clients, monkeypatch, radarr_env
+):
+    """With CONCURRENCY=1 an item that raises is logged and the remaining items still run"""
+    monkeypatch.setenv("CONCURRENCY", "1")
 
-    config = Config()
-    processor = MediaProcessor(config)
+    movies = [{"id": i, "title": f"Movie {i}", "imdbId": f"tt{i:07d}"} for i in range(1, 4)]
+    clients.radarr.return_value.iter_wanted_movies.return_value = movies
+    clients.aiostreams.return_value.search_movies.return_value = {}
 
-    stream = {"title": "Show S01E01 1080p", "url": "", "filename": "Show.S01E01.mkv"}
+    processor = MediaProcessor(Config())
+    mock_process = mocker.patch.object(
+        processor, "_process_movie", side_effect=[True, RuntimeError("boom"), True]
+    )
+    processor.process_wanted_movies()
 
-    with patch.object(processor, "_trigger_aiostreams_download") as mock_trigger:
-        result = processor._try_stream(stream, "Show S01E01")
+    assert mock_process.call_count == 3
 
-    assert result is False
-    mock_trigger.assert_not_called()
 
+def test_process_wanted_movies_bulk_unmonitors_successes(mocker, clients, monkeypatch, radarr_env):
+    """Successful movies are unmonitored together in one request at the end of the pass"""
+    monkeypatch.setenv("CONCURRENCY", "1")
 
-@patch("src.media_processor.SonarrClient")
-@patch("src.media_processor.RadarrClient")
-@patch("src.media_processor.AIOStreamsClient")
-def test_try_stream_returns_true_when_rd_verifies_filename(
-    mock_aiostreams, mock_radarr, mock_sonarr, monkeypatch
+    movies = [{"id": i, "title": f"Movie {i}", "imdbId": f"tt{i:07d}"} for i in (1, 2, 3)]
+    mock_radarr = clients.radarr.return_value
+    mock_radarr.iter_wanted_movies.return_value = movies
+    clients.aiostreams.return_value.search_movies.return_value = {
+        movie["imdbId"]: [{"title": "Movie 1080p", "url": "http://stream"}] for movie in movies
+    }
+
+    processor = MediaProcessor(Config())
+
+    # Movie 2 fails to trigger, so only 1 and 3 are unmonitored
+    mocker.patch.object(processor, "_try_stream", side_effect=[True, False, True])
+    processor.process_wanted_movies()
+
+    mock_radarr.bulk_unmonitor_movies.assert_called_once_with([1, 3])
+    mock_radarr.unmonitor_movie.assert_not_called()
+    assert processor._unmonitor_movies == []
+
+
+@pytest.mark.parametrize(
+    ("client_attr", "queue_attr", "flush_attr", "bulk_attr", "single_attr"),
+    [
+        (
+            "radarr",
+            "_unmonitor_movies",
+            "_flush_unmonitored_movies",
+            "bulk_unmonitor_movies",
+            "unmonitor_movie",
+        ),
+        (
+            "sonarr",
+            "_unmonitor_episodes",
+            "_flush_unmonitored_episodes",
+            "bulk_unmonitor_episodes",
+            "unmonitor_episode",
+        ),
+    ],
+    ids=["movie", "episode"],
+)
+def test_flush_unmonitored_falls_back_to_single_requests(
+    clients,
+    radarr_env,
+    sonarr_env,
+    processor,
+    client_attr,
+    queue_attr,
+    flush_attr,
+    bulk_attr,
+    single_attr,
 ):
-    """_try_stream returns True when RD list_torrents contains matching filename"""
-    monkeypatch.setenv("AIOSTREAMS_URL", "http://aiostreams")
-    monkeypatch.setenv("RADARR_URL", "http://radarr")
-    monkeypatch.setenv("RADARR_API_KEY", "test-key")
-    monkeypatch.setenv("REALDEBRID_API_KEY", "rd-key")
-
-    config = Config()
-
-    with patch("src.media_processor.RealDebridClient") as mock_rd_class:
-        mock_rd = Mock()
-        mock_rd_class.return_value = mock_rd
-        mock_rd.list_torrents.return_value = [
-            {
-                "filename": "Shrinking S03E04 The Field 2160p ATVP WEB-DL DDP5 1 DV H 265-NTb.mkv",
-                "status": "downloaded",
-            }
-        ]
-
-        processor = MediaProcessor(config)
-
-        stream = {
-            "title": "[RD⚡️] 4K",
-            "url": "http://stream-url",
-            "filename": "Shrinking S03E04 The Field 2160p ATVP WEB-DL DDP5 1 DV H 265-NTb.mkv",
-        }
-
-        with (
-            patch.object(processor, "_trigger_aiostreams_download", return_value=True),
-            patch("time.sleep"),
-        ):
-            result = processor._try_stream(stream, "Shrinking S03E04")
+    """A failed bulk unmonitor retries each queued record with its own request"""
+    records = [{"id": 1, "monitored": True}, {"id": 2, "monitored": True}]
+    client = getattr(clients, client_attr).return_value
+    getattr(client, bulk_attr).return_value = False
+    setattr(processor, queue_attr, list(records))
+
+    getattr(processor, flush_attr)()
+
+    getattr(client, bulk_attr).assert_called_once_with([1, 2])
+    single = getattr(client, single_attr)
+    assert [call.args for call in single.call_args_list] == [(1, records[0]), (2, records[1])]
+    assert getattr(processor, queue_attr) == []
+
+
+def test_process_wanted_episodes_joins_series_from_one_call(mocker, clients, sonarr_env, processor):
+    """Episodes are fetched without embedded series and joined to a single /series call"""
+    series = {"id": 7, "title": "Breaking Bad", "imdbId": "tt0903747"}
+    episodes = [
+        {"id": 1, "seriesId": 7, "seasonNumber": 1, "episodeNumber": 1},
+        {"id": 2, "seriesId": 7, "seasonNumber": 1, "episodeNumber": 2},
+    ]
+    mock_sonarr = clients.sonarr.return_value
+    mock_sonarr.get_all_series.return_value = [series]
+    mock_sonarr.iter_wanted_episodes.return_value = episodes
+    mock_aiostreams = clients.aiostreams.return_value
+    mock_aiostreams.search_episodes.return_value = {}
 
-    assert result is True
-    mock_rd.list_torrents.assert_called_once()
+    mocker.patch.object(processor, "_process_episode")
+    processor.process_wanted_episodes()
 
+    mock_sonarr.iter_wanted_episodes.assert_called_once_with(200, include_series=False)
+    assert all(episode["series"] is series for episode in episodes)
+    mock_aiostreams.search_episodes.assert_called_once_with(
+        [("tt0903747", 1, 1), ("tt0903747", 1, 2)]
+    )
 
-@patch("src.media_processor.SonarrClient")
-@patch("src.media_processor.RadarrClient")
-@patch("src.media_processor.AIOStreamsClient")
-def test_try_stream_returns_false_when_rd_misses_filename(
-    mock_aiostreams, mock_radarr, mock_sonarr, monkeypatch
+
+def test_process_wanted_episodes_looks_up_series_missing_from_the_list(
+    mocker, clients, sonarr_env, processor
 ):
-    """_try_stream returns False when RD list_torrents does not contain matching filename"""
-    monkeypatch.setenv("AIOSTREAMS_URL", "http://aiostreams")
-    monkeypatch.setenv("RADARR_URL", "http://radarr")
-    monkeypatch.setenv("RADARR_API_KEY", "test-key")
-    monkeypatch.setenv("REALDEBRID_API_KEY", "rd-key")
-
-    config = Config()
-
-    with patch("src.media_processor.RealDebridClient") as mock_rd_class:
-        mock_rd = Mock()
-        mock_rd_class.return_value = mock_rd
-        mock_rd.list_torrents.return_value = [
-            {"filename": "Some.Other.Movie.mkv", "status": "downloaded"}
-        ]
-
-        processor = MediaProcessor(config)
-
-        stream = {
-            "title": "[RD⚡️] 4K",
-            "url": "http://stream-url",
-            "filename": "Shrinking S03E04 The Field 2160p ATVP WEB-DL DDP5 1 DV H 265-NTb.mkv",
-        }
-
-        with (
-            patch.object(processor, "_trigger_aiostreams_download", return_value=True),
-            patch("time.sleep"),
-        ):
-            result = processor._try_stream(stream, "Shrinking S03E04")
+    """A series added after the /series call is fetched once by ID instead of refetching all"""
+    old_series = {"id": 7, "title": "Breaking Bad", "imdbId": "tt0903747"}
+    new_series = {"id": 8, "title": "Better Call Saul", "imdbId": "tt3032476"}
+    episodes = [
+        {"id": 1, "seriesId": 7, "seasonNumber": 1, "episodeNumber": 1},
+        {"id": 2, "seriesId": 8, "seasonNumber": 1, "episodeNumber": 1},
+        {"id": 3, "seriesId": 8, "seasonNumber": 1, "episodeNumber": 2},
+    ]
+    mock_sonarr = clients.sonarr.return_value
+    mock_sonarr.get_all_series.return_value = [old_series]
+    mock_sonarr.get_series.return_value = new_series
+    mock_sonarr.iter_wanted_episodes.return_value = episodes
+    clients.aiostreams.return_value.search_episodes.return_value = {}
 
-    assert result is False
+    mocker.patch.object(processor, "_process_episode")
+    processor.process_wanted_episodes()
 
+    mock_sonarr.get_all_series.assert_called_once()
+    mock_sonarr.get_series.assert_called_once_with(8)
+    assert [episode["series"] for episode in episodes] == [old_series, new_series, new_series]
 
-@patch("src.media_processor.SonarrClient")
-@patch("src.media_processor.RadarrClient")
-@patch("src.media_processor.AIOStreamsClient")
-def test_try_stream_returns_true_when_rd_api_errors(
-    mock_aiostreams, mock_radarr, mock_sonarr, monkeypatch
-):
-    """_try_stream returns True when RD list_torrents errors (graceful degradation)"""
-    monkeypatch.setenv("AIOSTREAMS_URL", "http://aiostreams")
-    monkeypatch.setenv("RADARR_URL", "http://radarr")
-    monkeypatch.setenv("RADARR_API_KEY", "test-key")
-    monkeypatch.setenv("REALDEBRID_API_KEY", "rd-key")
 
-    config = Config()
+def test_process_wanted_episodes_skips_series_list_without_pending(
+    mocker, clients, sonarr_env, processor
+):
+    """When every wanted episode was recently processed, /series isn't requested at all"""
+    mock_sonarr = clients.sonarr.return_value
+    mock_sonarr.iter_wanted_episodes.return_value = [{"id": 1, "seriesId": 7}]
+    processor.storage.mark_processed("episode_1", success=True)
 
-    with patch("src.media_processor.RealDebridClient") as mock_rd_class:
-        mock_rd = Mock()
-        mock_rd_class.return_value = mock_rd
-        mock_rd.list_torrents.return_value = None  # API error
+    mocker.patch.object(processor, "_process_episode")
+    processor.process_wanted_episodes()
 
-        processor = MediaProcessor(config)
+    mock_sonarr.get_all_series.assert_not_called()
+    mock_sonarr.get_series.assert_not_called()
 
-        stream = {
-            "title": "[RD⚡️] 4K",
-            "url": "http://stream-url",
-            "filename": "Shrinking S03E04 The Field 2160p ATVP WEB-DL DDP5 1 DV H 265-NTb.mkv",
-        }
 
-        with (
-            patch.object(processor, "_trigger_aiostreams_download", return_value=True),
-            patch("time.sleep"),
-        ):
-            result = processor._try_stream(stream, "Shrinking S03E04")
+def test_process_all_runs_movies_and_episodes(clients, radarr_env, sonarr_env, processor):
+    """process_all runs both the Radarr and Sonarr passes when both are configured"""
+    clients.radarr.return_value.iter_wanted_movies.return_value = []
+    clients.sonarr.return_value.iter_wanted_episodes.return_value = []
 
-    assert result is True
+    processor.process_all()
 
+    clients.radarr.return_value.iter_wanted_movies.assert_called_once()
+    clients.sonarr.return_value.iter_wanted_episodes.assert_called_once()
 
-@patch("src.media_processor.SonarrClient")
-@patch("src.media_processor.RadarrClient")
-@patch("src.media_processor.AIOStreamsClient")
-def test_process_movie_retries_and_succeeds_on_second_stream(
-    mock_aiostreams_class, mock_radarr_class, mock_sonarr, monkeypatch
-):
-    """_process_movie tries next stream if first fails verification"""
-    monkeypatch.setenv("AIOSTREAMS_URL", "http://aiostreams")
-    monkeypatch.setenv("RADARR_URL", "http://radarr")
-    monkeypatch.setenv("RADARR_API_KEY", "test-key")
-    monkeypatch.delenv("DISCORD_WEBHOOK_URL", raising=False)
-    monkeypatch.delenv("REALDEBRID_API_KEY", raising=False)
-
-    config = Config()
-
-    mock_radarr = mock_radarr_class.return_value
-    mock_radarr.unmonitor_movie.return_value = True
-
-    mock_aiostreams = mock_aiostreams_class.return_value
-    mock_aiostreams.search_movie.return_value = [
-        {"title": "Movie 4K", "url": "http://stream-1", "filename": "Movie.4K.mkv"},
-        {"title": "Movie 1080p", "url": "http://stream-2", "filename": "Movie.1080p.mkv"},
-    ]
 
-    processor = MediaProcessor(config)
+def test_process_all_without_passes(radarr_env, processor):
+    """process_all completes a cycle when neither a Radarr nor a Sonarr client is set"""
+    # Config requires one of them, but the processor itself doesn't
+    processor.radarr = None
+    processor.process_all()
 
-    # First stream fails, second succeeds
-    call_count = 0
+    assert processor.storage.get_stats()["total"] == 0
 
-    def mock_try_stream(stream, label):
-        nonlocal call_count
-        call_count += 1
-        return call_count == 2  # Second call returns True
 
-    with patch.object(processor, "_try_stream", side_effect=mock_try_stream):
-        movie = {"id": 1, "title": "Movie", "year": 2024, "imdbId": "tt1234567"}
-        result = processor._process_movie(movie)
+def test_trigger_aiostreams_download_requests_single_byte(mocker, radarr_env, processor):
+    """The curl trigger asks for one byte and treats a 206 as success"""
+    mock_run = mocker.patch.object(media_processor.subprocess, "run")
+    mock_run.return_value = Mock(stdout="206")
+    assert processor._trigger_aiostreams_download("http://aio/playback/1", "Movie") is True
 
-    assert result is True
-    assert call_count == 2
-    mock_radarr.unmonitor_movie.assert_called_once_with(1)
+    mock_run.return_value = Mock(stdout="500")
+    assert processor._trigger_aiostreams_download("http://aio/playback/1", "Movie") is False
 
+    args = mock_run.call_args[0][0]
+    assert args[args.index("--range") + 1] == "0-0"
+    assert args[-1] == "http://aio/playback/1"
 
-@patch("src.media_processor.SonarrClient")
-@patch("src.media_processor.RadarrClient")
-@patch("src.media_processor.AIOStreamsClient")
-def test_process_movie_fails_after_max_retries(
-    mock_aiostreams_class, mock_radarr_class, mock_sonarr, monkeypatch
-):
-    """_process_movie fails after trying all available streams (up to 3)"""
-    monkeypatch.setenv("AIOSTREAMS_URL", "http://aiostreams")
-    monkeypatch.setenv("RADARR_URL", "http://radarr")
-    monkeypatch.setenv("RADARR_API_KEY", "test-key")
-    monkeypatch.delenv("DISCORD_WEBHOOK_URL", raising=False)
-    monkeypatch.delenv("REALDEBRID_API_KEY", raising=False)
-    monkeypatch.setenv("MAX_RETRY_ATTEMPTS", 3)
-
-    config = Config()
-    mock_aiostreams = mock_aiostreams_class.return_value
-    mock_aiostreams.search_movie.return_value = [
-        {"title": "Movie 4K", "url": "http://stream-1", "filename": "Movie.4K.mkv"},
-        {"title": "Movie 1080p", "url": "http://stream-2", "filename": "Movie.1080p.mkv"},
-        {"title": "Movie 720p", "url": "http://stream-3", "filename": "Movie.720p.mkv"},
-        {"title": "Movie 480p", "url": "http://stream-4", "filename": "Movie.480p.mkv"},
-    ]
 
+def test_get_rd_torrents_reuses_only_newer_fetches(mocker, radarr_env, rd_env, config):
+    """The RD list is shared when fetched after the caller's cutoff and refetched otherwise"""
+    mock_rd_class = mocker.patch.object(media_processor, "RealDebridClient")
+    mock_rd = mock_rd_class.return_value
+    mock_rd.list_torrents.side_effect = [[{"filename": "a.mkv"}], [{"filename": "b.mkv"}]]
     processor = MediaProcessor(config)
+    # Read once as each fetch starts: the first at 100s, the refetch at 200s
+    mocker.patch.object(media_processor.time, "monotonic", side_effect=[100.0, 200.0])
 
-    call_count = 0
+    first = processor._get_rd_torrents(fetched_after=50.0)
+    shared = processor._get_rd_torrents(fetched_after=99.0)
+    assert mock_rd.list_torrents.call_count == 1
 
-    def mock_try_stream(stream, label):
-        nonlocal call_count
-        call_count += 1
-        return False  # All fail
+    # A list fetched exactly at the cutoff is not newer than it
+    refreshed = processor._get_rd_torrents(fetched_after=100.0)
 
-    with patch.object(processor, "_try_stream", side_effect=mock_try_stream):
-        movie = {"id": 1, "title": "Movie", "year": 2024, "imdbId": "tt1234567"}
-        result = processor._process_movie(movie)
-
-    assert result is False
-    assert call_count == 3  # Capped at 3, not 4
+    assert first is shared
+    assert refreshed == [{"filename": "b.mkv"}]
+    assert mock_rd.list_torrents.call_count == 2
+    assert processor._rd_torrents_cache == (200.0, refreshed)
 
 
-@patch("src.media_processor.SonarrClient")
-@patch("src.media_processor.RadarrClient")
-@patch("src.media_processor.AIOStreamsClient")
-def test_process_episode_retries_and_succeeds_on_second_stream(
-    mock_aiostreams_class, mock_radarr, mock_sonarr_class, monkeypatch
+def test_process_movie_skips_aiostreams_when_already_in_rd(
+    mocker, clients, radarr_env, rd_env, config, movie
 ):
-    """_process_episode tries next stream if first fails verification"""
-    monkeypatch.setenv("AIOSTREAMS_URL", "http://aiostreams")
-    monkeypatch.setenv("SONARR_URL", "http://sonarr")
-    monkeypatch.setenv("SONARR_API_KEY", "test-key")
-    monkeypatch.delenv("DISCORD_WEBHOOK_URL", raising=False)
-    monkeypatch.delenv("REALDEBRID_API_KEY", raising=False)
-
-    config = Config()
-
-    mock_sonarr = mock_sonarr_class.return_value
-    mock_sonarr.unmonitor_episode.return_value = True
-
-    mock_aiostreams = mock_aiostreams_class.return_value
-    mock_aiostreams.search_episode.return_value = [
-        {"title": "Show 4K", "url": "http://stream-1", "filename": "Show.S01E01.4K.mkv"},
-        {"title": "Show 1080p", "url": "http://stream-2", "filename": "Show.S01E01.1080p.mkv"},
+    """Movies whose IMDB ID is in an RD torrent filename complete without an AIOStreams search"""
+    mock_rd_class = mocker.patch.object(media_processor, "RealDebridClient")
+    mock_rd_class.return_value.list_torrents.return_value = [
+        {"filename": "The.Matrix.1999.tt0133093.1080p.mkv", "status": "downloaded"},
+        {"filename": "Inception.2010.tt1375666.mkv", "status": "dead"},
+        # Stalled before downloading, so not proof the movie will ever be playable
+        {"filename": "Tenet.2020.tt6723592.mkv", "status": "magnet_conversion"},
     ]
-
     processor = MediaProcessor(config)
+    processor._rd_index_by_imdb = processor._build_rd_imdb_index()
 
-    call_count = 0
-
-    def mock_try_stream(stream, label):
-        nonlocal call_count
-        call_count += 1
-        return call_count == 2
+    assert set(processor._rd_index_by_imdb) == {"tt0133093"}
 
-    with patch.object(processor, "_try_stream", side_effect=mock_try_stream):
-        episode = {
-            "id": 1,
-            "seasonNumber": 1,
-            "episodeNumber": 1,
-            "title": "Pilot",
-            "series": {"title": "Breaking Bad", "imdbId": "tt0959621"},
-        }
-        result = processor._process_episode(episode)
+    assert processor._process_movie(movie) is True
 
-    assert result is True
-    assert call_count == 2
-    mock_sonarr.unmonitor_episode.assert_called_once_with(1)
+    clients.aiostreams.return_value.search_movie.assert_not_called()
+    assert processor._unmonitor_movies == [movie]
+    assert processor.storage.should_skip(1)
 
 
-@patch("src.media_processor.SonarrClient")
-@patch("src.media_processor.RadarrClient")
-@patch("src.media_processor.AIOStreamsClient")
-def test_process_episode_fails_after_max_retries(
-    mock_aiostreams_class, mock_radarr, mock_sonarr_class, monkeypatch
+def test_process_movie_searches_when_rd_torrent_is_stalled(
+    mocker, clients, radarr_env, rd_env, config, movie
 ):
-    """_process_episode fails after trying all streams (up to 3)"""
-    monkeypatch.setenv("AIOSTREAMS_URL", "http://aiostreams")
-    monkeypatch.setenv("SONARR_URL", "http://sonarr")
-    monkeypatch.setenv("SONARR_API_KEY", "test-key")
-    monkeypatch.delenv("DISCORD_WEBHOOK_URL", raising=False)
-    monkeypatch.delenv("REALDEBRID_API_KEY", raising=False)
-    monkeypatch.setenv("MAX_RETRY_ATTEMPTS", 3)
-
-    config = Config()
-
-    mock_aiostreams = mock_aiostreams_class.return_value
-    mock_aiostreams.search_episode.return_value = [
-        {"title": "Show 4K", "url": "http://stream-1", "filename": "Show.4K.mkv"},
-        {"title": "Show 1080p", "url": "http://stream-2", "filename": "Show.1080p.mkv"},
-        {"title": "Show 720p", "url": "http://stream-3", "filename": "Show.720p.mkv"},
-        {"title": "Show 480p", "url": "http://stream-4", "filename": "Show.480p.mkv"},
+    """A magnet_conversion RD entry for the movie doesn't count as it being downloaded"""
+    mock_rd_class = mocker.patch.object(media_processor, "RealDebridClient")
+    mock_rd_class.return_value.list_torrents.return_value = [
+        {"filename": "The.Matrix.1999.tt0133093.1080p.mkv", "status": "magnet_conversion"},
     ]
-
+    clients.aiostreams.return_value.search_movie.return_value = []
     processor = MediaProcessor(config)
+    processor._rd_index_by_imdb = processor._build_rd_imdb_index()
 
-    call_count = 0
+    assert processor._process_movie(movie) is False
 
-    def mock_try_stream(stream, label):
-        nonlocal call_count
-        call_count += 1
-        return False
-
-    with patch.object(processor, "_try_stream", side_effect=mock_try_stream):
-        episode = {
-            "id": 1,
-            "seasonNumber": 1,
-            "episodeNumber": 1,
-            "title": "Pilot",
-            "series": {"title": "Breaking Bad", "imdbId": "tt0959621"},
-        }
-        result = processor._process_episode(episode)
-
-    assert result is False
-    assert call_count == 3
+    clients.aiostreams.return_value.search_movie.assert_called_once_with("tt0133093")
+    assert processor._unmonitor_movies == []
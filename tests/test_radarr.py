@@ -1,9 +1,18 @@
-from unittest.mock import Mock, patch
+from unittest.mock import Mock
 
+import orjson
 import pytest
 
 from src.clients.radarr import RadarrClient
 
+# Movie record shared by the tests; code under test that mutates records gets a copy
+MOVIE = {"id": 1, "title": "Test Movie", "year": 2024, "imdbId": "tt1234567"}
+
+
+def json_response(payload):
+    """A mock response whose json() returns payload"""
+    return Mock(**{"json.return_value": payload})
+
 
 @pytest.fixture
 def radarr_client():
@@ -15,17 +24,13 @@ def test_radarr_client_initialization(radarr_client):
     assert radarr_client.url == "http://localhost:7878"
     assert radarr_client.api_key == "test_api_key"
     assert radarr_client.headers == {"X-Api-Key": "test_api_key"}
+    assert radarr_client.session.headers["X-Api-Key"] == "test_api_key"
 
 
-@patch("requests.get")
-def test_get_wanted_movies(mock_get, radarr_client):
+def test_get_wanted_movies(mocker, radarr_client):
     """Test fetching wanted movies from Radarr"""
-    mock_response = Mock()
-    mock_response.json.return_value = {
-        "records": [{"id": 1, "title": "Test Movie", "year": 2024, "imdbId": "tt1234567"}]
-    }
-    mock_response.raise_for_status = Mock()
-    mock_get.return_value = mock_response
+    mock_get = mocker.patch("requests.Session.get")
+    mock_get.return_value = Mock(content=orjson.dumps({"records": [MOVIE]}))
 
     movies = radarr_client.get_wanted_movies()
 
@@ -33,72 +38,159 @@ def test_get_wanted_movies(mock_get, radarr_client):
     assert movies[0]["title"] == "Test Movie"
     mock_get.assert_called_once_with(
         "http://localhost:7878/api/v3/wanted/missing",
-        headers={"X-Api-Key": "test_api_key"},
-        params={"pageSize": 1000},
+        params={"page": 1, "pageSize": 200},
+        headers={},
     )
 
 
-@patch("requests.get")
-def test_get_movie_by_id(mock_get, radarr_client):
-    """Test fetching single movie by ID"""
-    mock_response = Mock()
-    mock_response.json.return_value = {
-        "id": 1,
-        "title": "Test Movie",
-        "year": 2024,
-        "imdbId": "tt1234567",
+def test_iter_wanted_movies_follows_pages(mocker, radarr_client):
+    """Test wanted movies are paged until totalRecords is reached"""
+    mock_get = mocker.patch("requests.Session.get")
+    pages = [
+        {"totalRecords": 3, "records": [{"id": 1}, {"id": 2}]},
+        {"totalRecords": 3, "records": [{"id": 3}]},
+    ]
+    mock_get.side_effect = [Mock(status_code=200, content=orjson.dumps(page)) for page in pages]
+
+    movies = list(radarr_client.iter_wanted_movies(page_size=2))
+
+    assert [movie["id"] for movie in movies] == [1, 2, 3]
+    assert [call.kwargs["params"]["page"] for call in mock_get.call_args_list] == [1, 2]
+
+
+def test_get_wanted_movies_uses_conditional_request(mocker, radarr_client):
+    """Test the next poll sends validators and a 304 reuses the previous records"""
+    mock_get = mocker.patch("requests.Session.get")
+    records = [{"id": 1, "title": "Test Movie"}]
+    first = Mock(status_code=200, content=orjson.dumps({"records": records}))
+    first.headers = {"ETag": '"abc"', "Last-Modified": "Wed, 14 Oct 2026 10:00:00 GMT"}
+    unchanged = Mock(status_code=304)
+    mock_get.side_effect = [first, unchanged]
+
+    assert radarr_client.get_wanted_movies() == records
+    assert radarr_client.get_wanted_movies() == records
+
+    assert mock_get.call_args.kwargs["headers"] == {
+        "If-None-Match": '"abc"',
+        "If-Modified-Since": "Wed, 14 Oct 2026 10:00:00 GMT",
     }
-    mock_response.raise_for_status = Mock()
-    mock_get.return_value = mock_response
+    unchanged.raise_for_status.assert_not_called()
+
+
+def test_wanted_movies_from_304_are_fresh_copies(mocker, radarr_client):
+    """Test changing records returned by one poll doesn't leak into the next 304"""
+    mock_get = mocker.patch("requests.Session.get")
+    first = Mock(status_code=200, content=orjson.dumps({"records": [MOVIE]}))
+    first.headers = {"ETag": '"abc"'}
+    mock_get.side_effect = [first, Mock(status_code=304), Mock(status_code=304)]
+
+    radarr_client.get_wanted_movies()[0]["monitored"] = False
+    radarr_client.get_wanted_movies()[0]["title"] = "Changed"
+
+    assert radarr_client.get_wanted_movies() == [MOVIE]
+
+
+def test_iter_wanted_movies_forgets_pages_past_the_end(mocker, radarr_client):
+    """Test a wanted list that shrinks drops the cached bodies of its old trailing pages"""
+    mock_get = mocker.patch("requests.Session.get")
+    pages = [
+        {"totalRecords": 3, "records": [{"id": 1}, {"id": 2}]},
+        {"totalRecords": 3, "records": [{"id": 3}]},
+        {"totalRecords": 2, "records": [{"id": 1}, {"id": 2}]},
+    ]
+    mock_get.side_effect = [Mock(status_code=200, content=orjson.dumps(page)) for page in pages]
+
+    list(radarr_client.iter_wanted_movies(page_size=2))
+    assert set(radarr_client._wanted_pages) == {(1, 2), (2, 2)}
+    list(radarr_client.iter_wanted_movies(page_size=2))
+
+    assert set(radarr_client._wanted_pages) == {(1, 2)}
+
+
+def test_get_movie_by_id(mocker, radarr_client):
+    """Test fetching single movie by ID"""
+    mock_get = mocker.patch("requests.Session.get")
+    mock_get.return_value = json_response(MOVIE)
 
     movie = radarr_client.get_movie(1)
 
     assert movie["title"] == "Test Movie"
-    mock_get.assert_called_once_with(
-        "http://localhost:7878/api/v3/movie/1", headers={"X-Api-Key": "test_api_key"}
-    )
+    mock_get.assert_called_once_with("http://localhost:7878/api/v3/movie/1")
 
 
-@patch("requests.put")
-@patch("requests.get")
-def test_unmonitor_movie(mock_get, mock_put, radarr_client):
+def test_unmonitor_movie(mocker, radarr_client):
     """Test unmonitoring a movie"""
-    # Mock get_movie response
-    mock_get_response = Mock()
-    mock_get_response.json.return_value = {
-        "id": 1,
-        "title": "Test Movie",
-        "year": 2024,
-        "imdbId": "tt1234567",
-        "monitored": True,
-    }
-    mock_get_response.raise_for_status = Mock()
-    mock_get.return_value = mock_get_response
-
-    # Mock PUT response
-    mock_put_response = Mock()
-    mock_put_response.raise_for_status = Mock()
-    mock_put.return_value = mock_put_response
+    mock_get = mocker.patch("requests.Session.get")
+    mock_put = mocker.patch("requests.Session.put")
+    # unmonitor_movie flips "monitored" on the fetched record, so hand it a fresh dict
+    mock_get.return_value = json_response({**MOVIE, "monitored": True})
 
     result = radarr_client.unmonitor_movie(1)
 
     assert result is True
     # Verify GET was called
-    mock_get.assert_called_once_with(
-        "http://localhost:7878/api/v3/movie/1", headers={"X-Api-Key": "test_api_key"}
-    )
+    mock_get.assert_called_once_with("http://localhost:7878/api/v3/movie/1")
     # Verify PUT was called with monitored=False
     mock_put.assert_called_once()
-    put_call_args = mock_put.call_args
-    assert put_call_args[1]["json"]["monitored"] is False
+    put_kwargs = mock_put.call_args.kwargs
+    assert orjson.loads(put_kwargs["data"])["monitored"] is False
+    assert put_kwargs["headers"] == {"Content-Type": "application/json"}
 
 
-@patch("requests.put")
-@patch("requests.get")
-def test_unmonitor_movie_handles_error(mock_get, mock_put, radarr_client):
+def test_unmonitor_movie_handles_error(mocker, radarr_client):
     """Test unmonitoring handles errors gracefully"""
+    mock_get = mocker.patch("requests.Session.get")
+    mocker.patch("requests.Session.put")
     mock_get.side_effect = Exception("API Error")
 
     result = radarr_client.unmonitor_movie(1)
 
     assert result is False
+
+
+def test_unmonitor_movie_with_prefetched_record(mocker, radarr_client):
+    """Test unmonitoring with an already fetched movie skips the GET"""
+    mock_get = mocker.patch("requests.Session.get")
+    mock_put = mocker.patch("requests.Session.put")
+    movie = {**MOVIE, "monitored": True}
+    mock_put.return_value.raise_for_status = Mock()
+
+    result = radarr_client.unmonitor_movie(1, movie)
+
+    assert result is True
+    mock_get.assert_not_called()
+    assert orjson.loads(mock_put.call_args.kwargs["data"])["monitored"] is False
+    # The caller's record is left untouched
+    assert movie["monitored"] is True
+
+
+def test_get_wanted_movies_handles_invalid_json(mocker, radarr_client):
+    """Test a malformed wanted/missing body is treated like a request error"""
+    mock_get = mocker.patch("requests.Session.get")
+    mock_get.return_value.content = b"<html>bad gateway</html>"
+    mock_get.return_value.raise_for_status = Mock()
+
+    assert radarr_client.get_wanted_movies() == []
+
+
+def test_bulk_unmonitor_movies(mocker, radarr_client):
+    """Test bulk unmonitor sends every ID to the movie editor in one request"""
+    mock_put = mocker.patch("requests.Session.put")
+    mock_put.return_value.raise_for_status = Mock()
+
+    assert radarr_client.bulk_unmonitor_movies([1, 2]) is True
+
+    mock_put.assert_called_once()
+    put_call = mock_put.call_args
+    assert put_call.args[0] == "http://localhost:7878/api/v3/movie/editor"
+    assert orjson.loads(put_call.kwargs["data"]) == {"movieIds": [1, 2], "monitored": False}
+
+
+def test_bulk_unmonitor_movies_handles_error(mocker, radarr_client):
+    """Test bulk unmonitor returns False on API errors and skips empty batches"""
+    mock_put = mocker.patch("requests.Session.put")
+    mock_put.side_effect = Exception("API Error")
+
+    assert radarr_client.bulk_unmonitor_movies([1]) is False
+    assert radarr_client.bulk_unmonitor_movies([]) is True
+    assert mock_put.call_count == 1
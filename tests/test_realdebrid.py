@@ -1,13 +1,23 @@
+import logging
 from unittest.mock import Mock, patch
 
+import orjson
 import pytest
 
 from src.clients.realdebrid import RealDebridClient
 
 
-@pytest.fixture
+def json_response(payload):
+    """A mock response whose json() returns payload"""
+    return Mock(**{"json.return_value": payload})
+
+
+@pytest.fixture(scope="module")
 def rd_client():
-    return RealDebridClient("test_api_key")
+    """One client for the module; it keeps no per-request state and tests patch Session.get"""
+    client = RealDebridClient("test_api_key")
+    yield client
+    client.close()
 
 
 def test_realdebrid_client_initialization(rd_client):
@@ -15,69 +25,55 @@ def test_realdebrid_client_initialization(rd_client):
     assert rd_client.api_key == "test_api_key"
     assert rd_client.base_url == "https://api.real-debrid.com/rest/1.0"
     assert rd_client.headers == {"Authorization": "Bearer test_api_key"}
+    assert rd_client.session.headers["Authorization"] == "Bearer test_api_key"
 
 
-@patch("requests.post")
-@patch("requests.get")
-@patch("time.sleep")
-def test_add_magnet_with_infohash(mock_sleep, mock_get, mock_post, rd_client):
+@patch("requests.Session.post")
+@patch("requests.Session.get")
+def test_add_magnet_with_infohash(mock_get, mock_post, rd_client):
     """Test adding torrent by infohash"""
-    # Mock add magnet response
-    add_response = Mock()
-    add_response.json.return_value = {"id": "rd_torrent_123"}
-    add_response.raise_for_status = Mock()
-
-    # Mock torrent info response
-    info_response = Mock()
-    info_response.json.return_value = {
-        "id": "rd_torrent_123",
-        "status": "waiting_files_selection",
-        "files": [{"id": 1, "path": "movie.mkv"}, {"id": 2, "path": "sample.mkv"}],
-    }
-    info_response.raise_for_status = Mock()
-
-    # Mock select files response
-    select_response = Mock()
-    select_response.raise_for_status = Mock()
-
-    mock_post.side_effect = [add_response, select_response]
+    add_response = json_response({"id": "rd_torrent_123"})
+    info_response = json_response(
+        {
+            "id": "rd_torrent_123",
+            "status": "waiting_files_selection",
+            "files": [{"id": 1, "path": "movie.mkv"}, {"id": 2, "path": "sample.mkv"}],
+        }
+    )
+    # The select files response has no body to read
+    mock_post.side_effect = [add_response, Mock()]
     mock_get.return_value = info_response
 
     torrent_id = rd_client.add_magnet("abc123def456")
 
     assert torrent_id == "rd_torrent_123"
-
+    add_call, select_call = mock_post.call_args_list
     # Verify magnet was converted from infohash
-    assert mock_post.call_args_list[0][1]["data"]["magnet"].startswith("magnet:?xt=urn:btih:")
-
+    assert add_call.kwargs["data"]["magnet"].startswith("magnet:?xt=urn:btih:")
     # Verify files were selected
-    assert mock_post.call_args_list[1][1]["data"]["files"] == "1,2"
+    assert select_call.kwargs["data"]["files"] == "1,2"
 
 
-@patch("requests.post")
-@patch("requests.get")
+@patch("requests.Session.post")
+@patch("requests.Session.get")
 @patch("time.sleep")
 def test_add_magnet_with_magnet_url(mock_sleep, mock_get, mock_post, rd_client):
     """Test adding torrent with magnet URL"""
-    add_response = Mock()
-    add_response.json.return_value = {"id": "rd_torrent_123"}
-    add_response.raise_for_status = Mock()
-
-    info_response = Mock()
-    info_response.json.return_value = {"id": "rd_torrent_123", "status": "downloaded"}
-    info_response.raise_for_status = Mock()
-
-    mock_post.return_value = add_response
-    mock_get.return_value = info_response
+    mock_post.return_value = json_response({"id": "rd_torrent_123"})
+    mock_get.return_value = json_response({"id": "rd_torrent_123", "status": "downloaded"})
 
     magnet = "magnet:?xt=urn:btih:abc123"
     torrent_id = rd_client.add_magnet(magnet)
 
     assert torrent_id == "rd_torrent_123"
-    assert mock_post.call_args_list[0][1]["data"]["magnet"] == magnet
+    assert mock_post.call_args.kwargs["data"]["magnet"] == magnet
+    # Already-downloaded torrents need one info GET, no sleeping and no file selection
+    mock_get.assert_called_once()
+    mock_sleep.assert_not_called()
+    assert mock_post.call_count == 1
 
 
-@patch("requests.post")
+@patch("requests.Session.post")
 def test_add_magnet_handles_error(mock_post, rd_client):
     """Test add magnet handles errors gracefully"""
     mock_post.side_effect = Exception("API Error")
@@ -87,28 +83,23 @@ def test_add_magnet_handles_error(mock_post, rd_client):
     assert torrent_id is None
 
 
-@patch("requests.get")
+@patch("requests.Session.get")
 def test_check_torrent_status(mock_get, rd_client):
     """Test checking torrent status"""
-    mock_response = Mock()
-    mock_response.json.return_value = {"status": "downloaded"}
-    mock_response.raise_for_status = Mock()
-    mock_get.return_value = mock_response
+    mock_get.return_value = Mock(content=orjson.dumps({"status": "downloaded"}))
 
     status = rd_client.check_torrent_status("rd_torrent_123")
 
     assert status == "downloaded"
     mock_get.assert_called_once_with(
-        "https://api.real-debrid.com/rest/1.0/torrents/info/rd_torrent_123",
-        headers={"Authorization": "Bearer test_api_key"},
+        "https://api.real-debrid.com/rest/1.0/torrents/info/rd_torrent_123"
     )
 
 
-@patch("requests.get")
+@patch("requests.Session.get")
 def test_list_torrents_returns_torrent_list(mock_get, rd_client):
     """list_torrents returns list of torrent dicts from RD API"""
-    mock_response = Mock()
-    mock_response.json.return_value = [
+    payload = [
         {
             "id": "abc123",
             "filename": "Shrinking S03E04 The Field 2160p ATVP WEB-DL DDP5 1 DV H 265-NTb.mkv",
@@ -122,8 +113,7 @@ def test_list_torrents_returns_torrent_list(mock_get, rd_client):
             "status": "downloaded",
         },
     ]
-    mock_response.raise_for_status = Mock()
-    mock_get.return_value = mock_response
+    mock_get.return_value = Mock(content=orjson.dumps(payload))
 
     torrents = rd_client.list_torrents()
 
@@ -134,12 +124,11 @@ def test_list_torrents_returns_torrent_list(mock_get, rd_client):
     )
     mock_get.assert_called_once_with(
         "https://api.real-debrid.com/rest/1.0/torrents",
-        headers={"Authorization": "Bearer test_api_key"},
         timeout=30,
     )
 
 
-@patch("requests.get")
+@patch("requests.Session.get")
 def test_list_torrents_returns_none_on_error(mock_get, rd_client):
     """list_torrents returns None on API error (distinguishes from empty account)"""
     mock_get.side_effect = Exception("API Error")
@@ -147,3 +136,52 @@ def test_list_torrents_returns_none_on_error(mock_get, rd_client):
     torrents = rd_client.list_torrents()
 
     assert torrents is None
+
+
+@patch("requests.Session.post")
+@patch("requests.Session.get")
+@patch("time.sleep")
+def test_add_magnet_polls_until_files_ready(mock_sleep, mock_get, mock_post, rd_client):
+    """add_magnet keeps polling with backoff until files can be selected"""
+    mock_post.return_value = json_response({"id": "rd_torrent_123"})
+
+    converting = json_response({"id": "rd_torrent_123", "status": "magnet_conversion"})
+    ready = json_response(
+        {
+            "id": "rd_torrent_123",
+            "status": "waiting_files_selection",
+            "files": [{"id": 1, "path": "movie.mkv"}],
+        }
+    )
+    mock_get.side_effect = [converting, converting, ready]
+
+    torrent_id = rd_client.add_magnet("abc123def456")
+
+    assert torrent_id == "rd_torrent_123"
+    assert mock_get.call_count == 3
+    assert [c.args[0] for c in mock_sleep.call_args_list] == [0.2, 0.4]
+    assert mock_post.call_args.kwargs["data"]["files"] == "1"
+
+
+@patch("requests.Session.get")
+@patch("time.sleep")
+def test_wait_for_status_gives_up_after_max_wait(mock_sleep, mock_get, rd_client):
+    """_wait_for_status returns the last info once max_wait has elapsed"""
+    mock_get.return_value = json_response({"id": "rd_torrent_123", "status": "magnet_conversion"})
+
+    info = rd_client._wait_for_status("rd_torrent_123", max_wait=1.0)
+
+    assert info["status"] == "magnet_conversion"
+    assert sum(c.args[0] for c in mock_sleep.call_args_list) == pytest.approx(1.0)
+
+
+def test_log_curl_only_at_debug(rd_client, caplog):
+    """The curl line is skipped at INFO and redacts the token at DEBUG"""
+    with caplog.at_level(logging.INFO, logger="src.clients.realdebrid"):
+        rd_client._log_curl("GET", "https://api.real-debrid.com/rest/1.0/torrents")
+    assert "curl" not in caplog.text
+
+    with caplog.at_level(logging.DEBUG, logger="src.clients.realdebrid"):
+        rd_client._log_curl("GET", "https://api.real-debrid.com/rest/1.0/torrents")
+    assert "Bearer ***" in caplog.text
+    assert "test_api_key" not in caplog.text
@@ -0,0 +1,160 @@
+from unittest.mock import Mock, patch
+
+import orjson
+import pytest
+import requests
+
+from src.clients.sonarr import SonarrClient
+
+
+@pytest.fixture
+def sonarr_client():
+    return SonarrClient("http://localhost:8989", "test_api_key")
+
+
+def test_sonarr_client_initialization(sonarr_client):
+    """Test Sonarr client initializes correctly"""
+    assert sonarr_client.url == "http://localhost:8989"
+    assert sonarr_client.session.headers["X-Api-Key"] == "test_api_key"
+
+
+@patch("requests.Session.get")
+def test_get_wanted_episodes_uses_conditional_request(mock_get, sonarr_client):
+    """Test wanted episodes are fetched with series and reused on a 304"""
+    records = [{"id": 1, "series": {"title": "Breaking Bad"}}]
+    first = Mock(status_code=200, content=orjson.dumps({"records": records}))
+    first.headers = {"ETag": '"xyz"'}
+    mock_get.side_effect = [first, Mock(status_code=304)]
+
+    assert sonarr_client.get_wanted_episodes() == records
+    assert sonarr_client.get_wanted_episodes() == records
+
+    assert mock_get.call_args_list[0][1] == {
+        "params": {"page": 1, "pageSize": 200, "includeSeries": True},
+        "headers": {},
+    }
+    assert mock_get.call_args[1]["headers"] == {"If-None-Match": '"xyz"'}
+
+
+@patch("requests.Session.get")
+def test_wanted_episode_pages_from_304_are_fresh_copies(mock_get, sonarr_client):
+    """Test series joined onto one poll's records don't leak into later 304 pages"""
+    pages = [
+        {"totalRecords": 2, "records": [{"id": 1, "seriesId": 7}]},
+        {"totalRecords": 2, "records": [{"id": 2, "seriesId": 7}]},
+    ]
+    responses = [Mock(status_code=200, content=orjson.dumps(page)) for page in pages]
+    for n, response in enumerate(responses):
+        response.headers = {"ETag": f'"page-{n}"'}
+    mock_get.side_effect = [*responses, Mock(status_code=304), Mock(status_code=304)]
+
+    for episode in sonarr_client.iter_wanted_episodes(page_size=1, include_series=False):
+        episode["series"] = {"id": 7, "title": "Breaking Bad"}
+    episodes = list(sonarr_client.iter_wanted_episodes(page_size=1, include_series=False))
+
+    assert episodes == [page["records"][0] for page in pages]
+
+
+@patch("requests.Session.get")
+def test_iter_wanted_episodes_forgets_pages_past_the_end(mock_get, sonarr_client):
+    """Test a wanted list that shrinks drops the cached bodies of its old trailing pages"""
+    pages = [
+        {"totalRecords": 2, "records": [{"id": 1}]},
+        {"totalRecords": 2, "records": [{"id": 2}]},
+        {"totalRecords": 1, "records": [{"id": 1}]},
+    ]
+    mock_get.side_effect = [Mock(status_code=200, content=orjson.dumps(page)) for page in pages]
+
+    list(sonarr_client.iter_wanted_episodes(page_size=1, include_series=False))
+    list(sonarr_client.iter_wanted_episodes(page_size=1, include_series=False))
+
+    assert set(sonarr_client._wanted_pages) == {(1, 1, False)}
+
+
+@patch("requests.Session.put")
+@patch("requests.Session.get")
+def test_unmonitor_episode(mock_get, mock_put, sonarr_client):
+    """Test unmonitoring an episode fetches it and PUTs monitored=False"""
+    mock_get.return_value.json.return_value = {"id": 1, "monitored": True}
+    mock_get.return_value.raise_for_status = Mock()
+    mock_put.return_value.raise_for_status = Mock()
+
+    result = sonarr_client.unmonitor_episode(1)
+
+    assert result is True
+    mock_get.assert_called_once_with("http://localhost:8989/api/v3/episode/1")
+    assert orjson.loads(mock_put.call_args[1]["data"])["monitored"] is False
+
+
+@patch("requests.Session.put")
+@patch("requests.Session.get")
+def test_unmonitor_episode_with_prefetched_record(mock_get, mock_put, sonarr_client):
+    """Test unmonitoring with a wanted/missing record skips the GET and drops the series"""
+    episode = {"id": 1, "monitored": True, "series": {"title": "Breaking Bad"}}
+    mock_put.return_value.raise_for_status = Mock()
+
+    result = sonarr_client.unmonitor_episode(1, episode)
+
+    assert result is True
+    mock_get.assert_not_called()
+    body = orjson.loads(mock_put.call_args[1]["data"])
+    assert body["monitored"] is False
+    assert "series" not in body
+
+
+@patch("requests.Session.get")
+def test_unmonitor_episode_handles_error(mock_get, sonarr_client):
+    """Test unmonitoring handles errors gracefully"""
+    mock_get.side_effect = Exception("API Error")
+
+    assert sonarr_client.unmonitor_episode(1) is False
+
+
+@patch("requests.Session.put")
+def test_bulk_unmonitor_episodes(mock_put, sonarr_client):
+    """Test bulk unmonitor sends every episode ID to episode/monitor in one request"""
+    mock_put.return_value.raise_for_status = Mock()
+
+    assert sonarr_client.bulk_unmonitor_episodes([5, 6]) is True
+
+    assert mock_put.call_args[0][0] == "http://localhost:8989/api/v3/episode/monitor"
+    assert orjson.loads(mock_put.call_args[1]["data"]) == {
+        "episodeIds": [5, 6],
+        "monitored": False,
+    }
+
+
+@patch("requests.Session.get")
+def test_get_all_series(mock_get, sonarr_client):
+    """Test all series are fetched in one request and errors return an empty list"""
+    mock_get.return_value.content = orjson.dumps([{"id": 7, "title": "Breaking Bad"}])
+    mock_get.return_value.raise_for_status = Mock()
+
+    assert sonarr_client.get_all_series() == [{"id": 7, "title": "Breaking Bad"}]
+    mock_get.assert_called_once_with("http://localhost:8989/api/v3/series")
+
+    mock_get.return_value.raise_for_status.side_effect = requests.HTTPError("500")
+    assert sonarr_client.get_all_series() == []
+
+
+@patch("requests.Session.get")
+def test_get_series(mock_get, sonarr_client):
+    """Test a single series is fetched by ID and errors return None"""
+    mock_get.return_value.content = orjson.dumps({"id": 7, "title": "Breaking Bad"})
+    mock_get.return_value.raise_for_status = Mock()
+
+    assert sonarr_client.get_series(7) == {"id": 7, "title": "Breaking Bad"}
+    mock_get.assert_called_once_with("http://localhost:8989/api/v3/series/7")
+
+    mock_get.return_value.raise_for_status.side_effect = requests.HTTPError("404")
+    assert sonarr_client.get_series(7) is None
+
+
+@patch("requests.Session.get")
+def test_get_wanted_episodes_without_series(mock_get, sonarr_client):
+    """Test includeSeries can be turned off when series are joined client-side"""
+    mock_get.return_value = Mock(status_code=200, content=orjson.dumps({"records": []}))
+
+    sonarr_client.get_wanted_episodes(include_series=False)
+
+    assert mock_get.call_args[1]["params"]["includeSeries"] is False
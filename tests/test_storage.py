@@ -72,3 +72,93 @@ def test_get_stats(storage):
     assert stats["total"] == 3
     assert stats["successful"] == 2
     assert stats["failed"] == 1
+
+
+def test_get_stats_counts_reprocessed_entry_once(storage):
+    """Test re-marking an entry moves it between counts instead of adding to both"""
+    storage.mark_processed(1, success=False)
+    storage.mark_processed(1, success=True)
+
+    assert storage.get_stats() == {"total": 1, "successful": 1, "failed": 0}
+
+
+def test_persisted_entries_survive_reopen(tmp_path):
+    """Test entries written to the SQLite file are restored by a new instance"""
+    db_path = str(tmp_path / "aiodarr.db")
+    storage = ProcessedMoviesStorage(db_path)
+    storage.mark_processed(1, success=True)
+    storage.mark_processed("episode_7", success=False)
+    storage.close()
+
+    reopened = ProcessedMoviesStorage(db_path)
+
+    assert reopened.processed[1]["success"] is True
+    assert reopened.processed["episode_7"]["success"] is False
+    assert reopened.should_skip(1) is True
+    assert reopened.should_skip("episode_7", retry_hours=24) is True
+    reopened.close()
+
+
+def test_persisted_entry_overwritten_on_retry(tmp_path):
+    """Test a later result replaces the stored row for the same key"""
+    db_path = str(tmp_path / "aiodarr.db")
+    storage = ProcessedMoviesStorage(db_path)
+    storage.mark_processed(1, success=False)
+    storage.mark_processed(1, success=True)
+    storage.close()
+
+    reopened = ProcessedMoviesStorage(db_path)
+
+    assert reopened.get_stats() == {"total": 1, "successful": 1, "failed": 0}
+    reopened.close()
+
+
+def test_recent_processed_ids_matches_should_skip(storage):
+    """Test the bulk skip set agrees with should_skip for each kind of entry"""
+    storage.mark_processed(1, success=True)
+    storage.mark_processed(2, success=False)
+    storage.mark_processed("episode_3", success=False)
+    storage.processed["episode_3"]["time"] = datetime.now() - timedelta(hours=25)
+
+    skip = storage.recent_processed_ids(retry_hours=24)
+
+    assert skip == {1, 2}
+    for key in (1, 2, "episode_3"):
+        assert (key in skip) == storage.should_skip(key, retry_hours=24)
+
+
+def test_should_skip_uses_reference_time(storage):
+    """Test a caller-supplied `now` decides whether a failure is still recent"""
+    storage.mark_processed(4, success=False)
+    later = datetime.now() + timedelta(hours=25)
+
+    assert storage.should_skip(4, retry_hours=24) is True
+    assert storage.should_skip(4, retry_hours=24, now=later) is False
+    assert 4 not in storage.recent_processed_ids(retry_hours=24, now=later)
+
+
+def test_entries_written_on_flush(tmp_path):
+    """Test marked entries reach the database only once flush() commits them"""
+    db_path = str(tmp_path / "aiodarr.db")
+    storage = ProcessedMoviesStorage(db_path)
+    storage.mark_processed(1, success=True)
+    storage.mark_processed(2, success=False)
+
+    assert ProcessedMoviesStorage(db_path).processed == {}
+
+    storage.flush()
+
+    assert set(ProcessedMoviesStorage(db_path).processed) == {1, 2}
+    storage.close()
+
+
+def test_unopenable_database_falls_back_to_memory(tmp_path, caplog):
+    """Test a database path that can't be opened leaves storage working in memory"""
+    storage = ProcessedMoviesStorage(str(tmp_path / "missing" / "aiodarr.db"))
+
+    storage.mark_processed(1, success=True)
+    storage.flush()
+
+    assert storage.should_skip(1) is True
+    assert "keeping processed entries in memory" in caplog.text
+    storage.close()